@@ -0,0 +1,280 @@
+import asyncio
+import concurrent.futures as cf
+import typing as t
+
+# Custom imports
+from mister.cache import ScenarioCache
+from mister.cache import SQLiteBackend
+from mister.config import SolverConfig
+from mister.encoder import Encoder
+from mister.errors import DeadlineExceededError
+from mister.errors import QueueFullError
+from mister.metrics import metrics
+from mister.service import Cache_CONF
+from mister.service import Client_ERRORS
+from mister.service import Executor_CONF
+from mister.service import Mister_KEYS
+from mister.service import Mister_KEYS_opt
+from mister.service import SolveExecutor
+from mister.service import Solver_LIMITS
+from mister.types import JSON
+
+
+Send = t.Callable[[t.Dict[str, t.Any]], t.Awaitable[None]]
+Receive = t.Callable[[], t.Awaitable[t.Dict[str, t.Any]]]
+
+
+metrics.enable()
+
+_in_flight = 0
+
+_executor = None
+
+
+def _make_executor() -> SolveExecutor:
+    backend = SQLiteBackend(Cache_CONF['PATH']) \
+              if Cache_CONF['PATH'] else None
+
+    cache = ScenarioCache(backend,
+                          Cache_CONF['MAX_ENTRIES'],
+                          Cache_CONF['TTL'])
+
+    return SolveExecutor(Executor_CONF['MAX_WORKERS'],
+                         Executor_CONF['MAX_QUEUE'],
+                         Executor_CONF['NCORES'],
+                         cache)
+
+async def _get_executor() -> SolveExecutor:
+    # Worker processes are started off the event loop,
+    # at startup or on first use without lifespan events
+    global _executor
+
+    if _executor is None:
+        executor = await asyncio.get_running_loop() \
+                                .run_in_executor(None, _make_executor)
+
+        if _executor is None:
+            _executor = executor
+        else:
+            executor.shutdown()
+
+    return _executor
+
+async def _send(send: Send, status: int,
+                content: bytes, content_type: bytes):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type),
+                    (b'content-length', str(len(content)).encode())],
+    })
+
+    await send({
+        'type': 'http.response.body',
+        'body': content,
+    })
+
+async def _send_json(send: Send, status: int, body: JSON):
+    await _send(send, status,
+                Encoder.dumpb(body),
+                b'application/json')
+
+async def _read_body(receive: Receive) -> t.Optional[bytes]:
+    """
+    Read the whole request body, or None if the client went away.
+    """
+    chunks = []
+
+    while True:
+        message = await receive()
+
+        if message['type'] == 'http.disconnect':
+            return None
+
+        chunks.append(message.get('body', b''))
+
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+async def _disconnected(receive: Receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+def _check_payload(scenario_data: t.Any) \
+                  -> t.Optional[t.Tuple[JSON, int]]:
+    if not isinstance(scenario_data, dict):
+        return {
+            'error': 'Invalid JSON payload'
+               }, 400
+
+    scenario_keys = scenario_data.keys()
+
+    if not set(Mister_KEYS).issubset(
+           set(scenario_keys)):
+        return {
+            'error': 'Missing parameters'
+               }, 400
+
+    if not set(scenario_keys).issubset(
+           set(Mister_KEYS) | set(Mister_KEYS_opt)):
+        return {
+            'error': 'Unknown parameters'
+               }, 400
+
+    return None
+
+async def _make_teams(scope: t.Dict[str, t.Any],
+                      receive: Receive,
+                      send: Send):
+    if scope['method'] != 'POST':
+        return await _send_json(send, 405, {
+            'error': 'Request method not allowed'
+                                            })
+
+    body = await _read_body(receive)
+
+    if body is None:
+        metrics.inc('http_cancelled')
+        return
+
+    try:
+        scenario_data = Encoder.loads(body)
+    except ValueError:
+        scenario_data = None
+
+    error = _check_payload(scenario_data)
+
+    if error is not None:
+        return await _send_json(send, error[1], error[0])
+
+    executor = await _get_executor()
+
+    try:
+        config = SolverConfig.deserialize(
+            scenario_data.get('solver', {})) \
+                .bounded(Solver_LIMITS['TIME_LIMIT'],
+                         Solver_LIMITS['NUM_WORKERS'])
+
+        timeout = config.time_limit + Executor_CONF['GRACE']
+
+        # Parsed, validated and looked up in the cache off the event
+        # loop, as the SQLite cache blocks, and solved in a worker process
+        future = await asyncio.get_running_loop() \
+                              .run_in_executor(None, executor.submit,
+                                               scenario_data, config,
+                                               timeout)
+    except QueueFullError as e:
+        return await _send_json(send, 429, {'error': str(e)})
+    except Client_ERRORS as e:
+        return await _send_json(send, 400, {'error': str(e)})
+    except Exception:
+        return await _send_json(send, 500, {
+            'error': 'Unable to connect to the API.'
+                                            })
+
+    if not future.done():
+        solving = asyncio.wrap_future(future)
+        disconnect = asyncio.ensure_future(_disconnected(receive))
+
+        try:
+            done, _ = await asyncio.wait(
+                {solving, disconnect}, timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+
+        if solving not in done:
+            # Stop the search, the client went away or it is too late
+            solving.cancel()
+
+            if disconnect in done:
+                metrics.inc('http_cancelled')
+                return
+
+            return await _send_json(send, 503, {
+                'error': str(DeadlineExceededError(timeout))
+                                                })
+
+    try:
+        return await _send_json(send, 200, future.result())
+    except DeadlineExceededError as e:
+        return await _send_json(send, 503, {'error': str(e)})
+    except Client_ERRORS as e:
+        return await _send_json(send, 400, {'error': str(e)})
+    except (cf.CancelledError, Exception):
+        return await _send_json(send, 500, {
+            'error': 'Unable to connect to the API.'
+                                            })
+
+async def _health(scope: t.Dict[str, t.Any],
+                  receive: Receive,
+                  send: Send):
+    await _send_json(send, 200, {
+        'status': 'ok',
+        'ready': _executor is not None,
+    })
+
+async def _metrics(scope: t.Dict[str, t.Any],
+                   receive: Receive,
+                   send: Send):
+    metrics.set('in_flight_requests', _in_flight)
+
+    if _executor is not None:
+        metrics.set('pending_requests', _executor.npending)
+
+    await _send(send, 200, metrics.to_prometheus().encode(),
+                b'text/plain; version=0.0.4')
+
+Routes = {
+    '/make-teams': _make_teams,
+    '/health': _health,
+    '/metrics': _metrics,
+}
+
+async def _lifespan(receive: Receive, send: Send):
+    while True:
+        message = await receive()
+
+        if message['type'] == 'lifespan.startup':
+            await _get_executor()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _executor is not None:
+                _executor.shutdown()
+
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope: t.Dict[str, t.Any],
+              receive: Receive,
+              send: Send):
+    """
+    ASGI application of the Mister API.
+    """
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+
+    if scope['type'] != 'http':
+        return
+
+    route = Routes.get(scope['path'])
+
+    if route is None:
+        return await _send_json(send, 404, {
+            'error': 'Not found'
+                                            })
+
+    async def _counted(message: t.Dict[str, t.Any]):
+        if message['type'] == 'http.response.start':
+            metrics.inc('http_responses', path=scope['path'],
+                        status=str(message['status']))
+
+        await send(message)
+
+    global _in_flight
+    _in_flight += 1
+
+    try:
+        await route(scope, receive, _counted)
+    finally:
+        _in_flight -= 1
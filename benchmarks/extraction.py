@@ -0,0 +1,102 @@
+"""
+Compare the former extraction of teams, scanning every (player, team Id)
+association, with the extraction from one team Id per player, and the
+memory held by a pool of extracted solutions.
+
+    python -m benchmarks.extraction --nteams 30 --nsolutions 10000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.formation import Formation
+from mister.solution import Solution
+from mister.team import Team
+
+
+class _Values:
+    """
+    Values of the BoolVars of a solution, as a CP solver would give them.
+    """
+    def __init__(self, values):
+        self.values = values
+
+    def BooleanValue(self, v) -> bool:
+        return self.values[v]
+
+
+def _assignments(nplayers: int, nteams: int,
+                 nsolutions: int, seed: int = 0):
+    rng = random.Random(seed)
+    assignment = [i % nteams for i in range(nplayers)]
+
+    for _ in range(nsolutions):
+        rng.shuffle(assignment)
+        yield list(assignment)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='4-4-2',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--nteams', type=int, default=30,
+                        help='Number of teams')
+    parser.add_argument('--nsolutions', type=int, default=10000,
+                        help='Number of extracted solutions')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+    players = synthetic_players(args.nteams, formation)
+
+    assignments = list(_assignments(len(players), args.nteams,
+                                    args.nsolutions))
+
+    # One BoolVar per player and team Id, as in the former printer
+    players_per_tid = {(p, tid): (i, tid)
+                       for i, p in enumerate(players)
+                       for tid in range(args.nteams)}
+
+    start = time.perf_counter()
+
+    for assignment in assignments:
+        values = _Values({(i, tid): tid == assignment[i]
+                          for i in range(len(players))
+                          for tid in range(args.nteams)})
+
+        teams = Team.from_associations(players_per_tid, values)
+        [_t.rating for _t in teams]
+
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for assignment in assignments:
+        teams = Team.from_assignment(players, assignment)
+        [_t.rating for _t in teams]
+
+    direct = time.perf_counter() - start
+
+    tracemalloc.start()
+
+    pool = [Solution.create(0, 1, Team.from_assignment(players,
+                                                       assignment))
+            for assignment in assignments]
+
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('%i solutions of %i players in %i teams'
+          % (args.nsolutions, len(players), args.nteams))
+    print('%24s  %12.2f us per solution'
+          % ('associations scan', 1e6*scan / args.nsolutions))
+    print('%24s  %12.2f us per solution'
+          % ('team Id per player', 1e6*direct / args.nsolutions))
+    print('%24s  %12.1f KiB per solution'
+          % ('pool memory', memory / 1024 / args.nsolutions))
@@ -0,0 +1,81 @@
+"""
+Compare the epsilon and latency of the heuristic engine alone with those
+of CP-SAT on synthetic rosters of 10 to 500 players, with and without
+a formation.
+
+    python -m benchmarks.heuristic --time-limit 10
+"""
+import argparse
+import time
+
+# Custom imports
+from benchmarks.roster import random_players
+from benchmarks.roster import synthetic_players
+from mister.collector import SolutionListener
+from mister.config import SolverConfig
+from mister.constants import Engines
+from mister.formation import Formation
+from mister.manager import Manager
+
+
+class _StatsListener(SolutionListener):
+    def __init__(self):
+        self.stats = {}
+
+    def on_finish(self, stats):
+        self.stats = stats
+
+
+def _run(players, formation: Formation, engine: str,
+         time_limit: float):
+    listener = _StatsListener()
+
+    start = time.perf_counter()
+
+    Manager.make_solutions(5, players, formation,
+                           config=SolverConfig(time_limit,
+                                               engine=engine),
+                           listener=listener)
+
+    walltime = time.perf_counter() - start
+
+    return listener.stats['epsilon'], walltime, listener.stats['status']
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--time-limit', type=float, default=10.,
+                        help='Time budget of CP-SAT in seconds')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random rosters')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize('2-2-1')
+
+    print('%9s  %8s  %10s  %12s  %10s  %12s  %s'
+          % ('formation', 'nplayers', 'heur. eps', 'heur. time (s)',
+             'cp-sat eps', 'cp-sat time (s)', 'cp-sat status'))
+
+    for nplayers in (10, 20, 50, 100, 200, 500):
+        nteams = nplayers // formation.nplayers
+
+        for _formation in (formation, None):
+            results = {}
+
+            for engine in (Engines['HEURISTIC'], Engines['CP_SAT']):
+                players = synthetic_players(nteams, _formation, args.seed) \
+                          if _formation is not None \
+                          else random_players(nplayers, args.seed)
+
+                results[engine] = _run(players, _formation,
+                                       engine, args.time_limit)
+
+            print('%9s  %8i  %10i  %14.4f  %10i  %15.4f  %s'
+                  % (_formation is not None and '2-2-1' or '-',
+                     nplayers,
+                     *results[Engines['HEURISTIC']][:2],
+                     *results[Engines['CP_SAT']]))
@@ -0,0 +1,137 @@
+"""
+Check the import-time budget of the CLI and HTTP entry points, measured with
+-X importtime in fresh interpreters, and that neither invalid scenarios nor
+cache hits load the solver. Fails if either does not hold, e.g. in CI.
+
+    python -m benchmarks.import_time --budget 150 --runs 5
+"""
+import argparse
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+
+
+Root = pathlib.Path(__file__).parent.parent
+
+# Modules loaded only at solve time
+Solver_MODULES = ('ortools', 'google.protobuf', 'numpy')
+
+# Run in a fresh interpreter, so that nothing is imported beforehand
+Probe_CODE = '''
+import json
+import sys
+
+import mister.__main__ as M
+from mister.cache import ScenarioCache
+
+with open(sys.argv[1]) as f:
+    scenario_conf = json.load(f)
+
+def solver_modules():
+    return sorted(m for m in sys.modules
+                  if any(m == k or m.startswith(k + '.') for k in %r))
+
+loaded = {}
+
+invalid = dict(scenario_conf, nteams=int(scenario_conf['nteams']) + 1)
+
+try:
+    M.fromjson(invalid)
+except M.NotEnoughPlayersError:
+    pass
+
+loaded['invalid scenario'] = solver_modules()
+
+cache = ScenarioCache()
+kwargs = M.parse(scenario_conf)
+
+cache.set(ScenarioCache.key(kwargs['n'], kwargs['nteams'],
+                            kwargs['_players'], kwargs['_formation'],
+                            kwargs['config']),
+          [json.load(open(sys.argv[2]))])
+
+M.fromjson(scenario_conf, cache=cache)
+
+if cache.hits != 1:
+    raise AssertionError('The scenario was not cached')
+
+loaded['cache hit'] = solver_modules()
+
+print(json.dumps(loaded))
+''' % (Solver_MODULES,)
+
+
+def _import_time(module: str) -> float:
+    """
+    Cumulative import time of a module in milliseconds.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime',
+                              '-c', 'import %s' % module],
+                             cwd=str(Root), capture_output=True,
+                             text=True, check=True)
+
+    # "import time: self [us] | cumulative | imported package"
+    for line in reversed(process.stderr.splitlines()):
+        fields = [f.strip() for f in line.split('|')]
+
+        if fields[-1] == module:
+            return int(fields[-2]) / 1e3
+
+    raise AssertionError('%s was not imported' % module)
+
+def _probe(scenario: pathlib.Path) -> dict:
+    process = subprocess.run([sys.executable, '-c', Probe_CODE,
+                              str(scenario / 'scenario.json'),
+                              str(scenario / 'solution.json')],
+                             cwd=str(Root), capture_output=True,
+                             text=True, check=True)
+
+    return json.loads(process.stdout)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--modules', nargs='+',
+                        default=['mister.__main__', 'mister.service'],
+                        help='Entry points whose import time is budgeted')
+    parser.add_argument('--budget', type=float, default=150.,
+                        help='Import-time budget of each module in ms')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='Number of fresh interpreters per module')
+    parser.add_argument('--scenario', default='configs/5-v-5_Castagna',
+                        help='Scenario conf directory of the probe')
+
+    args = parser.parse_args()
+
+    failures = []
+
+    print('%24s  %12s  %12s' % ('module', 'median (ms)', 'budget (ms)'))
+
+    for module in args.modules:
+        median = statistics.median([_import_time(module)
+                                    for _ in range(args.runs)])
+
+        over = median > args.budget
+
+        if over:
+            failures.append('%s imports in %.1f ms' % (module, median))
+
+        print('%24s  %12.1f  %12.1f%s'
+              % (module, median, args.budget,
+                 '  OVER BUDGET' if over else ''))
+
+    for case, modules in _probe(Root / args.scenario).items():
+        print('%24s  %s' % (case, 'loads ' + ', '.join(modules)
+                                  if modules else 'no solver'))
+
+        if modules:
+            failures.append('%s loads the solver' % case)
+
+    if failures:
+        print('\n'.join(failures))
+        sys.exit(1)
@@ -0,0 +1,81 @@
+"""
+Scaling of the large neighbourhood search with the number of players,
+from 100 to 1000 players in 5-a-side teams, next to the monolithic CP-SAT
+model up to --max-monolithic players.
+
+    python -m benchmarks.lns --time-limit 30
+"""
+import argparse
+import time
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.collector import SolutionListener
+from mister.config import SolverConfig
+from mister.constants import Engines
+from mister.formation import Formation
+from mister.manager import Manager
+
+
+class _StatsListener(SolutionListener):
+    def __init__(self):
+        self.stats = {}
+
+    def on_finish(self, stats):
+        self.stats = stats
+
+
+def _run(nteams: int, formation: Formation,
+         engine: str, time_limit: float, seed: int):
+    players = synthetic_players(nteams, formation, seed)
+    listener = _StatsListener()
+
+    start = time.perf_counter()
+
+    Manager.make_solutions(formation.nplayers, players, formation,
+                           config=SolverConfig(time_limit,
+                                               random_seed=seed,
+                                               engine=engine),
+                           listener=listener)
+
+    walltime = time.perf_counter() - start
+
+    return listener.stats['epsilon'], walltime, listener.stats['status']
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--time-limit', type=float, default=30.,
+                        help='Time budget of each solve in seconds')
+    parser.add_argument('--max-monolithic', type=int, default=300,
+                        help='Largest roster solved with a single model')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random rosters')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+
+    print('%8s  %6s  %8s  %10s  %12s  %10s  %12s  %s'
+          % ('nplayers', 'nteams', 'lns eps', 'lns (s)', 'lns status',
+             'cp-sat eps', 'cp-sat (s)', 'cp-sat status'))
+
+    for nplayers in (100, 200, 300, 500, 750, 1000):
+        nteams = nplayers // formation.nplayers
+
+        lns = _run(nteams, formation, Engines['LNS'],
+                   args.time_limit, args.seed)
+
+        if nplayers <= args.max_monolithic:
+            monolithic = _run(nteams, formation, Engines['CP_SAT'],
+                              args.time_limit, args.seed)
+        else:
+            monolithic = ('-', float('nan'), '-')
+
+        print('%8i  %6i  %8i  %10.4f  %12s  %10s  %12.4f  %s'
+              % (nplayers, nteams, *lns, *monolithic))
@@ -0,0 +1,97 @@
+"""
+Load test a running /make-teams endpoint at 1 to 64 concurrent clients,
+reporting latency percentiles and throughput.
+
+    python flask_app.py &
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000/make-teams
+"""
+import argparse
+import collections
+import concurrent.futures as cf
+import json
+import pathlib
+import time
+import urllib.error
+import urllib.request
+
+# Custom imports
+import mister.__main__ as M
+
+
+Configs = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def _post(url: str, body: bytes):
+    request = urllib.request.Request(
+        url, data=body, method='POST',
+        headers={'Content-Type': 'application/json'})
+
+    start = time.perf_counter()
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = 0
+
+    return time.perf_counter() - start, status
+
+def _percentile(values, q: float) -> float:
+    values = sorted(values)
+
+    return values[min(len(values) - 1,
+                      int(q*len(values)))]
+
+def _run(url: str, body: bytes,
+         nclients: int, nrequests: int):
+    start = time.perf_counter()
+
+    with cf.ThreadPoolExecutor(nclients) as executor:
+        results = list(executor.map(lambda _: _post(url, body),
+                                    range(nrequests)))
+
+    walltime = time.perf_counter() - start
+
+    latencies = [r[0] for r in results]
+    statuses = collections.Counter(r[1] for r in results)
+
+    return latencies, statuses, walltime
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--url',
+                        default='http://127.0.0.1:8000/make-teams',
+                        help='URL of the /make-teams endpoint')
+    parser.add_argument('--conf', default='6-v-6_Castagna',
+                        help='Name of the configuration folder')
+    parser.add_argument('--requests', type=int, default=4,
+                        help='Number of requests per client')
+
+    args = parser.parse_args()
+
+    body = json.dumps(M._load_scenario_conf(
+        Configs / args.conf)).encode()
+
+    print('%7s  %8s  %8s  %8s  %8s  %s'
+          % ('clients', 'p50 (s)', 'p95 (s)', 'p99 (s)',
+             'req/s', 'statuses'))
+
+    for nclients in (1, 2, 4, 8, 16, 32, 64):
+        latencies, statuses, walltime = _run(
+            args.url, body, nclients,
+            nclients*args.requests)
+
+        print('%7i  %8.4f  %8.4f  %8.4f  %8.1f  %s'
+              % (nclients,
+                 _percentile(latencies, .50),
+                 _percentile(latencies, .95),
+                 _percentile(latencies, .99),
+                 len(latencies) / walltime,
+                 dict(sorted(statuses.items()))))
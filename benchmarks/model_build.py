@@ -0,0 +1,151 @@
+"""
+Compare the CP model build time of the per-constraint generator sums
+with the array-backed ModelBuilder on a large league.
+
+    python -m benchmarks.model_build
+"""
+import argparse
+import time
+import typing as t
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from benchmarks.roster import random_players
+from benchmarks.roster import synthetic_players
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+from mister.position import Position
+
+
+def _legacy_build_model(n: int,
+                        players: t.List[Player],
+                        formation: Formation):
+    """
+    Former model construction of Manager.make_teams.
+    """
+    if formation is not None:
+        n = formation.nplayers
+
+    nteams = len(players) // n
+    teams_ids = range(nteams)
+
+    players.sort(key=lambda p: p.rating)
+
+    players_top_n  = players[-nteams:]
+    players_flop_n = players[:nteams]
+
+    avg_rating_per_team = sum([p.rating for p
+                               in players])//nteams
+
+    model = cp_model.CpModel()
+    players_per_tid = {}
+
+    for p in players:
+        for tid in teams_ids:
+            players_per_tid[(p, tid)] = model.NewBoolVar(
+                'Player %s in team %d' % (p.name, tid))
+
+    e = model.NewIntVar(0, 100, 'epsilon')
+
+    for tid in teams_ids:
+        model.Add(sum(players_per_tid[(p, tid)]
+                      for p in players) == n)
+
+    for p in players:
+        model.Add(sum(players_per_tid[(p, tid)]
+                      for tid in teams_ids) == 1)
+
+    for tid in teams_ids:
+        trating = sum(players_per_tid[(p, tid)]*p.rating
+                      for p in players)
+
+        model.Add(trating >= avg_rating_per_team - e)
+        model.Add(trating <= avg_rating_per_team + e)
+
+    if formation is not None:
+        for k in Position:
+            for tid in teams_ids:
+                model.Add(sum(players_per_tid[(p, tid)]
+                              for p in players
+                              if p.position == k)
+                          == formation.quota(k))
+
+    for tid in teams_ids:
+        model.Add(sum(players_per_tid[(p, tid)]
+                      for p in players_top_n) == 1)
+
+    for tid in teams_ids:
+        model.Add(sum(players_per_tid[(p, tid)]
+                      for p in players_flop_n) == 1)
+
+    if formation is None:
+        for k in Position:
+            for i in range(nteams - 1):
+                for j in range(i + 1, nteams):
+                    nk_i = sum(players_per_tid[(p, i)] for p in players
+                               if p.position == k)
+                    nk_j = sum(players_per_tid[(p, j)] for p in players
+                               if p.position == k)
+
+                    b = [model.NewBoolVar('') for _ in range(3)]
+
+                    for d, v in zip((0, 1, -1), b):
+                        model.Add(nk_i == nk_j + d).OnlyEnforceIf(v)
+
+                    model.AddBoolOr(b)
+
+    model.Minimize(e)
+
+    return model
+
+def _timeit(build: t.Callable, repeat: int) -> float:
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--nteams', type=int, default=20,
+                        help='Number of teams')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed builds per case')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize('4-4-2')
+
+    cases = {
+        'formation %s' % formation:
+            (formation.nplayers, formation,
+             synthetic_players(args.nteams, formation)),
+        'no formation':
+            (formation.nplayers, None,
+             random_players(formation.nplayers*args.nteams)),
+    }
+
+    print('%i teams of %i players'
+          % (args.nteams, formation.nplayers))
+
+    print('%14s  %12s  %12s'
+          % ('case', 'legacy (s)', 'builder (s)'))
+
+    for name, (n, _formation, players) in cases.items():
+        legacy = _timeit(lambda: _legacy_build_model(
+            n, list(players), _formation), args.repeat)
+
+        builder = _timeit(lambda: Manager.build_model(
+            n, list(players), _formation), args.repeat)
+
+        print('%14s  %12.4f  %12.4f'
+              % (name, legacy, builder))
@@ -0,0 +1,79 @@
+"""
+Compare the per-request model build time of repeated same-shape requests,
+built from scratch or copied from a cached template and patched.
+
+    python -m benchmarks.model_template --requests 20
+"""
+import argparse
+import random
+import time
+import typing as t
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+from mister.template import ModelTemplates
+
+
+def _requests(nteams: int, formation: Formation,
+              nrequests: int) -> t.List[t.List[Player]]:
+    """
+    Rosters of the same shape with fresh ratings, e.g., a league whose
+    ratings are updated every week.
+    """
+    rng = random.Random(0)
+    base = synthetic_players(nteams, formation)
+
+    return [[Player(p.name, rng.randint(30, 100), p.position)
+             for p in base]
+            for _ in range(nrequests)]
+
+def _mean(requests: t.List[t.List[Player]],
+          formation: Formation,
+          templates: ModelTemplates = None) -> float:
+    elapsed = 0.
+
+    for players in requests:
+        start = time.perf_counter()
+        Manager.build_model(formation.nplayers, players, formation,
+                            templates=templates)
+        elapsed += time.perf_counter() - start
+
+    return elapsed / len(requests)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='4-4-2',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Number of requests per league size')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+
+    print('%8s  %8s  %14s  %14s  %8s'
+          % ('nteams', 'players', 'scratch (ms)',
+             'template (ms)', 'speedup'))
+
+    for nteams in [4, 10, 20, 40]:
+        requests = _requests(nteams, formation, args.requests)
+
+        scratch = _mean(requests, formation)
+
+        # The first request populates the cache
+        templates = ModelTemplates()
+        Manager.build_model(formation.nplayers, list(requests[0]),
+                            formation, templates=templates)
+
+        template = _mean(requests, formation, templates)
+
+        print('%8i  %8i  %14.2f  %14.2f  %7.1fx'
+              % (nteams, len(requests[0]), 1e3*scratch,
+                 1e3*template, scratch / template))
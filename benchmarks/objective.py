@@ -0,0 +1,91 @@
+"""
+Compare the balance and wall time of Manager.make_teams with epsilon alone
+and with the later stages of the lexicographic objective, i.e., the sum of
+the team deviations and that of the deviations of the rating per position.
+
+    python -m benchmarks.objective --time-limit 4 --workers 8
+"""
+import argparse
+import time
+import typing as t
+
+import numpy as np
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.config import SolverConfig
+from mister.constants import Objectives
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.position import Position
+from mister.solution import Solution
+
+
+def balance(solution: Solution) -> t.Tuple[int, int, int]:
+    """
+    Epsilon, sum of the team deviations and of those per position.
+    """
+    ratings = np.array([_t.rating for _t in solution.teams])
+    dev = np.abs(ratings - ratings.sum()//len(ratings))
+
+    position_dev = 0
+
+    for k in Position:
+        ratings = np.array([sum(p.rating for p in _t.players
+                                if p.position == k)
+                            for _t in solution.teams])
+
+        position_dev += int(np.abs(ratings - ratings.sum()//len(ratings))
+                              .sum())
+
+    return int(dev.max()), int(dev.sum()), position_dev
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--nteams', type=int, nargs='+', default=[4, 8, 12],
+                        help='Numbers of teams')
+    parser.add_argument('--seeds', type=int, default=3,
+                        help='Number of random rosters per size')
+    parser.add_argument('--time-limit', type=float, default=4.,
+                        help='Time budget of each solve in seconds')
+    parser.add_argument('--workers', type=int,
+                        help='Number of parallel search workers')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+
+    print('%6s  %10s  %8s  %8s  %12s  %10s'
+          % ('nteams', 'objective', 'epsilon', 'sum dev',
+             'position dev', 'time (s)'))
+
+    for nteams in args.nteams:
+        for objective in Objectives.values():
+            config = SolverConfig(time_limit=args.time_limit,
+                                  num_workers=args.workers,
+                                  random_seed=0,
+                                  objective=objective)
+
+            runs = []
+
+            for seed in range(args.seeds):
+                players = synthetic_players(nteams, formation, seed)
+
+                start = time.perf_counter()
+
+                solution = Manager.make_teams(formation.nplayers,
+                                              players, formation,
+                                              optimal=True,
+                                              config=config)
+
+                runs.append((*balance(solution),
+                             time.perf_counter() - start))
+
+            print('%6i  %10s  %8.1f  %8.1f  %12.1f  %10.3f'
+                  % (nteams, objective, *np.mean(runs, axis=0)))
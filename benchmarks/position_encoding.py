@@ -0,0 +1,113 @@
+"""
+Check that both encodings of the C7 position balancing accept the same
+solution sets on the bundled configs/, then compare their solve time on
+formation-free synthetic rosters.
+
+    python -m benchmarks.position_encoding
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+import mister.__main__ as M
+from benchmarks.roster import random_players
+from mister.constants import Encodings
+from mister.manager import Manager
+from mister.player import Player
+
+
+Configs = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+class _Enumerator(cp_model.CpSolverSolutionCallback):
+    def __init__(self, x):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+
+        self.__x = x
+        self.solutions = set()
+
+    def on_solution_callback(self):
+        self.solutions.add(tuple(
+            tuple(self.BooleanValue(v) for v in row)
+            for row in self.__x))
+
+def _solution_set(n: int, players, encoding: str):
+    builder, e = Manager.build_model(n, list(players), None,
+                                     position_encoding=encoding)
+
+    # Drop the objective and relax C3, so that every
+    # assignment allowed by C1-C8 is enumerated once.
+    builder.model.Proto().ClearField('objective')
+    builder.model.Add(e == builder.epsilon_bounds()[1])
+
+    enumerator = _Enumerator(builder.x)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.SolveWithSolutionCallback(builder.model, enumerator)
+
+    return enumerator.solutions
+
+def check_configs() -> bool:
+    valid = True
+
+    for dirpath in sorted(Configs.iterdir()):
+        scenario_conf = M._load_scenario_conf(dirpath)
+
+        n = int(scenario_conf['n'])
+        players = [Player.deserialize(p)
+                   for p in scenario_conf['players']]
+
+        solutions = {encoding: _solution_set(n, players, encoding)
+                     for encoding in Encodings.values()}
+
+        equal = len(set(map(frozenset, solutions.values()))) == 1
+        valid = valid and equal
+
+        print('%-16s %s solutions  %s'
+              % (dirpath.name,
+                 '/'.join(str(len(s)) for s in solutions.values()),
+                 'OK' if equal else 'MISMATCH'))
+
+    return valid
+
+def _solve_time(n: int, nteams: int,
+                encoding: str, seed: int) -> float:
+    players = random_players(n*nteams, seed)
+
+    start = time.perf_counter()
+
+    Manager.make_teams(n, players, None, optimal=True,
+                       position_encoding=encoding)
+
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--n', type=int, default=5,
+                        help='Number of players per team')
+    parser.add_argument('--max-nteams', type=int, default=10,
+                        help='Largest number of teams')
+
+    args = parser.parse_args()
+
+    if not check_configs():
+        sys.exit(1)
+
+    print('\n%6s' % 'nteams'
+          + ''.join('  %12s' % ('%s (s)' % encoding)
+                    for encoding in Encodings.values()))
+
+    for nteams in range(2, args.max_nteams + 1):
+        print('%6i' % nteams
+              + ''.join('  %12.4f' % _solve_time(args.n, nteams,
+                                                 encoding, nteams)
+                        for encoding in Encodings.values()))
@@ -0,0 +1,127 @@
+import random
+import typing as t
+
+# Custom imports
+from mister.constants import Ratings
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+
+
+def synthetic_players(nteams: int,
+                      formation: Formation,
+                      seed: int = 0) -> t.List[Player]:
+    """
+    Generate a random roster that fills Nteams with a given formation.
+
+    Parameters
+    ----------
+    nteams : int
+        Number of teams
+
+    formation : Formation
+        Formation of interest
+
+    seed : int
+        Seed of the random generator. The default is 0.
+    """
+    rng = random.Random(seed)
+    players = []
+
+    for k in Position:
+        for i in range(nteams*formation.quota(k)):
+            rating = rng.randint(Ratings['MIN'] + 30,
+                                 Ratings['MAX'])
+
+            players.append(Player('%s%i' % (k.value, i),
+                                  rating, k))
+
+    return players
+
+def random_players(nplayers: int,
+                   seed: int = 0) -> t.List[Player]:
+    """
+    Generate a random roster with random positions.
+
+    Parameters
+    ----------
+    nplayers : int
+        Number of players
+
+    seed : int
+        Seed of the random generator. The default is 0.
+    """
+    rng = random.Random(seed)
+    positions = list(Position)
+
+    return [Player('P%i' % i,
+                   rng.randint(Ratings['MIN'] + 30,
+                               Ratings['MAX']),
+                   rng.choice(positions))
+            for i in range(nplayers)]
+
+def skewed_scenario(nplayers: int,
+                    formation: Formation = None,
+                    skew: float = 0.,
+                    weights: t.Tuple[float, float, float] = (1., 1., 1.),
+                    n: int = 5,
+                    seed: int = 0) -> t.Dict[str, t.Any]:
+    """
+    Generate a random scenario conf as JSON.
+
+    Parameters
+    ----------
+    nplayers : int
+        Number of players, rounded down to a multiple of the team size
+
+    formation : Formation
+        Formation of interest, or None. The default is None.
+
+    skew : float
+        Skewness of the ratings, from 0 for uniform ratings
+        to a few highly rated players out of many low ones.
+        The default is 0.
+
+    weights : Tuple[float, float, float]
+        Relative frequency of defenders, midfielders and forwards
+        without a formation. The default is balanced.
+
+    n : int
+        Number of players per team without a formation. The default is 5.
+
+    seed : int
+        Seed of the random generator. The default is 0.
+    """
+    rng = random.Random(seed)
+
+    if formation is not None:
+        n = formation.nplayers
+
+    nteams = nplayers // n
+
+    if formation is not None:
+        positions = [k for k in Position
+                     for _ in range(nteams*formation.quota(k))]
+    else:
+        positions = rng.choices(list(Position), weights,
+                                k=nteams*n)
+
+    lo = Ratings['MIN'] + 30
+    hi = Ratings['MAX']
+
+    players = [{'name': '%s%i' % (k.value, i),
+                'rating': lo + int((hi - lo)*rng.random()**(1. + skew)),
+                'position': str(k)}
+               for i, k in enumerate(positions)]
+
+    conf = {
+        'n': n,
+        'nteams': nteams,
+        'players': players,
+        'optimal': True,
+    }
+
+    if formation is not None:
+        conf['formation'] = str(formation)
+
+    return conf
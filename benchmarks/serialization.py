@@ -0,0 +1,104 @@
+"""
+Compare the former serialization of solutions, reflecting on the attributes
+of every object, with the fast path over precomputed fields, and the JSON
+encoders of the serialized pool.
+
+    python -m benchmarks.serialization --nteams 30 --nsolutions 10000
+"""
+import argparse
+import json
+import random
+import time
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.encoder import orjson
+from mister.formation import Formation
+from mister.serializable import Serializable
+from mister.solution import Solution
+from mister.team import Team
+
+
+def _legacy(o: Serializable):
+    """
+    Former DictSerializable.serialize, with an isinstance check per value.
+    """
+    _D = {}
+
+    for k, v in o._items():
+        if isinstance(v, Serializable):
+            _D[k] = _legacy(v)
+        elif isinstance(v, list):
+            _D[k] = [_legacy(e) if isinstance(e, Serializable)
+                     else e for e in v]
+        else:
+            _D[k] = v
+
+    return _D
+
+def _pool(players, nteams: int,
+          nsolutions: int, seed: int = 0):
+    rng = random.Random(seed)
+    assignment = [i % nteams for i in range(len(players))]
+
+    pool = []
+
+    for _ in range(nsolutions):
+        rng.shuffle(assignment)
+
+        pool.append(Solution.create(rng.randrange(10), 300,
+                                    Team.from_assignment(players,
+                                                         assignment),
+                                    'optimal'))
+
+    return pool
+
+def _time(f, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    f(*args, **kwargs)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--nteams', type=int, default=30,
+                        help='Number of teams')
+    parser.add_argument('--nsolutions', type=int, default=10000,
+                        help='Number of serialized solutions')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+    players = synthetic_players(args.nteams, formation)
+
+    pool = _pool(players, args.nteams, args.nsolutions)
+
+    encodings = [s.serialize() for s in pool]
+
+    if [_legacy(s) for s in pool[:10]] != encodings[:10]:
+        raise AssertionError('The fast path encodes differently')
+
+    if [s.serialize() for s in pool[:10]] != encodings[:10]:
+        raise AssertionError('Serializing changed the solutions')
+
+    results = [
+        ('legacy serialize', _time(lambda: [_legacy(s) for s in pool])),
+        ('fast serialize', _time(lambda: [s.serialize() for s in pool])),
+        ('json indent=4', _time(json.dumps, encodings, indent=4)),
+        ('json compact', _time(json.dumps, encodings, separators=(',', ':'))),
+    ]
+
+    if orjson is not None:
+        results.append(('orjson compact', _time(orjson.dumps, encodings)))
+
+    print('%i solutions of %i players in %i teams'
+          % (args.nsolutions, len(players), args.nteams))
+
+    for name, seconds in results:
+        print('%24s  %10.3f s  %10.2f us per solution'
+              % (name, seconds, 1e6*seconds / args.nsolutions))
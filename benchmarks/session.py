@@ -0,0 +1,103 @@
+"""
+Compare a full solve after each roster edit with a session that only
+re-optimizes the teams the edit touches, on seeded synthetic leagues: the
+latency of each edit, and how many players changed team.
+
+    python -m benchmarks.session --nplayers 60 --edits 20
+"""
+import argparse
+import random
+import statistics
+import time
+
+# Custom imports
+from benchmarks.roster import skewed_scenario
+from mister.config import SolverConfig
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+from mister.session import Session
+
+
+def _moved(before, after) -> int:
+    teams = {p.name: _t.id for _t in before.teams
+                           for p in _t.players}
+
+    return sum(teams[p.name] != _t.id for _t in after.teams
+                                      for p in _t.players
+                                      if p.name in teams)
+
+def _report(name: str, latencies, moves, epsilons):
+    latencies = sorted(latencies)
+
+    print('%16s  %10.1f  %10.1f  %8.1f  %8.1f'
+          % (name, 1e3*statistics.median(latencies),
+             1e3*latencies[int(.95*(len(latencies) - 1))],
+             statistics.mean(moves), statistics.mean(epsilons)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--nplayers', type=int, default=60,
+                        help='Number of players')
+    parser.add_argument('--formation',
+                        help='Formation as "{D}-{M}-{F}", or none')
+    parser.add_argument('--edits', type=int, default=20,
+                        help='Number of players replaced one at a time')
+    parser.add_argument('--time-limit', type=float, default=5.,
+                        help='Time budget of each full solve in seconds')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the league and of the edits')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation) \
+                if args.formation is not None else None
+
+    conf = skewed_scenario(args.nplayers, formation, skew=1.,
+                           seed=args.seed)
+
+    players = [Player.deserialize(p) for p in conf['players']]
+    config = SolverConfig(args.time_limit, random_seed=args.seed)
+
+    session = Session(conf['n'], players, formation, config)
+
+    rng = random.Random(args.seed)
+    results = {'full solve': ([], [], []), 'session': ([], [], [])}
+
+    for i in range(args.edits):
+        out = rng.choice(session.players)
+        late = Player('Late %i' % i, rng.randint(20, 90), out.position)
+
+        before = session.solution
+
+        # A full solve of the edited roster, from scratch
+        roster = [p for p in session.players if p.name != out.name] \
+                 + [late]
+
+        start = time.perf_counter()
+        solution = Manager.make_teams(conf['n'], roster, formation,
+                                      optimal=True, config=config)
+        latency = time.perf_counter() - start
+
+        results['full solve'][0].append(latency)
+        results['full solve'][1].append(_moved(before, solution))
+        results['full solve'][2].append(round(100*(1 - solution.balance)))
+
+        start = time.perf_counter()
+        solution = session.replace(out.name, late)
+        latency = time.perf_counter() - start
+
+        results['session'][0].append(latency)
+        results['session'][1].append(len(session.moved))
+        results['session'][2].append(round(100*(1 - solution.balance)))
+
+    print('%i players, %i edits' % (args.nplayers, args.edits))
+    print('%16s  %10s  %10s  %8s  %8s'
+          % ('', 'p50 (ms)', 'p95 (ms)', 'moved', 'unbalance %'))
+
+    for name, (latencies, moves, epsilons) in results.items():
+        _report(name, latencies, moves, epsilons)
@@ -0,0 +1,139 @@
+"""
+Compare the per-solution cost of the former print-based SolutionPrinter
+with the SolutionCollector, while enumerating the feasible solutions of
+a synthetic league with a single search worker.
+
+    python -m benchmarks.solution_callback --nteams 6
+"""
+import argparse
+import contextlib
+import io
+import time
+import typing as t
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.collector import SolutionCollector
+from mister.constants import Ratings
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+from mister.team import Team
+
+
+class _LegacySolutionPrinter(cp_model.CpSolverSolutionCallback):
+    """
+    Former intermediate solutions printer of Manager.make_teams.
+    """
+    def __init__(self, players_per_tid: t.Dict[t.Tuple[Player, int],
+                                               cp_model.IntVar]):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+
+        self.__nsolutions = 0
+        self.__players_per_tid = players_per_tid
+        self.__solutions = []
+
+    def on_solution_callback(self):
+        if self.ObjectiveValue() <= int(Ratings['MAX']*0.32):
+            print('\nSolution %i with:' % self.__nsolutions)
+
+            self.__nsolutions += 1
+
+            solution = {ptid: self.Value(v) for ptid, v
+                        in self.__players_per_tid.items()}
+
+            self.__solutions.append(
+                (self.ObjectiveValue(),
+                solution))
+
+            print('    Objective value = %i\n'
+                % self.ObjectiveValue())
+
+            for _t in Team.from_associations(
+                    self.__players_per_tid, self):
+                print('    Team %i with rating = %i [\n' %
+                    (_t.id, _t.rating), end='')
+
+                for p in _t.players:
+                    print('        (%s,%s,%s)\n' %
+                        (p.name, p.rating, p.position), end='')
+
+                print('    ]')
+
+
+def _timed(callback: cp_model.CpSolverSolutionCallback):
+    """
+    Accumulate the time spent in the callback and its number of calls.
+    """
+    on_solution_callback = callback.on_solution_callback
+    timings = []
+
+    def _on_solution_callback():
+        start = time.perf_counter()
+        on_solution_callback()
+        timings.append(time.perf_counter() - start)
+
+    callback.on_solution_callback = _on_solution_callback
+
+    return timings
+
+def _run(nteams: int, formation: Formation,
+         time_limit: float, legacy: bool):
+    players = synthetic_players(nteams, formation)
+
+    builder, _ = Manager.build_model(formation.nplayers,
+                                     players, formation)
+
+    # Enumerate feasible solutions rather than improving ones only,
+    # so that the callback fires often
+    builder.model.Proto().ClearField('objective')
+
+    if legacy:
+        callback = _LegacySolutionPrinter(builder.players_per_tid)
+    else:
+        callback = SolutionCollector(builder.players,
+                                     builder.teams_of(),
+                                     builder.nteams)
+
+    timings = _timed(callback)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.max_time_in_seconds = time_limit
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver.SolveWithSolutionCallback(builder.model, callback)
+
+    return len(timings), sum(timings)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--nteams', type=int, default=6,
+                        help='Number of teams')
+    parser.add_argument('--time-limit', type=float, default=5.,
+                        help='Time budget of each enumeration in seconds')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+
+    print('%10s  %10s  %14s  %14s'
+          % ('callback', 'solutions', 'total (s)', 'per call (us)'))
+
+    for name, legacy in [('printer', True),
+                         ('collector', False)]:
+        nsolutions, total = _run(args.nteams, formation,
+                                 args.time_limit, legacy)
+
+        print('%10s  %10i  %14.4f  %14.1f'
+              % (name, nsolutions, total,
+                 1e6*total / max(1, nsolutions)))
@@ -0,0 +1,308 @@
+"""
+Reproducible benchmark suite on seeded synthetic scenarios of 10 to 1000
+players, with skewed ratings, unbalanced positions, and with and without
+a formation.
+
+Each case is run end to end through mister.__main__.main, from the JSON
+scenario conf to the JSON solution, and through Manager.make_teams alone.
+The time spent in each phase and the CP-SAT statistics are read from the
+metrics registry, and written as JSON to compare across commits:
+
+    python -m benchmarks.suite run --output base.json
+    git checkout feature
+    python -m benchmarks.suite run --output head.json
+    python -m benchmarks.suite compare base.json head.json --threshold 0.2
+
+The comparison exits with 1 if any case got slower than the threshold.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pathlib
+import platform
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import typing as t
+
+# Custom imports
+import mister.__main__ as M
+from benchmarks.roster import skewed_scenario
+from mister.config import SolverConfig
+from mister.constants import Engines
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.manager import model_templates
+from mister.metrics import metrics
+from mister.player import Player
+
+
+# Name, number of players, formation, skew
+# of the ratings, weights of the positions
+Cases = [
+    ('10-uniform-2-2-1', 10, '2-2-1', 0., None),
+    ('30-skewed-2-2-1', 30, '2-2-1', 2., None),
+    ('30-unbalanced', 30, None, 0., (3., 1., 1.)),
+    ('60-skewed-3-2-1', 60, '3-2-1', 2., None),
+    ('100-uniform', 100, None, 0., None),
+    ('100-skewed-unbalanced', 100, None, 3., (1., 3., 1.)),
+    ('200-uniform-2-2-1', 200, '2-2-1', 0., None),
+    ('500-skewed-2-2-1', 500, '2-2-1', 2., None),
+    ('1000-uniform', 1000, None, 0., None),
+]
+
+# Larger leagues are left to the large neighbourhood search
+LNS_nplayers = 500
+
+Runners = ['main', 'manager']
+
+
+def _scenario(nplayers: int, _formation: str,
+              skew: float, weights: t.Tuple[float, ...],
+              seed: int) -> t.Dict[str, t.Any]:
+    formation = Formation.deserialize(_formation) \
+                if _formation is not None else None
+
+    return skewed_scenario(nplayers, formation, skew,
+                           weights or (1., 1., 1.), seed=seed)
+
+def _run_main(conf: t.Dict[str, t.Any],
+              config: SolverConfig):
+    M.fromjson(conf, config)
+
+def _run_manager(conf: t.Dict[str, t.Any],
+                 config: SolverConfig):
+    players = [Player.deserialize(p)
+               for p in conf['players']]
+
+    formation = Formation.deserialize(conf['formation']) \
+                if 'formation' in conf else None
+
+    Manager.make_teams(conf['n'], players, formation,
+                       optimal=True, config=config)
+
+def _py_spy(path: pathlib.Path) -> subprocess.Popen:
+    """
+    Sample the stack of this process with py-spy until terminated.
+    """
+    return subprocess.Popen(['py-spy', 'record', '--pid', str(os.getpid()),
+                             '--output', str(path), '--nonblocking'],
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+
+def _run_case(name: str, runner: str,
+              conf: t.Dict[str, t.Any],
+              config: SolverConfig,
+              repeat: int,
+              profile: pathlib.Path = None,
+              py_spy: pathlib.Path = None) -> t.Dict[str, t.Any]:
+    run = _run_main if runner == 'main' \
+          else _run_manager
+
+    walltimes = []
+    phases = {}
+
+    for i in range(repeat):
+        # Every run builds its model from scratch
+        model_templates.clear()
+        metrics.reset()
+
+        profiler = cProfile.Profile() \
+                   if profile is not None and i == 0 else None
+
+        sampler = _py_spy(py_spy / ('%s-%s.svg' % (name, runner))) \
+                  if py_spy is not None and i == 0 else None
+
+        start = time.perf_counter()
+
+        if profiler is not None:
+            profiler.runcall(run, conf, config)
+        else:
+            run(conf, config)
+
+        walltimes.append(time.perf_counter() - start)
+
+        if profiler is not None:
+            profiler.dump_stats(str(profile / ('%s-%s.prof'
+                                               % (name, runner))))
+
+        if sampler is not None:
+            sampler.send_signal(signal.SIGINT)
+            sampler.wait()
+
+        stats = metrics.stats()
+
+        for phase, timer in stats['phases'].items():
+            phases.setdefault(phase, []).append(timer['seconds'])
+
+    # Solver statistics of the last run
+    counters = stats['counters']
+
+    return {
+        'walltime': statistics.median(walltimes),
+        'walltimes': walltimes,
+        'phases': {phase: statistics.median(seconds)
+                   for phase, seconds in phases.items()},
+        'status': counters.get('solves'),
+        'solutions': counters.get('solutions', 0),
+        'conflicts': counters.get('conflicts', 0),
+        'branches': counters.get('branches', 0),
+        'model_variables': stats['gauges'].get('model_variables'),
+        'model_constraints': stats['gauges'].get('model_constraints'),
+    }
+
+def _revision() -> t.Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args: argparse.Namespace):
+    import ortools
+
+    cases = [c for c in Cases
+             if not args.cases
+                or any(p in c[0] for p in args.cases)]
+
+    for path in [args.profile, args.py_spy]:
+        if path is not None:
+            path.mkdir(parents=True, exist_ok=True)
+
+    if args.py_spy is not None \
+            and shutil.which('py-spy') is None:
+        sys.exit('py-spy is not installed')
+
+    metrics.enable()
+
+    results = {
+        'revision': _revision(),
+        'created': time.time(),
+        'python': platform.python_version(),
+        'ortools': ortools.__version__,
+        'time_limit': args.time_limit,
+        'num_workers': args.workers,
+        'seed': args.seed,
+        'cases': {},
+    }
+
+    print('%24s  %8s  %10s  %s'
+          % ('case', 'runner', 'time (s)', 'phases (s)'))
+
+    for name, nplayers, _formation, skew, weights in cases:
+        conf = _scenario(nplayers, _formation, skew, weights,
+                         args.seed)
+
+        config = SolverConfig(args.time_limit, args.workers,
+                              random_seed=args.seed,
+                              engine=Engines['LNS']
+                                     if nplayers >= LNS_nplayers
+                                     else None)
+
+        for runner in Runners:
+            result = _run_case(name, runner, conf, config,
+                               args.repeat, args.profile,
+                               args.py_spy)
+
+            results['cases']['%s/%s' % (name, runner)] = result
+
+            print('%24s  %8s  %10.4f  %s'
+                  % (name, runner, result['walltime'],
+                     ', '.join('%s %.4f' % p for p
+                               in result['phases'].items())))
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+def compare(args: argparse.Namespace):
+    with open(args.base) as f:
+        base = json.load(f)
+
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print('%34s  %10s  %10s  %8s'
+          % ('case', 'base (s)', 'head (s)', 'ratio'))
+
+    regressions = []
+
+    for case, result in head['cases'].items():
+        if case not in base['cases']:
+            continue
+
+        before = base['cases'][case]['walltime']
+        after = result['walltime']
+
+        ratio = after / before if before > 0 \
+                else float('inf')
+
+        # Sub-millisecond cases are only noise
+        slower = ratio > 1. + args.threshold \
+                 and after - before > args.min_seconds
+
+        if slower:
+            regressions.append(case)
+
+        print('%34s  %10.4f  %10.4f  %7.2fx%s'
+              % (case, before, after, ratio,
+                 '  REGRESSION' if slower else ''))
+
+    if regressions:
+        print('%i of %i cases are more than %i%% slower'
+              % (len(regressions), len(head['cases']),
+                 100*args.threshold))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    parser_run = commands.add_parser('run',
+                                     help='Run the benchmark cases')
+
+    parser_run.add_argument('--cases', nargs='*',
+                            help='Run the cases whose name contains any of these')
+    parser_run.add_argument('--repeat', type=int, default=3,
+                            help='Number of runs per case, the median is kept')
+    parser_run.add_argument('--time-limit', type=float, default=5.,
+                            help='Time budget of each search in seconds')
+    parser_run.add_argument('--workers', type=int, default=8,
+                            help='Number of parallel search workers')
+    parser_run.add_argument('--seed', type=int, default=0,
+                            help='Seed of the scenarios and of the search')
+    parser_run.add_argument('--output',
+                            help='Path of the JSON results')
+    parser_run.add_argument('--profile', type=pathlib.Path,
+                            help='Folder of a cProfile dump per case')
+    parser_run.add_argument('--py-spy', type=pathlib.Path,
+                            help='Folder of a py-spy flame graph per case')
+
+    parser_compare = commands.add_parser('compare',
+                                         help='Compare two JSON results')
+
+    parser_compare.add_argument('base',
+                                help='Path of the baseline JSON results')
+    parser_compare.add_argument('head',
+                                help='Path of the JSON results to check')
+    parser_compare.add_argument('--threshold', type=float, default=.2,
+                                help='Relative slowdown of a regression')
+    parser_compare.add_argument('--min-seconds', type=float, default=.005,
+                                help='Absolute slowdown of a regression')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
@@ -0,0 +1,108 @@
+"""
+Compare wall time, branch count and status of Manager.make_teams with and
+without symmetry breaking, on the bundled configs and on synthetic rosters
+of 2 to 14 teams. Times are the median and mean over the random rosters of
+each size, as a few of them dominate the mean.
+
+    python -m benchmarks.symmetry_breaking --seeds 6 --time-limit 10
+"""
+import argparse
+import json
+import pathlib
+import statistics
+import time
+
+# Custom imports
+from benchmarks.roster import synthetic_players
+from mister.collector import SolutionListener
+from mister.config import SolverConfig
+from mister.constants import Filenames
+from mister.constants import Statuses
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+
+
+Configs = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+class _StatsListener(SolutionListener):
+    def __init__(self):
+        self.stats = {}
+
+    def on_finish(self, stats):
+        self.stats = stats
+
+
+def _rosters(nteams, formation: Formation, seeds: int):
+    for dirpath in sorted(Configs.iterdir()):
+        with open(str(dirpath / Filenames['CONF'])) as f:
+            scenario_conf = json.load(f)
+
+        yield dirpath.name, \
+              [[Player.deserialize(p) for p in scenario_conf['players']]], \
+              Formation.deserialize(scenario_conf['formation'])
+
+    for _nteams in nteams:
+        yield '%i teams' % _nteams, \
+              [synthetic_players(_nteams, formation, seed)
+               for seed in range(seeds)], \
+              formation
+
+def _run(players, formation: Formation,
+         symmetry_breaking: bool, config: SolverConfig):
+    listener = _StatsListener()
+
+    start = time.perf_counter()
+
+    solutions = Manager.make_solutions(formation.nplayers, list(players),
+                                       formation, symmetry_breaking,
+                                       config=config, listener=listener)
+
+    walltime = time.perf_counter() - start
+
+    return walltime, listener.stats['branches'], \
+           solutions[0].status == Statuses['OPTIMAL']
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation as "{D}-{M}-{F}"')
+    parser.add_argument('--nteams', type=int, nargs='+',
+                        default=[2, 3, 4, 5, 6, 7, 8, 10, 12, 14],
+                        help='Numbers of teams of the synthetic rosters')
+    parser.add_argument('--seeds', type=int, default=6,
+                        help='Number of random rosters per size')
+    parser.add_argument('--time-limit', type=float, default=10.,
+                        help='Time budget of each solve in seconds')
+
+    args = parser.parse_args()
+
+    formation = Formation.deserialize(args.formation)
+
+    config = SolverConfig(time_limit=args.time_limit, random_seed=0)
+
+    print('%20s  %16s  %10s  %8s  %16s  %10s  %8s'
+          % ('roster', 'off time (s)', 'off branch', 'optimal',
+             'on time (s)', 'on branch', 'optimal'))
+
+    for name, rosters, _formation in _rosters(args.nteams, formation,
+                                              args.seeds):
+        results = {}
+
+        for symmetry_breaking in (False, True):
+            runs = [_run(players, _formation, symmetry_breaking, config)
+                    for players in rosters]
+
+            results[symmetry_breaking] = (
+                statistics.median(r[0] for r in runs),
+                statistics.mean(r[0] for r in runs),
+                sum(r[1] for r in runs) // len(runs),
+                '%i/%i' % (sum(r[2] for r in runs), len(runs)))
+
+        print('%20s  %7.3f / %6.3f  %10i  %8s  %7.3f / %6.3f  %10i  %8s'
+              % (name, *results[False], *results[True]))
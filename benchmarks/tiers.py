@@ -0,0 +1,113 @@
+"""
+Compare the model size, wall time and balance of Manager.make_teams with
+C5 and C6, with k quantile tiers by rating in their place, and with a
+tolerance on the rating per position of each team, on the bundled configs
+and on synthetic rosters.
+
+    python -m benchmarks.tiers --tiers 3 5 --tolerance 50
+"""
+import argparse
+import json
+import pathlib
+import time
+import typing as t
+
+# Custom imports
+from benchmarks.objective import balance
+from benchmarks.roster import synthetic_players
+from mister.config import SolverConfig
+from mister.constants import Filenames
+from mister.errors import InfeasibleScenarioError
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+
+
+Configs = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def _rosters(nteams: t.List[int], formation: Formation):
+    for dirpath in sorted(Configs.iterdir()):
+        with open(str(dirpath / Filenames['CONF'])) as f:
+            scenario_conf = json.load(f)
+
+        yield dirpath.name, \
+              [Player.deserialize(p) for p in scenario_conf['players']], \
+              Formation.deserialize(scenario_conf['formation'])
+
+    for _nteams in nteams:
+        yield '%i teams' % _nteams, \
+              synthetic_players(_nteams, formation), \
+              formation
+
+def _run(players, formation: Formation,
+         config: SolverConfig):
+    builder, _ = Manager.build_model(formation.nplayers, list(players),
+                                     formation,
+                                     tiers=config.tiers,
+                                     position_tolerance=
+                                         config.position_tolerance)
+
+    proto = builder.model.Proto()
+
+    start = time.perf_counter()
+
+    try:
+        solution = Manager.make_teams(formation.nplayers, list(players),
+                                      formation, optimal=True,
+                                      config=config)
+    except InfeasibleScenarioError:
+        solution = None
+
+    walltime = time.perf_counter() - start
+
+    return len(proto.variables), len(proto.constraints), walltime, \
+           balance(solution) if solution is not None else None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--formation', default='2-2-1',
+                        help='Formation of the synthetic rosters')
+    parser.add_argument('--nteams', type=int, nargs='+', default=[4, 8, 12],
+                        help='Numbers of teams of the synthetic rosters')
+    parser.add_argument('--tiers', type=int, nargs='+', default=[3, 5],
+                        help='Numbers of quantile tiers')
+    parser.add_argument('--tolerance', type=int, default=50,
+                        help='Tolerance on the rating per position')
+    parser.add_argument('--time-limit', type=float, default=4.,
+                        help='Time budget of each solve in seconds')
+    parser.add_argument('--workers', type=int,
+                        help='Number of parallel search workers')
+
+    args = parser.parse_args()
+
+    variants = [('C5 and C6', {})] \
+               + [('%i tiers' % k, {'tiers': k}) for k in args.tiers] \
+               + [('tolerance', {'position_tolerance': args.tolerance}),
+                  ('%i tiers, tolerance' % args.tiers[-1],
+                   {'tiers': args.tiers[-1],
+                    'position_tolerance': args.tolerance})]
+
+    print('%20s  %20s  %6s  %6s  %8s  %8s  %8s  %12s'
+          % ('roster', 'constraints', 'vars', 'cons', 'time (s)',
+             'epsilon', 'sum dev', 'position dev'))
+
+    formation = Formation.deserialize(args.formation)
+
+    for name, players, _formation in _rosters(args.nteams, formation):
+        for variant, kwargs in variants:
+            config = SolverConfig(time_limit=args.time_limit,
+                                  num_workers=args.workers,
+                                  random_seed=0, **kwargs)
+
+            nvariables, nconstraints, walltime, result = \
+                _run(players, _formation, config)
+
+            print('%20s  %20s  %6i  %6i  %8.3f  %s'
+                  % (name, variant, nvariables, nconstraints, walltime,
+                     '%8i  %8i  %12i' % result if result is not None
+                     else '%30s' % 'infeasible'))
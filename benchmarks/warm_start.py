@@ -0,0 +1,141 @@
+"""
+Compare the time to a good solution of cold and warm-started solves after
+small edits of the configs/6-v-6_Castagna roster, i.e., one changed rating
+and one player replaced by a weaker newcomer, and how many players changed
+team since the previous solution.
+
+    python -m benchmarks.warm_start --scale 4
+"""
+import argparse
+import collections
+import copy
+import pathlib
+import time
+
+# Custom imports
+import mister.__main__ as M
+from mister.config import SolverConfig
+
+
+Configs = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def _scaled(scenario_conf, scale: int):
+    """
+    Replicate the roster, so that there are scale times as many teams.
+    """
+    scenario_conf = copy.deepcopy(scenario_conf)
+
+    scenario_conf['nteams'] = int(scenario_conf['nteams'])*scale
+    scenario_conf['players'] = [dict(p, name='%s %i' % (p['name'], i))
+                                for i in range(scale)
+                                for p in scenario_conf['players']]
+
+    return scenario_conf
+
+def _solve(scenario_conf, config: SolverConfig = None):
+    start = time.perf_counter()
+
+    solution = M.fromjson(scenario_conf, config)
+
+    return time.perf_counter() - start, solution
+
+def _epsilon(solution, scenario_conf) -> int:
+    avg_rating = sum(int(p['rating']) for p
+                     in scenario_conf['players']) \
+                 // scenario_conf['nteams']
+
+    return max(abs(sum(int(p['rating']) for p in _t['players'])
+                   - avg_rating)
+               for _t in solution['teams'])
+
+def _moved(previous, solution) -> int:
+    """
+    Players who changed team, each new team standing for the previous
+    one most of its players come from.
+    """
+    teams = {p['name']: _t['id'] for _t in previous['teams']
+                                 for p in _t['players']}
+
+    moved = 0
+
+    for _t in solution['teams']:
+        tids = [teams[p['name']] for p in _t['players']
+                if p['name'] in teams]
+
+        if tids:
+            moved += len(tids) - collections.Counter(tids) \
+                                            .most_common(1)[0][1]
+
+    return moved
+
+def _edits(scenario_conf):
+    edited = copy.deepcopy(scenario_conf)
+    edited['players'][0]['rating'] = min(
+        100, int(edited['players'][0]['rating']) + 10)
+
+    yield 'changed rating', edited
+
+    edited = copy.deepcopy(scenario_conf)
+    edited['players'][-1] = dict(edited['players'][-1],
+                                 name='Newcomer',
+                                 rating=max(0, int(edited['players'][-1]
+                                                   ['rating']) - 10))
+
+    yield 'replaced player', edited
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--scale', type=int, default=4,
+                        help='Number of copies of the roster')
+    parser.add_argument('--seeds', type=int, default=3,
+                        help='Number of solver seeds per edit')
+    parser.add_argument('--time-limit', type=float, default=10.,
+                        help='Time budget of each solve in seconds')
+
+    args = parser.parse_args()
+
+    scenario_conf = _scaled(M._load_scenario_conf(
+        Configs / '6-v-6_Castagna'), args.scale)
+
+    scenario_conf['optimal'] = True
+
+    reference = SolverConfig(time_limit=args.time_limit)
+
+    _, previous = _solve(scenario_conf, reference)
+
+    print('%16s  %8s  %12s  %12s  %10s  %10s'
+          % ('edit', 'epsilon', 'cold (s)', 'warm (s)',
+             'cold moved', 'warm moved'))
+
+    for name, edited in _edits(scenario_conf):
+        # Target the best epsilon of the edited roster
+        _, best = _solve(edited, reference)
+
+        epsilon = _epsilon(best, edited)
+
+        warm = dict(edited, previous_solution=previous)
+
+        runs = {'cold': [], 'warm': []}
+
+        for seed in range(args.seeds):
+            config = SolverConfig(time_limit=args.time_limit,
+                                  random_seed=seed,
+                                  epsilon_threshold=epsilon)
+
+            for kind, conf in (('cold', edited), ('warm', warm)):
+                walltime, solution = _solve(conf, config)
+
+                runs[kind].append((walltime,
+                                   _moved(previous, solution)))
+
+        print('%16s  %8i  %12.4f  %12.4f  %10.1f  %10.1f'
+              % (name, epsilon,
+                 *[sum(r[0] for r in runs[kind]) / args.seeds
+                   for kind in runs],
+                 *[sum(r[1] for r in runs[kind]) / args.seeds
+                   for kind in runs]))
@@ -1,20 +1,31 @@
+import os
+import queue
+import threading
+import typing as t
+
 from flask import Flask
+from flask import Response
 from flask import request
 
 # Custom imports
 import mister.__main__ as M
+from mister.cache import ScenarioCache
+from mister.cache import SQLiteBackend
+from mister.config import SolverConfig
+from mister.encoder import Encoder
 from mister.errors import *
+from mister.listener import SolutionListener
+from mister.metrics import metrics
+from mister.service import Cache_CONF
+from mister.service import Client_ERRORS
+from mister.service import Executor_CONF
+from mister.service import Mister_KEYS
+from mister.service import Mister_KEYS_opt
+from mister.service import SolveExecutor
+from mister.service import Solver_LIMITS
+from mister.team import Team
 
 
-# Request keys for Mister API
-Mister_KEYS = [
-    'n', 'nteams', 'players'
-]
-
-Mister_KEYS_opt = [
-    'formation', 'optimal'
-]
-
 Methods = {
     'ALL': ['GET', 'POST', 'PUT',
             'DELETE', 'PATCH', 'HEAD'],
@@ -23,10 +34,42 @@ Methods = {
 }
 
 
+# Number of concurrent streamed solves,
+# run in threads of the app process
+Stream_CONF = {
+    'MAX_STREAMS': int(os.environ.get('MISTER_MAX_STREAMS', 2)),
+}
+
 app = Flask(__name__)
 
-@app.route('/make-teams', methods=Methods['ALL'])
-def make_teams():
+metrics.enable()
+
+_streams = threading.BoundedSemaphore(
+    Stream_CONF['MAX_STREAMS'])
+
+_executor = None
+
+def _get_executor() -> SolveExecutor:
+    # Created on first use, as worker processes
+    # are spawned and re-import this module
+    global _executor
+
+    if _executor is None:
+        backend = SQLiteBackend(Cache_CONF['PATH']) \
+                  if Cache_CONF['PATH'] else None
+
+        cache = ScenarioCache(backend,
+                              Cache_CONF['MAX_ENTRIES'],
+                              Cache_CONF['TTL'])
+
+        _executor = SolveExecutor(Executor_CONF['MAX_WORKERS'],
+                                  Executor_CONF['MAX_QUEUE'],
+                                  Executor_CONF['NCORES'],
+                                  cache)
+
+    return _executor
+
+def _check_request():
     if not request.method \
             in Methods['ALLOWED']:
         return {
@@ -48,15 +91,39 @@ def make_teams():
             'error': 'Unknown parameters'
                }, 400
 
+    return None
+
+@app.route('/make-teams', methods=Methods['ALL'])
+def make_teams():
+    error = _check_request()
+
+    if error is not None:
+        return error
+
+    scenario_data = request.json
+
     try:
-        return M.fromjson(scenario_data), 200
-    except (DuplicatePlayersError,
-            NoSolutionError,
-            InvalidFormationError,
-            InvalidRatingError,
-            NotEnoughPlayersError,
-            NotEnoughTotalPlayersError,
-            TooManyPlayersError) as e:
+        config = SolverConfig.deserialize(
+            scenario_data.get('solver', {})) \
+                .bounded(Solver_LIMITS['TIME_LIMIT'],
+                         Solver_LIMITS['NUM_WORKERS'])
+
+        pool = _get_executor().solve(
+            scenario_data, config,
+            config.time_limit + Executor_CONF['GRACE'])
+
+        # Compact, and with orjson if installed
+        return Response(Encoder.dumpb(pool), status=200,
+                        mimetype='application/json')
+    except QueueFullError as e:
+        return {
+            'error': str(e)
+               }, 429
+    except DeadlineExceededError as e:
+        return {
+            'error': str(e)
+               }, 503
+    except Client_ERRORS as e:
         return {
             'error': str(e)
                }, 400
@@ -65,6 +132,97 @@ def make_teams():
             'error': 'Unable to connect to the API.'
                }, 500
 
+@app.after_request
+def _count_response(response: Response) -> Response:
+    metrics.inc('http_responses', path=request.path,
+                status=str(response.status_code))
+
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    if _executor is not None:
+        metrics.set('pending_requests', _executor.npending)
+
+    return Response(metrics.to_prometheus(),
+                    mimetype='text/plain; version=0.0.4')
+
+class _EventListener(SolutionListener):
+    """
+    Intermediate solutions as Server-Sent Events.
+    """
+    def __init__(self, events: queue.Queue):
+        self.events = events
+
+    def on_solution(self, epsilon: int,
+                    teams: t.List[Team],
+                    walltime: float):
+        self.events.put(('solution', {
+            'epsilon': epsilon,
+            'elapsed': walltime,
+            'teams': [_t.serialize() for _t in teams],
+        }))
+
+    def on_finish(self, stats: t.Dict[str, t.Any]):
+        self.events.put(('stats', stats))
+
+@app.route('/make-teams/stream', methods=Methods['ALL'])
+def make_teams_stream():
+    error = _check_request()
+
+    if error is not None:
+        return error
+
+    scenario_data = request.json
+
+    try:
+        config = SolverConfig.deserialize(
+            scenario_data.get('solver', {})) \
+                .bounded(Solver_LIMITS['TIME_LIMIT'],
+                         Solver_LIMITS['NUM_WORKERS'])
+
+        kwargs = M.parse(scenario_data, config)
+    except Client_ERRORS as e:
+        return {
+            'error': str(e)
+               }, 400
+
+    if not _streams.acquire(blocking=False):
+        return {
+            'error': str(QueueFullError(Stream_CONF['MAX_STREAMS']))
+               }, 429
+
+    events = queue.Queue()
+    interrupt = threading.Event()
+
+    def _solve():
+        try:
+            M.make_pool(kwargs['n'], kwargs['nteams'],
+                        kwargs['_players'], kwargs['_formation'],
+                        kwargs['config'], kwargs['previous'],
+                        _EventListener(events), interrupt)
+        except Client_ERRORS as e:
+            events.put(('error', {'error': str(e)}))
+        except Exception:
+            events.put(('error', {'error': 'Unable to connect to the API.'}))
+        finally:
+            events.put(None)
+            _streams.release()
+
+    threading.Thread(target=_solve, daemon=True).start()
+
+    def _stream():
+        try:
+            for event in iter(events.get, None):
+                yield 'event: %s\ndata: %s\n\n' \
+                      % (event[0], Encoder.dumps(event[1]))
+        finally:
+            # The client went away or the search is over
+            interrupt.set()
+
+    return Response(_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 if __name__ == '__main__':
     app.run(host='127.0.0.1',
             port=8000, debug=True)
@@ -1,19 +1,32 @@
 import argparse
+import glob
 import itertools as it
 import json
+import logging
 import pathlib
+import sys
+import threading
+import time
 import typing as t
 
 # Custom imports
+from mister.cache import ScenarioCache
+from mister.cache import SQLiteBackend
+from mister.config import SolverConfig
+from mister.encoder import Encoder
 from mister.constants import *
 from mister.errors import *
 from mister.formation import Formation
-from mister.manager import Manager
+from mister.listener import SolutionListener
+from mister.metrics import metrics
 from mister.player import Player
+from mister.solution import Solution
 from mister.types import *
 
     
-def fromjson(scenario_conf: JSON) \
+def fromjson(scenario_conf: JSON,
+             config: SolverConfig = None,
+             cache: ScenarioCache = None) \
             -> JSON:
     """
     Generate N equally matched football teams from JSON scenario conf.
@@ -22,6 +35,33 @@ def fromjson(scenario_conf: JSON) \
     ----------
     scenario_conf: JSON
         Encoded scenario conf as JSON
+
+    config : SolverConfig
+        Parameters of the CP-SAT solver, overriding those
+        in the scenario conf. The default is None.
+
+    cache : ScenarioCache
+        Cache of solution pools. The default is None.
+    """
+    with metrics.timer(Phases['PARSE']):
+        kwargs = parse(scenario_conf, config)
+
+    return main(**kwargs, cache=cache)
+
+def parse(scenario_conf: JSON,
+          config: SolverConfig = None) \
+         -> t.Dict[str, t.Any]:
+    """
+    Decode JSON scenario conf into the arguments of main.
+
+    Parameters
+    ----------
+    scenario_conf: JSON
+        Encoded scenario conf as JSON
+
+    config : SolverConfig
+        Parameters of the CP-SAT solver, overriding those
+        in the scenario conf. The default is None.
     """
     # Mandatory parameters
     n = int(scenario_conf['n'])
@@ -31,6 +71,7 @@ def fromjson(scenario_conf: JSON) \
     # Optional parameters
     _formation = None
     optimal = False
+    return_pool = False
 
     if 'formation' in scenario_conf:
         _formation = scenario_conf['formation']
@@ -40,13 +81,58 @@ def fromjson(scenario_conf: JSON) \
             scenario_conf['optimal']
             )
 
-    return main(n, nteams, _players,
-                _formation, optimal)
+    if 'return_pool' in scenario_conf:
+        return_pool = str2bool(
+            scenario_conf['return_pool']
+            )
+
+    if config is None \
+            and 'solver' in scenario_conf:
+        config = SolverConfig.deserialize(
+            scenario_conf['solver']
+            )
+
+    previous = None
+
+    if 'previous_solution' in scenario_conf:
+        previous = Solution.assignment(
+            scenario_conf['previous_solution']
+            )
+
+    return {
+        'n': n,
+        'nteams': nteams,
+        '_players': _players,
+        '_formation': _formation,
+        'optimal': optimal,
+        'config': config,
+        'previous': previous,
+        'return_pool': return_pool,
+    }
+
+def select(pool: t.List[JSON],
+           optimal: bool = False,
+           return_pool: bool = False) -> JSON:
+    """
+    Encoded response of a solution pool, either one of its solutions,
+    the best or a random one, or the whole pool, e.g., for clients that
+    rotate teams week to week without solving again.
+    """
+    if return_pool:
+        return {
+            'solutions': pool
+               }
+
+    return ScenarioCache.sample(pool, optimal)
 
 def main(n: int, nteams: int,
          _players: t.List[JSON],
          _formation: str = None,
-         optimal: bool = False) -> JSON:
+         optimal: bool = False,
+         config: SolverConfig = None,
+         cache: ScenarioCache = None,
+         previous: t.Dict[str, int] = None,
+         return_pool: bool = False) -> JSON:
     """
     Generate N equally matched football teams given a list of players, the group size n of
     an n-a-side football pitch, with n being either 5, 6, or 7, the formation and the number of teams N.
@@ -76,11 +162,188 @@ def main(n: int, nteams: int,
     optimal : bool
         Whether to return the optimal solution. The default is False.
 
+    config : SolverConfig
+        Parameters of the CP-SAT solver. The default is None.
+
+    cache : ScenarioCache
+        Cache of solution pools. The default is None.
+
+    previous : Dict[str, int]
+        Team Id of each player in a previous solution, used as hints
+        to warm-start the solver. The default is None.
+
+    return_pool : bool
+        Whether to return the whole solution pool as "solutions",
+        rather than one solution. The default is False.
+
     Returns
     -------
     JSON
         Encoded teams as JSON.
     """
+    pool = None
+
+    if cache is not None:
+        key = ScenarioCache.key(n, nteams, _players,
+                                _formation, config, previous)
+
+        pool = cache.get(key)
+
+    if pool is None:
+        pool = make_pool(n, nteams, _players,
+                         _formation, config, previous)
+
+        if cache is not None:
+            cache.set(key, pool)
+
+    return select(pool, optimal, return_pool)
+
+def make_pool(n: int, nteams: int,
+              _players: t.List[JSON],
+              _formation: str = None,
+              config: SolverConfig = None,
+              previous: t.Dict[str, int] = None,
+              listener: SolutionListener = None,
+              interrupt: threading.Event = None) \
+             -> t.List[JSON]:
+    """
+    Generate a pool of good solutions, the best first.
+
+    See main for the parameters, and Manager.make_solutions
+    for the listener and interrupt ones.
+
+    Returns
+    -------
+    List[JSON]
+        Encoded solutions as JSON.
+    """
+    with metrics.timer(Phases['VALIDATE']):
+        players, formation = _deserialize(n, nteams, _players,
+                                          _formation)
+
+    # The solver is only loaded once a solve is due,
+    # so that invalid scenarios and cache hits skip it
+    from mister.manager import Manager
+
+    # Solve the SAT problem
+    solutions = Manager.make_solutions(n, players, formation,
+                                       config=config,
+                                       previous=previous,
+                                       listener=listener,
+                                       interrupt=interrupt)
+
+    with metrics.timer(Phases['SERIALIZE']):
+        return [s.serialize() for s in solutions]
+
+def fromjson_many(scenario_confs: t.Iterable[JSON],
+                  config: SolverConfig = None,
+                  max_workers: int = None,
+                  ncores: int = None) \
+                 -> t.Iterator[t.Tuple[int, JSON]]:
+    """
+    Generate the teams of many JSON scenario confs at once.
+
+    A scenario that cannot be solved, e.g., for lack of players, is
+    reported as an error without stopping the others.
+
+    Parameters
+    ----------
+    scenario_confs : Iterable[JSON]
+        Encoded scenario confs as JSON
+
+    config : SolverConfig
+        Parameters of the CP-SAT solver, overriding those
+        in the scenario confs. The default is None.
+
+    max_workers : int
+        Number of worker processes. The default is the number of cores.
+
+    ncores : int
+        Number of cores to share among the worker processes.
+        The default is the number of cores of the machine.
+
+    Returns
+    -------
+    Iterator[Tuple[int, JSON]]
+        Index of each scenario conf and its encoded result as JSON,
+        with either a solution or an error, as they complete.
+    """
+    indices = []
+    scenarios = []
+
+    for i, scenario_conf in enumerate(scenario_confs):
+        try:
+            kwargs = parse(scenario_conf, config)
+
+            players, formation = _deserialize(
+                kwargs['n'], kwargs['nteams'],
+                kwargs['_players'], kwargs['_formation'])
+        except Exception as e:
+            yield i, _encode_result(e, 0.)
+            continue
+
+        indices.append(i)
+        scenarios.append({
+            'n': kwargs['n'],
+            'players': players,
+            'formation': formation,
+            'optimal': kwargs['optimal'],
+            'config': kwargs['config'],
+            'previous': kwargs['previous'],
+        })
+
+    if not scenarios:
+        return
+
+    from mister.manager import Manager
+
+    for j, result, walltime in Manager.make_teams_many(
+            scenarios, max_workers, ncores):
+        yield indices[j], _encode_result(result, walltime)
+
+def _encode_result(result: t.Union[Solution, Exception],
+                   walltime: float) -> JSON:
+    if isinstance(result, Exception):
+        return {
+            'error': type(result).__name__,
+            'message': str(result),
+            'walltime': round(walltime, 3),
+        }
+
+    return {
+        'solution': result.serialize(),
+        'walltime': round(walltime, 3),
+    }
+
+def _summary(walltimes: t.List[float],
+             nfailed: int,
+             elapsed: float) -> t.Dict[str, t.Any]:
+    """
+    Aggregate throughput and latency of a batch run.
+    """
+    def _percentile(q: float) -> float:
+        values = sorted(walltimes)
+
+        return values[min(len(values) - 1,
+                          int(q*len(values)))] \
+               if values else 0.
+
+    return {
+        'scenarios': len(walltimes) + nfailed,
+        'solved': len(walltimes),
+        'failed': nfailed,
+        'elapsed': round(elapsed, 3),
+        'throughput': round(len(walltimes) / elapsed, 3)
+                      if elapsed > 0 else 0.,
+        'p50': round(_percentile(.50), 3),
+        'p95': round(_percentile(.95), 3),
+        'max': round(max(walltimes, default=0.), 3),
+    }
+
+def _deserialize(n: int, nteams: int,
+                 _players: t.List[JSON],
+                 _formation: str = None) \
+                -> t.Tuple[t.List[Player], Formation]:
     # Deserialize the formation
     formation = Formation.deserialize(_formation) \
                 if _formation is not None else None
@@ -91,10 +354,7 @@ def main(n: int, nteams: int,
 
     _check_valid(n, nteams, players, formation)
 
-    # Solve the SAT problem
-    return Manager.make_teams(
-        n, players, formation, optimal) \
-                  .serialize()
+    return players, formation
 
 def _check_valid(n: int, nteams: int,
                  players: t.List[Player],
@@ -131,8 +391,7 @@ def _check_valid(n: int, nteams: int,
                     0, formation, k, nteams)
 
             ngiven = players_per_position[k]
-            nvalid = nteams*formation \
-                            .__dict__[k.name]
+            nvalid = nteams*formation.quota(k)
 
             if ngiven > nvalid:
                 raise TooManyPlayersError(
@@ -166,20 +425,220 @@ def _load_scenario_conf(dirpath: pathlib.Path) \
 
     return scenario_conf
 
+def _load_scenario_confs(paths: t.List[str]) \
+                        -> t.Iterator[t.Tuple[str, t.Any]]:
+    """
+    Load the scenario confs of configuration folders, glob patterns
+    of them, or JSONL files with one scenario conf per line.
+
+    Each one is paired with its name, or with the error
+    that prevented loading it in place of the conf.
+    """
+    for path in paths:
+        if path.endswith('.jsonl'):
+            try:
+                with open(path) as fh:
+                    lines = fh.readlines()
+            except OSError as e:
+                yield path, e
+                continue
+
+            for lineno, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+
+                try:
+                    yield '%s:%i' % (path, lineno), json.loads(line)
+                except ValueError as e:
+                    yield '%s:%i' % (path, lineno), e
+
+            continue
+
+        for dirpath in sorted(glob.glob(path)) or [path]:
+            try:
+                yield dirpath, _load_scenario_conf(
+                    pathlib.Path(dirpath).absolute())
+            except (OSError, ValueError) as e:
+                yield dirpath, e
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
         description=__doc__
     )
 
     parser.add_argument(
-        'conf_dirpath',
-        help='Name of the configuration folder'
+        'conf_dirpath', nargs='+',
+        help='Name of the configuration folder, or several of them, '
+             'glob patterns or JSONL files of scenario confs in batch'
+    )
+
+    parser.add_argument(
+        '--time-limit', type=float,
+        help='Time budget of the search in seconds'
+    )
+
+    parser.add_argument(
+        '--workers', type=int,
+        help='Number of parallel search workers'
+    )
+
+    parser.add_argument(
+        '--seed', type=int,
+        help='Seed of the search'
+    )
+
+    parser.add_argument(
+        '--linearization-level', type=int,
+        choices=[0, 1, 2],
+        help='Linearization level of the constraints'
+    )
+
+    parser.add_argument(
+        '--epsilon-threshold', type=int,
+        help='Stop at the first solution within this epsilon'
+    )
+
+    parser.add_argument(
+        '--engine', choices=list(Engines.values()),
+        help='Solver engine, "heuristic" alone for the lowest latency, '
+             'or "lns" for large leagues'
+    )
+
+    parser.add_argument(
+        '--pool-size', type=int,
+        help='Number of distinct solutions to generate in one session'
+    )
+
+    parser.add_argument(
+        '--pool-epsilon', type=int,
+        help='Tolerance on epsilon above the best solution of a pool'
+    )
+
+    parser.add_argument(
+        '--min-distance', type=int,
+        help='Minimum number of players in another team between solutions'
+    )
+
+    parser.add_argument(
+        '--objective', choices=list(Objectives.values()),
+        help='Last stage of the lexicographic objective, "deviation" or '
+             '"positions" to break ties on epsilon'
+    )
+
+    parser.add_argument(
+        '--tiers', type=int,
+        help='Number of quantile tiers by rating spread over the teams, '
+             'in place of C5 and C6'
+    )
+
+    parser.add_argument(
+        '--position-tolerance', type=int,
+        help='Largest deviation of the rating per position of each team'
+    )
+
+    parser.add_argument(
+        '--cache',
+        help='Path of an SQLite cache of solution pools'
+    )
+
+    parser.add_argument(
+        '--log-level', default='INFO',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        help='Verbosity of the solver log, DEBUG for every solution'
+    )
+
+    parser.add_argument(
+        '--jobs', type=int,
+        help='Number of scenarios solved at once in batch'
+    )
+
+    parser.add_argument(
+        '--cores', type=int,
+        help='Number of cores shared by the scenarios in batch'
+    )
+
+    parser.add_argument(
+        '--output',
+        help='Path of the JSONL results in batch. The default is stdout'
     )
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=args.log_level,
+                        format='%(message)s')
+
+    # Command line solver parameters
+    # override those in the scenario conf
+    _solver = {k: v for k, v
+               in [('time_limit', args.time_limit),
+                   ('num_workers', args.workers),
+                   ('random_seed', args.seed),
+                   ('linearization_level', args.linearization_level),
+                   ('epsilon_threshold', args.epsilon_threshold),
+                   ('engine', args.engine),
+                   ('pool_size', args.pool_size),
+                   ('pool_epsilon', args.pool_epsilon),
+                   ('min_distance', args.min_distance),
+                   ('objective', args.objective),
+                   ('tiers', args.tiers),
+                   ('position_tolerance', args.position_tolerance)]
+               if v is not None}
+
+    batch = len(args.conf_dirpath) > 1 \
+            or args.conf_dirpath[0].endswith('.jsonl') \
+            or glob.has_magic(args.conf_dirpath[0])
+
+    if batch:
+        output = open(args.output, 'w') if args.output \
+                 else sys.stdout
+
+        start = time.perf_counter()
+
+        names = []
+        scenario_confs = []
+        results = []
+
+        for name, scenario_conf \
+                in _load_scenario_confs(args.conf_dirpath):
+            if isinstance(scenario_conf, Exception):
+                results.append((name, _encode_result(
+                    scenario_conf, 0.)))
+                continue
+
+            if isinstance(scenario_conf, dict):
+                scenario_conf = dict(scenario_conf, solver=dict(
+                    scenario_conf.get('solver') or {}, **_solver))
+
+            names.append(name)
+            scenario_confs.append(scenario_conf)
+
+        # Stream each result as soon as it completes
+        for name, result in results:
+            output.write(Encoder.dumps(dict(scenario=name,
+                                            **result)) + '\n')
+
+        for i, result in fromjson_many(scenario_confs,
+                                       max_workers=args.jobs,
+                                       ncores=args.cores):
+            results.append((names[i], result))
+
+            output.write(Encoder.dumps(dict(scenario=names[i],
+                                            **result)) + '\n')
+            output.flush()
+
+        if output is not sys.stdout:
+            output.close()
+
+        logging.info('Batch summary: %s', json.dumps(
+            _summary([r['walltime'] for _, r in results
+                      if 'error' not in r],
+                     sum('error' in r for _, r in results),
+                     time.perf_counter() - start)))
+
+        sys.exit(0)
+
     conf_dirpath = pathlib.Path(
-        args.conf_dirpath).absolute()
+        args.conf_dirpath[0]).absolute()
 
     solution_path = conf_dirpath \
                         / Filenames['SOLU']
@@ -187,8 +646,14 @@ if __name__ == '__main__':
     # Load the JSON scenario conf
     scenario_conf = _load_scenario_conf(conf_dirpath)
 
+    config = SolverConfig.deserialize(
+        dict(scenario_conf.get('solver', {}), **_solver))
+
+    cache = ScenarioCache(SQLiteBackend(args.cache)) \
+            if args.cache else None
+
     # Solve the SAT problem
     # and store the solution JSON
     with open(str(solution_path), 'w') as jfh:
-        json.dump(fromjson(scenario_conf),
-                  jfh, indent=4)
+        jfh.write(Encoder.dumps(fromjson(scenario_conf, config, cache),
+                                indent=4))
@@ -0,0 +1,629 @@
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.player import Player
+from mister.position import Position
+
+
+def epsilon_bounds(ratings: np.ndarray,
+                   nteams: int,
+                   avg_rating: int = None) -> t.Tuple[int, int]:
+    """
+    Valid bounds on epsilon derived from the instance alone.
+
+    Team ratings are multiples of the gcd of the ratings, so epsilon is
+    at least the distance of the average from the nearest multiple. If the
+    total rating exceeds Nteams times the average, some team is at least
+    at the ceil of the total per team, and conversely. No team rating
+    deviates from the average more than the total.
+
+    Parameters
+    ----------
+    ratings : ndarray
+        Rating of each player
+
+    nteams : int
+        Number of teams
+
+    avg_rating : int
+        Average rating per team to balance around.
+        The default is that of the players.
+    """
+    total = int(ratings.sum())
+    avg = total // nteams if avg_rating is None \
+          else avg_rating
+
+    gcd = int(np.gcd.reduce(ratings)) or 1
+
+    lb = min(avg % gcd, -avg % gcd)
+
+    if total > avg*nteams:
+        # Smallest multiple from the ceil of the total per team up
+        ceil = -(-total // nteams)
+        lb = max(lb, -(-ceil // gcd)*gcd - avg)
+    elif total < avg*nteams:
+        # Largest multiple from the floor of the total per team down
+        floor = total // nteams
+        lb = max(lb, avg - (floor // gcd)*gcd)
+
+    return lb, max(avg, total - avg)
+
+
+class ModelBuilder:
+    """
+    Array-backed CP model builder.
+
+    It holds the players per team Id associations as a 2D players x teams
+    index of BoolVars, with the ratings and position masks as NumPy arrays.
+
+    Linear constraints are weighted sums over rows or columns of that index
+    and are written straight into the model proto, without going through
+    Python expression trees. Team ratings and position counts are bound to
+    IntVars once, so that later constraints reference a single variable.
+    """
+    def __init__(self, players: t.List[Player],
+                 nteams: int,
+                 model: cp_model.CpModel = None,
+                 avg_rating: int = None):
+        """
+        Parameters
+        ----------
+        players : List[Player]
+            Players to split into teams
+
+        nteams : int
+            Number of teams
+
+        model : CpModel
+            CP model to populate. The default is a new one.
+
+        avg_rating : int
+            Average rating per team to balance around, e.g., that of a
+            whole league when a few of its teams are re-optimized.
+            The default is that of the players.
+        """
+        self.model = model if model is not None \
+                     else cp_model.CpModel()
+
+        self.nteams = nteams
+
+        self._load(players, avg_rating)
+
+        # Players x teams index of BoolVars
+        # and of their indices in the model proto
+        self.x = np.empty((self.nplayers, nteams), dtype=object)
+        self.index = np.empty((self.nplayers, nteams), dtype=np.int64)
+
+        for i, p in enumerate(players):
+            for tid in range(nteams):
+                v = self.model.NewBoolVar(
+                    'Player %s in team %d' % (p.name, tid))
+
+                self.x[i, tid] = v
+                self.index[i, tid] = v.Index()
+
+        self._ratings = {}
+        self._counts = {}
+        self._position_ratings = {}
+        self._teams_of = None
+
+        # Constraint groups as (name, index of their first constraint)
+        self._groups = []
+
+        # Constraints that depend on the ratings or the positions
+        # of the players as (index, kind, key), patched by clone
+        self._sites = []
+
+    def _load(self, players: t.List[Player],
+              avg_rating: int = None):
+        self.players = players
+        self.nplayers = len(players)
+
+        self._avg_rating = avg_rating
+
+        self.ratings = np.fromiter((p.rating for p in players),
+                                   dtype=np.int64,
+                                   count=self.nplayers)
+
+        self.masks = {k: np.fromiter((p.position == k for p in players),
+                                     dtype=bool,
+                                     count=self.nplayers)
+                      for k in Position}
+
+    def _site(self, kind: str, key: t.Any):
+        """
+        Mark the last constraint as depending on the instance.
+        """
+        self._sites.append((len(self.model.Proto().constraints) - 1,
+                            kind, key))
+
+    @property
+    def teams_ids(self) -> range:
+        return range(self.nteams)
+
+    @property
+    def avg_rating(self) -> int:
+        """
+        Average rating per team.
+        """
+        if self._avg_rating is not None:
+            return self._avg_rating
+
+        return int(self.ratings.sum())//self.nteams
+
+    @property
+    def players_per_tid(self) -> t.Dict[t.Tuple[Player, int],
+                                        cp_model.IntVar]:
+        """
+        Players per team Id associations as a dict.
+        """
+        return {(p, tid): self.x[i, tid]
+                for i, p in enumerate(self.players)
+                for tid in self.teams_ids}
+
+    def epsilon_bounds(self) -> t.Tuple[int, int]:
+        """
+        Valid bounds on epsilon derived from the instance alone.
+        """
+        return epsilon_bounds(self.ratings, self.nteams,
+                              self.avg_rating)
+
+    def rows(self, k: Position) -> np.ndarray:
+        """
+        Row indices of the players at position k.
+        """
+        return np.flatnonzero(self.masks[k])
+
+    def tiers(self, ntiers: int) -> t.List[np.ndarray]:
+        """
+        Row indices of the players of each quantile tier by rating,
+        the lowest first, as even in size as possible.
+        """
+        return [rows for rows in np.array_split(np.arange(self.nplayers),
+                                                ntiers)
+                if len(rows)]
+
+    def add_linear(self, variables: np.ndarray,
+                   coefficients: np.ndarray,
+                   lb: int, ub: int):
+        """
+        Add lb <= WeightedSum(variables, coefficients) <= ub.
+
+        Parameters
+        ----------
+        variables : ndarray
+            Indices of the variables in the model proto
+
+        coefficients : ndarray
+            Coefficients of the variables
+
+        lb : int
+            Lower bound of the weighted sum
+
+        ub : int
+            Upper bound of the weighted sum
+        """
+        constraint = self.model.Proto().constraints.add()
+
+        constraint.linear.vars.extend(variables.tolist())
+        constraint.linear.coeffs.extend(coefficients.tolist())
+        constraint.linear.domain.extend([int(lb), int(ub)])
+
+    def add_team_members(self, tid: int, rows: np.ndarray,
+                         lb: int, ub: int = None):
+        """
+        Add lb <= Number of players of a subset in team tid <= ub.
+        """
+        self.add_linear(self.index[rows, tid],
+                        np.ones(len(rows), dtype=np.int64),
+                        lb, lb if ub is None else ub)
+
+    def add_position_members(self, tid: int, k: Position,
+                             lb: int, ub: int = None):
+        """
+        Add lb <= Number of players at position k in team tid <= ub.
+        """
+        self.add_team_members(tid, self.rows(k), lb, ub)
+        self._site('members', (k, tid))
+
+    def add_player_teams(self, i: int,
+                         lb: int, ub: int = None):
+        """
+        Add lb <= Number of teams the i-th player belongs to <= ub.
+        """
+        self.add_linear(self.index[i, :],
+                        np.ones(self.nteams, dtype=np.int64),
+                        lb, lb if ub is None else ub)
+
+    def add_player_from(self, i: int, tid: int):
+        """
+        Add: the i-th player belongs to team tid or to a later one.
+        """
+        self.add_linear(self.index[i, :tid],
+                        np.ones(tid, dtype=np.int64), 0, 0)
+
+    def _bind(self, variables: np.ndarray,
+              coefficients: np.ndarray,
+              ub: int, name: str) -> cp_model.IntVar:
+        """
+        Bind a weighted sum to a new IntVar in [0, ub].
+        """
+        y = self.model.NewIntVar(0, ub, name)
+
+        self.add_linear(np.append(variables, y.Index()),
+                        np.append(coefficients, -1), 0, 0)
+
+        return y
+
+    def team_rating(self, tid: int) -> cp_model.IntVar:
+        """
+        Sum of the ratings of the players in team tid.
+        """
+        if tid not in self._ratings:
+            self._ratings[tid] = self._bind(
+                self.index[:, tid], self.ratings,
+                int(self.ratings.sum()),
+                'Rating of team %d' % tid)
+
+            self._site('rating', tid)
+
+        return self._ratings[tid]
+
+    def add_deviation(self, tid: int,
+                      epsilon: cp_model.IntVar):
+        """
+        Add avg - epsilon <= Rating of team tid <= avg + epsilon.
+        """
+        variables = np.array([self.team_rating(tid).Index(),
+                              epsilon.Index()], dtype=np.int64)
+
+        self.add_linear(variables, np.array([1, 1]),
+                        self.avg_rating, cp_model.INT_MAX)
+        self._site('avg_lb', tid)
+
+        self.add_linear(variables, np.array([1, -1]),
+                        cp_model.INT_MIN, self.avg_rating)
+        self._site('avg_ub', tid)
+
+    def team_count(self, k: Position,
+                   tid: int) -> cp_model.IntVar:
+        """
+        Number of players at position k in team tid.
+        """
+        if (k, tid) not in self._counts:
+            rows = self.rows(k)
+
+            self._counts[(k, tid)] = self._bind(
+                self.index[rows, tid],
+                np.ones(len(rows), dtype=np.int64),
+                len(rows), 'N %s in team %d' % (k, tid))
+
+            self._site('count', (k, tid))
+
+        return self._counts[(k, tid)]
+
+    def position_rating(self, k: Position,
+                        tid: int) -> cp_model.IntVar:
+        """
+        Sum of the ratings of the players at position k in team tid.
+        """
+        if (k, tid) not in self._position_ratings:
+            rows = self.rows(k)
+
+            self._position_ratings[(k, tid)] = self._bind(
+                self.index[rows, tid], self.ratings[rows],
+                int(self.ratings[rows].sum()),
+                'Rating of %s in team %d' % (k, tid))
+
+            self._site('position_rating', (k, tid))
+
+        return self._position_ratings[(k, tid)]
+
+    def add_position_rating(self, k: Position, tid: int,
+                            tolerance: int):
+        """
+        Add |Rating of position k in team tid - Its average| <= tolerance.
+        """
+        avg_rating = self.position_avg_rating(k)
+
+        self.add_linear(np.array([self.position_rating(k, tid).Index()]),
+                        np.array([1]), avg_rating - tolerance,
+                        avg_rating + tolerance)
+        self._site('position_within', (k, tolerance))
+
+    def position_avg_rating(self, k: Position) -> int:
+        """
+        Average rating of the players at position k per team.
+        """
+        return int(self.ratings[self.masks[k]].sum())//self.nteams
+
+    def deviation(self, tid: int,
+                  ub: int = None) -> cp_model.IntVar:
+        """
+        New IntVar in [0, ub] at least the deviation
+        of team tid from the average.
+        """
+        if ub is None:
+            _, ub = self.epsilon_bounds()
+
+        d = self.model.NewIntVar(0, ub, 'Deviation of team %d' % tid)
+
+        self.add_deviation(tid, d)
+
+        return d
+
+    def position_deviation(self, k: Position,
+                           tid: int) -> cp_model.IntVar:
+        """
+        New IntVar at least the deviation of the rating at position k
+        of team tid from the average rating at position k per team.
+        """
+        y = self.position_rating(k, tid)
+        d = self.model.NewIntVar(0, int(self.ratings[self.masks[k]].sum()),
+                                 'Deviation of %s in team %d' % (k, tid))
+
+        variables = np.array([y.Index(), d.Index()], dtype=np.int64)
+        avg_rating = self.position_avg_rating(k)
+
+        self.add_linear(variables, np.array([1, 1]),
+                        avg_rating, cp_model.INT_MAX)
+        self._site('position_avg_lb', k)
+
+        self.add_linear(variables, np.array([1, -1]),
+                        cp_model.INT_MIN, avg_rating)
+        self._site('position_avg_ub', k)
+
+        return d
+
+    def add_distance(self, assignment: np.ndarray,
+                     distance: int):
+        """
+        Add a no-good cut: at least distance players are
+        in another team than in some assignment.
+
+        Parameters
+        ----------
+        assignment : ndarray
+            Team Id of each player
+
+        distance : int
+            Minimum Hamming distance from the assignment
+        """
+        rows = np.arange(self.nplayers)
+
+        self.add_linear(self.index[rows, assignment],
+                        np.ones(self.nplayers, dtype=np.int64),
+                        0, self.nplayers - distance)
+
+    def teams_of(self) -> np.ndarray:
+        """
+        Indices in the model proto of the team Id of each player,
+        so that a solution is read with one value per player.
+        """
+        if self._teams_of is None:
+            coefficients = np.arange(self.nteams, dtype=np.int64)
+
+            self._teams_of = np.array([
+                self._bind(self.index[i, :], coefficients,
+                           self.nteams - 1,
+                           'Team of player %s' % p.name).Index()
+                for i, p in enumerate(self.players)],
+                dtype=np.int64)
+
+        return self._teams_of
+
+    def var(self, index: int) -> cp_model.IntVar:
+        """
+        Variable of the model at some index in its proto.
+        """
+        return cp_model.IntVar(self.model.Proto(), index, None)
+
+    def clone(self, players: t.List[Player],
+              avg_rating: int = None) -> 'ModelBuilder':
+        """
+        Copy the model for other players of the same shape.
+
+        The proto is copied as is, and only the coefficients, variables and
+        bounds of the constraints that depend on the ratings or on the
+        positions of the players are patched. Variable names are those of
+        the original players.
+
+        Parameters
+        ----------
+        players : List[Player]
+            Players sorted as those of the model, with as many
+            players per position
+
+        avg_rating : int
+            Average rating per team to balance around.
+            The default is that of the players.
+
+        Raises
+        ------
+        ValueError
+            If the players do not fit the shape of the model
+        """
+        other = ModelBuilder.__new__(ModelBuilder)
+
+        other.model = cp_model.CpModel()
+        other.model.Proto().CopyFrom(self.model.Proto())
+
+        other.nteams = self.nteams
+
+        other._load(players, avg_rating)
+
+        if other.nplayers != self.nplayers \
+                or any(other.masks[k].sum() != self.masks[k].sum()
+                       for k in Position):
+            raise ValueError('Players do not fit the shape of the model')
+
+        # The BoolVars are shared, as they only stand for
+        # their indices, which are the same in the copy
+        other.index = self.index
+        other.x = self.x
+
+        other._ratings = {tid: other.var(v.Index())
+                          for tid, v in self._ratings.items()}
+        other._counts = {key: other.var(v.Index())
+                         for key, v in self._counts.items()}
+        other._position_ratings = {key: other.var(v.Index())
+                                   for key, v
+                                   in self._position_ratings.items()}
+        other._teams_of = self._teams_of
+
+        other._groups = list(self._groups)
+        other._sites = list(self._sites)
+
+        other._patch()
+
+        return other
+
+    def _patch(self):
+        """
+        Write the ratings and the positions of the players
+        into the constraints that depend on them.
+        """
+        proto = self.model.Proto()
+
+        rows = {k: self.rows(k) for k in Position}
+        ratings = self.ratings.tolist()
+        avg_rating = self.avg_rating
+
+        for c, kind, key in self._sites:
+            linear = proto.constraints[c].linear
+
+            if kind == 'rating':
+                linear.coeffs[:self.nplayers] = ratings
+                self.set_bounds(self._ratings[key], 0,
+                                sum(ratings))
+            elif kind in ('count', 'members'):
+                k, tid = key
+                linear.vars[:len(rows[k])] = self.index[rows[k],
+                                                        tid].tolist()
+            elif kind == 'position_rating':
+                k, tid = key
+                linear.vars[:len(rows[k])] = self.index[rows[k],
+                                                        tid].tolist()
+                linear.coeffs[:len(rows[k])] = self.ratings[rows[k]] \
+                                                   .tolist()
+                self.set_bounds(self._position_ratings[key], 0,
+                                int(self.ratings[rows[k]].sum()))
+            elif kind == 'avg_lb':
+                linear.domain[0] = avg_rating
+            elif kind == 'avg_ub':
+                linear.domain[1] = avg_rating
+            elif kind == 'position_avg_lb':
+                linear.domain[0] = self.position_avg_rating(key)
+            elif kind == 'position_avg_ub':
+                linear.domain[1] = self.position_avg_rating(key)
+            elif kind == 'position_within':
+                k, tolerance = key
+                avg_rating = self.position_avg_rating(k)
+                linear.domain[:] = [avg_rating - tolerance,
+                                    avg_rating + tolerance]
+
+    def group(self, name: str):
+        """
+        Start a named group of constraints, which lasts until the next.
+        """
+        self._groups.append((name, len(self.model.Proto().constraints)))
+
+    def add_assumptions(self) -> t.Dict[int, str]:
+        """
+        Enforce each group of constraints by its own literal, assumed true,
+        so that the solver tells which groups conflict on infeasibility.
+
+        Returns
+        -------
+        Dict[int, str]
+            Name of the group of each assumption literal by index.
+        """
+        proto = self.model.Proto()
+        bounds = [start for _, start in self._groups[1:]] \
+                 + [len(proto.constraints)]
+
+        literals = []
+        assumptions = {}
+
+        for (name, start), stop in zip(self._groups, bounds):
+            if start == stop:
+                continue
+
+            literal = self.model.NewBoolVar('Assume %s' % name)
+
+            for c in range(start, stop):
+                proto.constraints[c].enforcement_literal \
+                     .append(literal.Index())
+
+            literals.append(literal)
+            assumptions[literal.Index()] = name
+
+        self.model.AddAssumptions(literals)
+
+        return assumptions
+
+    def minimize(self, variables: np.ndarray,
+                 coefficients: np.ndarray):
+        """
+        Replace the objective with Minimize(WeightedSum(variables,
+        coefficients)).
+
+        Parameters
+        ----------
+        variables : ndarray
+            Indices of the variables in the model proto
+
+        coefficients : ndarray
+            Coefficients of the variables
+        """
+        proto = self.model.Proto()
+        proto.ClearField('objective')
+
+        proto.objective.vars.extend(variables.tolist())
+        proto.objective.coeffs.extend(coefficients.tolist())
+
+    def set_bounds(self, variable: cp_model.IntVar,
+                   lb: int, ub: int):
+        """
+        Narrow the domain of a variable to [lb, ub].
+        """
+        self.model.Proto().variables[variable.Index()] \
+                  .domain[:] = [int(lb), int(ub)]
+
+    def hint_assignment(self, assignment: np.ndarray):
+        """
+        Replace the hints with the team Id of each player.
+        """
+        proto = self.model.Proto()
+        proto.ClearField('solution_hint')
+
+        values = np.zeros((self.nplayers, self.nteams), dtype=np.int64)
+        values[np.arange(self.nplayers), assignment] = 1
+
+        proto.solution_hint.vars.extend(self.index.ravel().tolist())
+        proto.solution_hint.values.extend(values.ravel().tolist())
+
+    def add_hints(self, teams: t.Dict[str, int]):
+        """
+        Hint the team of the players with a known one.
+
+        Parameters
+        ----------
+        teams : Dict[str, int]
+            Team Id per player name. Unknown players
+            and team Ids out of range are skipped.
+        """
+        for i, p in enumerate(self.players):
+            tid = teams.get(p.name)
+
+            if tid is None \
+                    or not 0 <= tid < self.nteams:
+                continue
+
+            for oid in self.teams_ids:
+                self.model.AddHint(self.x[i, oid],
+                                   int(oid == tid))
@@ -0,0 +1,257 @@
+import collections
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import typing as t
+
+from abc import ABC
+from abc import abstractmethod
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.encoder import Encoder
+from mister.formation import Formation
+from mister.metrics import metrics
+from mister.types import JSON
+
+
+class CacheBackend(ABC):
+    """
+    Storage of encoded solution pools by scenario key.
+    """
+    @abstractmethod
+    def get(self, key: str) \
+           -> t.Optional[t.Tuple[float, str]]:
+        """
+        Get the creation time and the value of a key, marking it as used.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def set(self, key: str, value: str,
+            created: float):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, key: str):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def evict(self, max_entries: int):
+        """
+        Evict the least recently used keys beyond max_entries.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError()
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self):
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: str) \
+           -> t.Optional[t.Tuple[float, str]]:
+        with self.__lock:
+            if key not in self.__entries:
+                return None
+
+            self.__entries.move_to_end(key)
+
+            return self.__entries[key]
+
+    def set(self, key: str, value: str,
+            created: float):
+        with self.__lock:
+            self.__entries[key] = (created, value)
+            self.__entries.move_to_end(key)
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def evict(self, max_entries: int):
+        with self.__lock:
+            while len(self.__entries) > max_entries:
+                self.__entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class SQLiteBackend(CacheBackend):
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the SQLite database file
+        """
+        self.__connection = sqlite3.connect(path,
+                                            check_same_thread=False)
+        self.__lock = threading.Lock()
+
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                'CREATE TABLE IF NOT EXISTS solutions ('
+                '    key TEXT PRIMARY KEY,'
+                '    value TEXT NOT NULL,'
+                '    created REAL NOT NULL,'
+                '    used REAL NOT NULL)')
+
+    def get(self, key: str) \
+           -> t.Optional[t.Tuple[float, str]]:
+        with self.__lock, self.__connection:
+            row = self.__connection.execute(
+                'SELECT created, value FROM solutions WHERE key = ?',
+                (key,)).fetchone()
+
+            if row is not None:
+                self.__connection.execute(
+                    'UPDATE solutions SET used = ? WHERE key = ?',
+                    (time.time(), key))
+
+        return row
+
+    def set(self, key: str, value: str,
+            created: float):
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO solutions '
+                'VALUES (?, ?, ?, ?)',
+                (key, value, created, created))
+
+    def delete(self, key: str):
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                'DELETE FROM solutions WHERE key = ?', (key,))
+
+    def evict(self, max_entries: int):
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                'DELETE FROM solutions WHERE key NOT IN ('
+                '    SELECT key FROM solutions'
+                '    ORDER BY used DESC LIMIT ?)',
+                (max_entries,))
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__connection.execute(
+                'SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+
+class ScenarioCache:
+    """
+    Cache of solution pools keyed by a canonical hash of the scenario,
+    with least recently used and time to live eviction.
+
+    The whole pool of good solutions is stored, so that a hit still
+    samples a random solution as a fresh solve would.
+    """
+    def __init__(self, backend: CacheBackend = None,
+                 max_entries: int = 1024,
+                 ttl: float = None):
+        """
+        Parameters
+        ----------
+        backend : CacheBackend
+            Storage of the solution pools. The default is in memory.
+
+        max_entries : int
+            Maximum number of cached scenarios. The default is 1024.
+
+        ttl : float
+            Time to live of a cached scenario in seconds.
+            The default is None, never expiring.
+        """
+        self.backend = backend if backend is not None \
+                       else MemoryBackend()
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(n: int, nteams: int,
+            _players: t.List[JSON],
+            _formation: str = None,
+            config: SolverConfig = None,
+            previous: t.Dict[str, int] = None) -> str:
+        """
+        Canonical hash of a scenario, regardless of the order of the players.
+
+        A previous solution warm-starts the search and can change
+        the pool found, hence it is part of the scenario.
+        """
+        if config is None:
+            config = SolverConfig()
+
+        canonical = {
+            'n': n,
+            'nteams': nteams,
+            'players': sorted([str(p['name']),
+                               int(p['rating']),
+                               str(p['position'])]
+                              for p in _players),
+            'formation': str(Formation.deserialize(_formation))
+                         if _formation is not None else None,
+            'solver': dict(config.serialize()),
+            'previous': sorted([str(name), int(tid)]
+                               for name, tid in previous.items())
+                        if previous is not None else None,
+        }
+
+        return hashlib.sha256(
+            json.dumps(canonical, sort_keys=True,
+                       separators=(',', ':')).encode()) \
+                      .hexdigest()
+
+    def get(self, key: str) -> t.Optional[t.List[JSON]]:
+        """
+        Get the solution pool of a scenario, if cached and not expired.
+        """
+        entry = self.backend.get(key)
+
+        if entry is not None \
+                and self.ttl is not None \
+                and time.time() - entry[0] > self.ttl:
+            self.backend.delete(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            metrics.inc('cache_lookups', result='miss')
+            return None
+
+        self.hits += 1
+        metrics.inc('cache_lookups', result='hit')
+
+        return Encoder.loads(entry[1])
+
+    def set(self, key: str, pool: t.List[JSON]):
+        self.backend.set(key, Encoder.dumps(pool), time.time())
+        self.backend.evict(self.max_entries)
+
+    @staticmethod
+    def sample(pool: t.List[JSON],
+               optimal: bool = False) -> JSON:
+        """
+        Pick the best solution, or a random one from the pool.
+        """
+        return pool[0] if optimal \
+               else random.choice(pool)
+
+    def stats(self) -> t.Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.backend),
+        }
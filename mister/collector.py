@@ -0,0 +1,143 @@
+import array
+import heapq
+import itertools as it
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.listener import SolutionListener
+from mister.player import Player
+from mister.team import Team
+
+
+MIN_solutions = 3
+
+
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    """
+    Low-overhead collector of intermediate solutions.
+
+    Each solution is recorded as a compact array with the team index of
+    each player, and only the best max_solutions ones are retained, while
+    building teams, formatting and logging are deferred after the search.
+    """
+    def __init__(self, players: t.List[Player],
+                 teams_of: np.ndarray,
+                 nteams: int,
+                 max_solutions: int = 64,
+                 epsilon_threshold: int = None,
+                 listener: SolutionListener = None):
+        """
+        Parameters
+        ----------
+        players : List[Player]
+            Players split into teams
+
+        teams_of : ndarray
+            Index in the model proto of the team Id variable of each player
+
+        nteams : int
+            Number of teams
+
+        max_solutions : int
+            Number of best solutions to retain. The default is 64.
+
+        epsilon_threshold : int
+            Stop at the first solution whose epsilon is within
+            this threshold. The default is None.
+
+        listener : SolutionListener
+            Receiver of each improving solution. The default is None.
+        """
+        cp_model.CpSolverSolutionCallback.__init__(self)
+
+        self.__players = players
+        self.__teams_of = teams_of.tolist()
+        self.__typecode = 'b' if nteams <= 128 else 'h'
+
+        self.__max_solutions = max(1, max_solutions)
+        self.__solutions = [] # Max-heap on epsilon
+        self.__nsolutions = 0
+
+        self.__epsilon_threshold = epsilon_threshold
+        self.__threshold_reached = False
+
+        self.__listener = listener
+
+    def on_solution_callback(self):
+        epsilon = int(self.ObjectiveValue())
+        walltime = self.WallTime()
+
+        assignment = array.array(self.__typecode,
+                                 map(self.SolutionIntegerValue,
+                                     self.__teams_of))
+
+        self.__nsolutions += 1
+
+        entry = (-epsilon, self.__nsolutions,
+                 walltime, assignment)
+
+        if len(self.__solutions) < self.__max_solutions:
+            heapq.heappush(self.__solutions, entry)
+        else:
+            heapq.heappushpop(self.__solutions, entry)
+
+        if self.__listener is not None:
+            self.__listener.on_solution(
+                epsilon,
+                Team.from_assignment(self.__players,
+                                     assignment),
+                walltime)
+
+        if self.__epsilon_threshold is not None \
+                and epsilon <= self.__epsilon_threshold:
+            # Good enough, stop at this solution
+            self.__threshold_reached = True
+            self.StopSearch()
+
+    @property
+    def nsolutions(self) -> int:
+        return self.__nsolutions
+
+    @property
+    def threshold_reached(self) -> bool:
+        return self.__threshold_reached
+
+    def get_history(self) -> t.List[t.Tuple[int, float, array.array]]:
+        """
+        Get the retained solutions as (epsilon, walltime, assignment)
+        in the order they were found.
+        """
+        return [(-s[0], s[2], s[3]) for s
+                in sorted(self.__solutions, key=lambda s: s[1])]
+
+    def get_solutions(self, good_epsilon: int = None) \
+                     -> t.List[t.Tuple[int, array.array]]:
+        """
+        Get a range of good solutions up to some threshold on the objective value.
+
+        Parameters
+        ----------
+        good_epsilon : int
+            Largest epsilon of a good enough solution.
+            The default is None, any.
+        """
+        solutions = [(-s[0], s[3]) for s
+                     in sorted(self.__solutions,
+                               key=lambda s: (-s[0], s[1]))
+                     if good_epsilon is None
+                        or -s[0] <= good_epsilon]
+
+        good_solutions = []
+
+        for k, g in it.groupby(solutions,
+                               lambda s: s[0]):
+            if len(good_solutions) >= MIN_solutions:
+                break
+
+            good_solutions += list(g)
+
+        return good_solutions
@@ -0,0 +1,258 @@
+import typing as t
+
+# Custom imports
+from mister.constants import Engines
+from mister.constants import Objectives
+from mister.errors import InvalidSolverConfigError
+from mister.serializable import DictSerializable
+
+
+def _bounded(value, bound):
+    if value is None:
+        return bound
+
+    if bound is None:
+        return value
+
+    return min(value, bound)
+
+
+class SolverConfig(DictSerializable):
+    """
+    CP-SAT solver parameters.
+
+    Any parameter left to None falls back to the solver's default.
+    """
+    time_limit: t.Optional[float]
+    num_workers: t.Optional[int]
+    random_seed: t.Optional[int]
+    linearization_level: t.Optional[int]
+    epsilon_threshold: t.Optional[int]
+    engine: t.Optional[str]
+    pool_size: t.Optional[int]
+    pool_epsilon: t.Optional[int]
+    min_distance: t.Optional[int]
+    objective: t.Optional[str]
+    tiers: t.Optional[int]
+    position_tolerance: t.Optional[int]
+
+    def __init__(self, time_limit: float = None,
+                 num_workers: int = None,
+                 random_seed: int = None,
+                 linearization_level: int = None,
+                 epsilon_threshold: int = None,
+                 engine: str = None,
+                 pool_size: int = None,
+                 pool_epsilon: int = None,
+                 min_distance: int = None,
+                 objective: str = None,
+                 tiers: int = None,
+                 position_tolerance: int = None):
+        """
+        Parameters
+        ----------
+        time_limit : float
+            Time budget of the search in seconds. The default is None.
+
+        num_workers : int
+            Number of parallel search workers. The default is None.
+
+        random_seed : int
+            Seed of the search. The default is None.
+
+        linearization_level : int
+            Linearization level of the constraints, between 0 and 2.
+            The default is None.
+
+        epsilon_threshold : int
+            Stop at the first solution whose epsilon is within
+            this threshold. The default is None.
+
+        engine : str
+            Either "cp-sat", seeded by the heuristic engine, "heuristic"
+            alone for the lowest latency, or "lns", a large neighbourhood
+            search for large leagues. The default is None, "cp-sat".
+
+        pool_size : int
+            Number of distinct solutions to generate in one solve session
+            of the "cp-sat" engine, rather than those the search happened
+            to report. The default is None.
+
+        pool_epsilon : int
+            Tolerance on epsilon above the best solution of a pool.
+            The default is None, up to that of the heuristic teams.
+
+        min_distance : int
+            Minimum number of players in another team between any two
+            solutions of a pool. The default is None, 2.
+
+        objective : str
+            Last stage of the lexicographic objective of the "cp-sat"
+            engine: "epsilon" alone, then the sum of the deviations of
+            the teams from the average, "deviation", and then that of
+            their rating per position, "positions". The default is None,
+            "epsilon".
+
+        tiers : int
+            Number of quantile tiers of the players by rating, of which
+            each team gets as many players, up to one, in place of C5 and
+            C6. The default is None, only the highest and lowest-rated
+            players are spread.
+
+        position_tolerance : int
+            Largest deviation of the rating per position of each team from
+            its average per team. The default is None, unconstrained.
+        """
+        if time_limit is not None \
+                and time_limit <= 0:
+            raise InvalidSolverConfigError(
+                'time_limit', time_limit)
+
+        if num_workers is not None \
+                and num_workers < 1:
+            raise InvalidSolverConfigError(
+                'num_workers', num_workers)
+
+        if linearization_level is not None \
+                and linearization_level not in (0, 1, 2):
+            raise InvalidSolverConfigError(
+                'linearization_level', linearization_level)
+
+        if epsilon_threshold is not None \
+                and epsilon_threshold < 0:
+            raise InvalidSolverConfigError(
+                'epsilon_threshold', epsilon_threshold)
+
+        if engine is not None \
+                and engine not in Engines.values():
+            raise InvalidSolverConfigError(
+                'engine', engine)
+
+        if pool_size is not None \
+                and pool_size < 1:
+            raise InvalidSolverConfigError(
+                'pool_size', pool_size)
+
+        if pool_epsilon is not None \
+                and pool_epsilon < 0:
+            raise InvalidSolverConfigError(
+                'pool_epsilon', pool_epsilon)
+
+        if min_distance is not None \
+                and min_distance < 1:
+            raise InvalidSolverConfigError(
+                'min_distance', min_distance)
+
+        if objective is not None \
+                and objective not in Objectives.values():
+            raise InvalidSolverConfigError(
+                'objective', objective)
+
+        if tiers is not None \
+                and tiers < 2:
+            raise InvalidSolverConfigError(
+                'tiers', tiers)
+
+        if position_tolerance is not None \
+                and position_tolerance < 0:
+            raise InvalidSolverConfigError(
+                'position_tolerance', position_tolerance)
+
+        # Only the CP model of the "cp-sat" engine has C9 and C10
+        if (tiers is not None or position_tolerance is not None) \
+                and engine not in (None, Engines['CP_SAT']):
+            raise InvalidSolverConfigError(
+                'engine', engine)
+
+        self.time_limit = time_limit
+        self.num_workers = num_workers
+        self.random_seed = random_seed
+        self.linearization_level = linearization_level
+        self.epsilon_threshold = epsilon_threshold
+        self.engine = engine
+        self.pool_size = pool_size
+        self.pool_epsilon = pool_epsilon
+        self.min_distance = min_distance
+        self.objective = objective
+        self.tiers = tiers
+        self.position_tolerance = position_tolerance
+
+    def bounded(self, time_limit: float,
+                num_workers: int) -> 'SolverConfig':
+        """
+        Copy of the config whose time budget and worker count do not exceed
+        the given maxima, so that the latency of a request is bounded.
+        A maximum of None leaves the parameter as is.
+        """
+        return SolverConfig(
+            _bounded(self.time_limit, time_limit),
+            _bounded(self.num_workers, num_workers),
+            self.random_seed,
+            self.linearization_level,
+            self.epsilon_threshold,
+            self.engine,
+            self.pool_size,
+            self.pool_epsilon,
+            self.min_distance,
+            self.objective,
+            self.tiers,
+            self.position_tolerance)
+
+    def apply(self, parameters):
+        """
+        Set the parameters of a CP-SAT solver.
+
+        Parameters
+        ----------
+        parameters : SatParameters
+            Parameters of the CP-SAT solver
+        """
+        if self.time_limit is not None:
+            parameters.max_time_in_seconds = self.time_limit
+
+        if self.num_workers is not None:
+            parameters.num_search_workers = self.num_workers
+
+        if self.random_seed is not None:
+            parameters.random_seed = self.random_seed
+
+        if self.linearization_level is not None:
+            parameters.linearization_level = self.linearization_level
+
+    @staticmethod
+    def deserialize(encoding: t.Dict) \
+                   -> 'SolverConfig':
+        _types = {
+            'time_limit': float,
+            'num_workers': int,
+            'random_seed': int,
+            'linearization_level': int,
+            'epsilon_threshold': int,
+            'engine': str,
+            'pool_size': int,
+            'pool_epsilon': int,
+            'min_distance': int,
+            'objective': str,
+            'tiers': int,
+            'position_tolerance': int,
+        }
+
+        if not isinstance(encoding, dict):
+            raise InvalidSolverConfigError(
+                'solver', encoding)
+
+        kwargs = {}
+
+        for k, v in encoding.items():
+            if k not in _types:
+                raise InvalidSolverConfigError(k, v)
+
+            if v is None:
+                continue
+
+            try:
+                kwargs[k] = _types[k](v)
+            except (TypeError, ValueError):
+                raise InvalidSolverConfigError(k, v)
+
+        return SolverConfig(**kwargs)
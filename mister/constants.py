@@ -7,3 +7,57 @@ Ratings = {
     'MIN': 0,
     'MAX': 100,
 }
+
+Encodings = {
+    'PAIRWISE': 'pairwise',
+    'BOUNDS': 'bounds',
+}
+
+Statuses = {
+    'OPTIMAL': 'optimal',
+    'THRESHOLD': 'epsilon_threshold',
+    'TIME_LIMIT': 'time_limit',
+    'INTERRUPTED': 'interrupted',
+    'HEURISTIC': 'heuristic',
+    'CONVERGED': 'converged',
+    'INFEASIBLE': 'infeasible',
+    'NO_SOLUTION': 'no_solution',
+}
+
+# Timed phases of a request
+Phases = {
+    'PARSE': 'parse',
+    'VALIDATE': 'validate',
+    'BUILD': 'build',
+    'HEURISTIC': 'heuristic',
+    'SOLVE': 'solve',
+    'EXTRACT': 'extract',
+    'SERIALIZE': 'serialize',
+}
+
+Engines = {
+    'CP_SAT': 'cp-sat',
+    'HEURISTIC': 'heuristic',
+    'LNS': 'lns',
+}
+
+Objectives = {
+    'EPSILON': 'epsilon',
+    'DEVIATION': 'deviation',
+    'POSITIONS': 'positions',
+}
+
+Constraints = {
+    'C1': 'C1. Each team has the same size',
+    'C2': 'C2. Each player belongs to exactly one team',
+    'C3': 'C3. Each team rating is within epsilon of the average',
+    'C4': 'C4. Each team follows the formation',
+    'C5': 'C5. Each team has one of the Nteams highest-rated players',
+    'C6': 'C6. Each team has one of the Nteams lowest-rated players',
+    'C7': 'C7. Each team has at most one player more per position',
+    'C8': 'C8. The i-th highest-rated player is in team i',
+    'C9': 'C9. Each team has as many players of each rating tier, up to one',
+    'C10': 'C10. Each team rating per position is within the tolerance '
+           'of the average',
+    'C11': 'C11. The i-th highest-rated player is in one of the last i teams',
+}
@@ -0,0 +1,51 @@
+import json
+import typing as t
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Custom imports
+from mister.types import JSON
+
+
+class Encoder:
+    """
+    JSON encoding of serialized solutions, with orjson if installed.
+
+    Pretty-printed JSON is always encoded by the standard library, so that
+    the files written are the same with or without orjson. Compact JSON,
+    e.g., in HTTP responses and JSONL lines, is left to the fastest one.
+    """
+    @staticmethod
+    def dumps(obj: JSON,
+              indent: int = None) -> str:
+        """
+        Encode as a JSON string, compact unless indented.
+        """
+        if indent is not None:
+            return json.dumps(obj, indent=indent)
+
+        if orjson is not None:
+            return orjson.dumps(obj).decode()
+
+        return json.dumps(obj, separators=(',', ':'))
+
+    @staticmethod
+    def dumpb(obj: JSON) -> bytes:
+        """
+        Encode as compact JSON bytes, e.g., for an HTTP response body.
+        """
+        if orjson is not None:
+            return orjson.dumps(obj)
+
+        return json.dumps(obj, separators=(',', ':')) \
+                   .encode()
+
+    @staticmethod
+    def loads(encoding: t.Union[str, bytes]) -> JSON:
+        if orjson is not None:
+            return orjson.loads(encoding)
+
+        return json.loads(encoding)
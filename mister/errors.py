@@ -1,3 +1,5 @@
+import typing as t
+
 # Custom imports
 from mister.constants import Ratings
 from mister.formation import Formation
@@ -10,6 +12,35 @@ class _BaseException(Exception):
     def __repr__(self) -> str:
         return self.message
 
+    def __reduce__(self):
+        # Subclasses take other arguments than the message, so rebuild
+        # from the message alone when crossing process boundaries.
+        return _rebuild, (type(self), self.message)
+
+
+def _rebuild(cls: t.Type[_BaseException],
+             message: str) -> _BaseException:
+    e = cls.__new__(cls)
+    e.message = message
+
+    Exception.__init__(e, message)
+
+    return e
+
+
+class DeadlineExceededError(_BaseException):
+    def __init__(self, timeout: float):
+        """
+        Parameters
+        ----------
+        timeout : float
+            Deadline of the request in seconds
+        """
+        self.message = 'No solution within the {:g} s deadline.' \
+                           .format(timeout)
+
+        super().__init__(self.message)
+
 
 class DuplicatePlayersError(_BaseException):
     def __init__(self):
@@ -18,6 +49,20 @@ class DuplicatePlayersError(_BaseException):
         super().__init__(self.message)
 
 
+class InfeasibleScenarioError(_BaseException):
+    def __init__(self, reasons: t.List[str]):
+        """
+        Parameters
+        ----------
+        reasons : List[str]
+            Conditions or constraints that conflict with each other
+        """
+        self.message = 'No teams can satisfy the scenario: {}.' \
+                           .format('; '.join(reasons))
+
+        super().__init__(self.message)
+
+
 class InvalidFormationError(_BaseException):
     def __init__(self, n: int,
                  formation: Formation):
@@ -37,6 +82,14 @@ class InvalidFormationError(_BaseException):
         super().__init__(self.message)
 
 
+class InvalidPreviousSolutionError(_BaseException):
+    def __init__(self):
+        self.message = 'The previous solution must be a list of teams, ' \
+                       'each with a list of players.'
+
+        super().__init__(self.message)
+
+
 class InvalidRatingError(_BaseException):
     def __init__(self):
         self.message = "Each player must have a rating between {} and {}" \
@@ -45,6 +98,23 @@ class InvalidRatingError(_BaseException):
         super().__init__(self.message)
 
 
+class InvalidSolverConfigError(_BaseException):
+    def __init__(self, parameter: str, value):
+        """
+        Parameters
+        ----------
+        parameter : str
+            Name of the solver parameter
+
+        value : Any
+            Given value of the solver parameter
+        """
+        self.message = 'Invalid value {!r} for solver parameter {}.' \
+                           .format(value, parameter)
+
+        super().__init__(self.message)
+
+
 class NoSolutionError(_BaseException):
     def __init__(self):
         self.message = 'No solution was found.'
@@ -80,8 +150,7 @@ class NotEnoughPlayersError(_BaseException):
         nteams : int
             Number of teams
         """
-        nvalid = nteams*formation \
-                        .__dict__[position.name]
+        nvalid = nteams*formation.quota(position)
 
         self.message = 'Given {} {}. Expected {} for ' \
                        '{} teams with a {} formation.' \
@@ -91,6 +160,20 @@ class NotEnoughPlayersError(_BaseException):
         super().__init__(self.message)
 
 
+class QueueFullError(_BaseException):
+    def __init__(self, depth: int):
+        """
+        Parameters
+        ----------
+        depth : int
+            Maximum number of pending requests
+        """
+        self.message = 'Too many pending requests, ' \
+                       'at most {} allowed.'.format(depth)
+
+        super().__init__(self.message)
+
+
 class TooManyPlayersError(_BaseException):
     def __init__(self, n: int, formation: Formation,
                  position: Position, nteams: int):
@@ -109,8 +192,7 @@ class TooManyPlayersError(_BaseException):
         nteams : int
             Number of teams
         """
-        nvalid = nteams*formation \
-                        .__dict__[position.name]
+        nvalid = nteams*formation.quota(position)
 
         self.message = 'Given {} {}. Expected {} for '   \
                        '{} teams with a {} formation. '  \
@@ -120,3 +202,17 @@ class TooManyPlayersError(_BaseException):
                                    nvalid, nteams, formation)
 
         super().__init__(self.message)
+
+
+class UnknownPlayerError(_BaseException):
+    def __init__(self, name: str):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the player
+        """
+        self.message = 'No player named {!r} in the session.' \
+                           .format(name)
+
+        super().__init__(self.message)
@@ -0,0 +1,346 @@
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.builder import ModelBuilder
+from mister.constants import Constraints
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+
+
+class Feasibility:
+    """
+    Feasibility analysis of a scenario.
+
+    The analytic checks run before the model is built and reject the common
+    infeasible scenarios at once, instead of after a whole search. Otherwise,
+    an infeasible model tells which of its groups of constraints conflict
+    through assumptions. Assignments found outside of CP-SAT, e.g., the
+    teams of a previous solution, are checked against the constraints
+    before they seed it.
+    """
+    @staticmethod
+    def counts(n: int,
+               players: t.List[Player],
+               formation: Formation) -> t.List[str]:
+        """
+        Check the counting conditions that C1 and C4 imply, e.g., after
+        roster edits that skip the validation of a scenario conf.
+
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players to split into teams
+
+        formation : Formation
+            Formation of interest, or None
+
+        Returns
+        -------
+        List[str]
+            Reasons why no teams can satisfy the scenario, if any.
+        """
+        if formation is not None:
+            n = formation.nplayers
+
+        nplayers = len(players)
+
+        if n < 1 or nplayers < n \
+                or nplayers % n:
+            return ['given {} players, expected a positive '
+                    'multiple of {} ({})'.format(nplayers, n,
+                                                 Constraints['C1'])]
+
+        if formation is None:
+            return []
+
+        nteams = nplayers // n
+
+        reasons = []
+
+        for k in Position:
+            count = sum(p.position == k for p in players)
+            nvalid = nteams*formation.quota(k)
+
+            if count != nvalid:
+                reasons.append('given {} {}, expected {} for {} teams '
+                               'with a {} formation ({})'
+                                   .format(count, k.fullform(plura=True),
+                                           nvalid, nteams, formation,
+                                           Constraints['C4']))
+
+        return reasons
+
+    @staticmethod
+    def analyze(n: int,
+                players: t.List[Player],
+                formation: Formation,
+                tiers: int = None) -> t.List[str]:
+        """
+        Check the Nteams highest and lowest-rated players against the
+        formation: as C5 and C6 spread them one per team, each team holds
+        at most one of the former, one of the latter, and two of both of
+        any position, within its quota.
+
+        The counts per position are validated beforehand, see counts.
+
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players to split into teams
+
+        formation : Formation
+            Formation of interest, or None
+
+        tiers : int
+            Number of quantile tiers of C9, which replaces C5 and C6.
+            The default is None.
+
+        Returns
+        -------
+        List[str]
+            Reasons why no teams can satisfy the scenario, if any.
+        """
+        if formation is None or tiers is not None:
+            return []
+
+        n = formation.nplayers
+        nplayers = len(players)
+
+        if nplayers < n or nplayers % n:
+            return []
+
+        nteams = nplayers // n
+
+        # Same rows as the CP model
+        players = sorted(players, key=lambda p: p.rating)
+
+        top_n  = players[-nteams:]
+        flop_n = players[:nteams]
+
+        reasons = []
+
+        for k in Position:
+            quota = formation.quota(k)
+
+            for extremes, nmax, constraints in [
+                    (top_n, min(quota, 1), ('C4', 'C5')),
+                    (flop_n, min(quota, 1), ('C4', 'C6')),
+                    (top_n + flop_n, min(quota, 2), ('C4', 'C5', 'C6'))]:
+                count = sum(p.position == k for p in extremes)
+
+                if count > nteams*nmax:
+                    reasons.append(
+                        'given {} {} among the {} {}-rated players, '
+                        'expected at most {} for {} teams with a {} '
+                        'formation ({})'.format(
+                            count, k.fullform(plura=True), len(extremes),
+                            'highest' if extremes is top_n
+                            else 'lowest' if extremes is flop_n
+                            else 'highest and lowest',
+                            nteams*nmax, nteams, formation,
+                            ', '.join(Constraints[c]
+                                      for c in constraints)))
+
+                    # Both extremes at once would only repeat it
+                    break
+
+        return reasons
+
+    @staticmethod
+    def conflicts(builder: ModelBuilder,
+                  time_limit: float = None) -> t.List[str]:
+        """
+        Find a minimal set of conflicting groups of constraints.
+
+        Each group is enforced by an assumption, the solver gives a set of
+        assumptions sufficient for infeasibility, and dropping each of them
+        in turn while the rest stays infeasible makes the set minimal.
+
+        Parameters
+        ----------
+        builder : ModelBuilder
+            Model builder whose constraints were grouped
+
+        time_limit : float
+            Time budget of each solve in seconds. The default is None.
+
+        Returns
+        -------
+        List[str]
+            Names of the conflicting groups, if the model is infeasible.
+        """
+        proto = builder.model.Proto()
+        proto.ClearField('objective')
+
+        assumptions = builder.add_assumptions()
+
+        solver = cp_model.CpSolver()
+
+        # Infeasibility cores need a sequential search
+        solver.parameters.num_search_workers = 1
+
+        if time_limit is not None:
+            solver.parameters.max_time_in_seconds = time_limit
+
+        if solver.Solve(builder.model) != cp_model.INFEASIBLE:
+            return []
+
+        core = [i for i in solver.SufficientAssumptionsForInfeasibility()
+                if i in assumptions]
+
+        for i in list(core):
+            subset = [j for j in core if j != i]
+
+            proto.assumptions[:] = subset
+
+            if solver.Solve(builder.model) == cp_model.INFEASIBLE:
+                core = subset
+
+        return [assumptions[i] for i in core]
+
+    @staticmethod
+    def spread(assignment: np.ndarray,
+               nteams: int,
+               tiers: int = None) -> bool:
+        """
+        Whether an assignment of the players of a whole league, sorted by
+        rating, satisfies C5 and C6, or C9 with tiers.
+        """
+        return not Feasibility.unspread(assignment, nteams, tiers)
+
+    @staticmethod
+    def unspread(assignment: np.ndarray,
+                 nteams: int,
+                 tiers: int = None) -> t.Set[int]:
+        """
+        Teams that break C5 and C6, or C9 with tiers, in an assignment of
+        the players of a whole league sorted by rating. Players without a
+        team yet have -1.
+        """
+        rows = np.arange(len(assignment))
+
+        if tiers is None:
+            groups = [rows[-nteams:], rows[:nteams]]
+        else:
+            groups = [g for g in np.array_split(rows, tiers) if len(g)]
+
+        broken = set()
+
+        for g in groups:
+            tids = assignment[g]
+            counts = np.bincount(tids[tids >= 0], minlength=nteams)
+
+            broken.update(np.flatnonzero(
+                (counts < len(g)//nteams)
+                | (counts > -(-len(g)//nteams))).tolist())
+
+        return broken
+
+    @staticmethod
+    def unbalanced(players: t.List[Player],
+                   assignment: np.ndarray,
+                   nteams: int,
+                   position_tolerance: int = None) -> t.Set[int]:
+        """
+        Teams that break C10 around the average rating per position of
+        a whole league. Players without a team yet have -1.
+        """
+        if position_tolerance is None:
+            return set()
+
+        ratings = np.array([p.rating for p in players], dtype=np.int64)
+        assigned = assignment >= 0
+
+        broken = set()
+
+        for k in Position:
+            mask = np.array([p.position == k for p in players],
+                            dtype=bool)
+
+            avg_rating = int(ratings[mask].sum())//nteams
+
+            mask &= assigned
+
+            trating = np.bincount(assignment[mask],
+                                  weights=ratings[mask],
+                                  minlength=nteams)
+
+            broken.update(np.flatnonzero(
+                np.abs(trating - avg_rating) > position_tolerance).tolist())
+
+        return broken
+
+    @staticmethod
+    def satisfies(builder: ModelBuilder,
+                  assignment: np.ndarray,
+                  formation: Formation,
+                  tiers: int = None,
+                  position_tolerance: int = None) -> bool:
+        """
+        Whether a complete assignment satisfies C1, C4 or C7, C5 and C6 or
+        C9, and C10, e.g., the teams of a previous solution.
+        """
+        nteams = builder.nteams
+
+        if (assignment < 0).any() \
+                or (np.bincount(assignment, minlength=nteams)
+                    != builder.nplayers // nteams).any():
+            return False
+
+        for k in Position:
+            counts = np.bincount(assignment[builder.rows(k)],
+                                 minlength=nteams)
+
+            if formation is not None \
+                    and (counts != formation.quota(k)).any():
+                return False
+
+            if counts.max() - counts.min() > 1:
+                return False
+
+        if tiers is None \
+                and not Feasibility.spread(assignment, nteams):
+            return False
+
+        return Feasibility.admissible(builder, assignment, tiers,
+                                      position_tolerance)
+
+    @staticmethod
+    def admissible(builder: ModelBuilder,
+                   assignment: np.ndarray,
+                   tiers: int = None,
+                   position_tolerance: int = None) -> bool:
+        """
+        Whether an assignment satisfies C9 and C10,
+        which the heuristic engine does not know of.
+        """
+        nteams = builder.nteams
+
+        if tiers is not None \
+                and not Feasibility.spread(assignment, nteams, tiers):
+            return False
+
+        if position_tolerance is not None:
+            for k in Position:
+                rows = builder.rows(k)
+
+                ratings = np.bincount(assignment[rows],
+                                      weights=builder.ratings[rows],
+                                      minlength=nteams)
+
+                if np.abs(ratings - builder.position_avg_rating(k)).max() \
+                        > position_tolerance:
+                    return False
+
+        return True
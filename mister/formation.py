@@ -1,8 +1,11 @@
 # Custom imports
+from mister.position import Position
 from mister.serializable import Serializable
 
 
 class Formation(Serializable):
+    __slots__ = ('D', 'M', 'F')
+
     def __init__(self, D: int, M: int, F: int):
         """
         Parameters
@@ -24,6 +27,12 @@ class Formation(Serializable):
     def nplayers(self):
         return self.D + self.M + self.F
 
+    def quota(self, k: Position) -> int:
+        """
+        Number of players at position k per team.
+        """
+        return getattr(self, k.name)
+
     @staticmethod
     def deserialize(econding: str,
                     delimiter: str = '-') \
@@ -0,0 +1,550 @@
+import typing as t
+
+import numpy as np
+
+# Custom imports
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+
+
+# Index of each position in the arrays
+_Positions = {k: i for i, k in enumerate(Position)}
+
+# Classes of players that C5 and C6 spread one per team
+_MIDDLE = 0
+_FLOP   = 1
+_TOP    = 2
+
+
+def _match(rows: np.ndarray,
+           preferences: t.List[t.List[int]],
+           quotas: np.ndarray,
+           positions: np.ndarray) -> t.Optional[t.Dict[int, int]]:
+    """
+    Assign each row to its own team with room left at its position,
+    by augmenting paths. Each row tries the teams in order of preference.
+    """
+    owners = {}
+
+    def _augment(j: int, seen: t.Set[int]) -> bool:
+        for tid in preferences[j]:
+            if tid in seen \
+                    or quotas[tid, positions[rows[j]]] < 1:
+                continue
+
+            seen.add(tid)
+
+            if tid not in owners \
+                    or _augment(owners[tid], seen):
+                owners[tid] = j
+                return True
+
+        return False
+
+    for j in range(len(rows)):
+        if not _augment(j, set()):
+            return None
+
+    return {int(rows[j]): tid for tid, j
+            in owners.items()}
+
+def _others_max(absdev: np.ndarray,
+                w: int, tids: np.ndarray) -> np.ndarray:
+    """
+    Largest deviation of the teams other than w and each of tids.
+    """
+    result = np.zeros(len(tids), dtype=np.int64)
+    done = np.zeros(len(tids), dtype=bool)
+
+    # Excluding two teams, one of the three largest is left
+    for i in np.argsort(-absdev, kind='stable')[:3]:
+        if i == w:
+            continue
+
+        take = ~done & (tids != i)
+
+        result[take] = absdev[i]
+        done |= take
+
+    return result
+
+
+class Heuristic:
+    """
+    Pure Python engine of greedy draft and local search.
+
+    Players are drafted by decreasing rating to the weakest team with room
+    at their position, once the Nteams highest and lowest-rated players are
+    spread one per team. Swaps of one or two pairs of players that keep each
+    team's positions valid then lower the largest deviation from the average.
+
+    The result satisfies the constraints of the CP model, so it serves
+    as a low-latency answer, as hints and as an upper bound on epsilon.
+    """
+    @staticmethod
+    def make_assignment(players: t.List[Player],
+                        nteams: int,
+                        formation: Formation = None,
+                        max_iterations: int = None) \
+                       -> t.Optional[np.ndarray]:
+        """
+        Split players into teams.
+
+        Parameters
+        ----------
+        players : List[Player]
+            Players to split into teams
+
+        nteams : int
+            Number of teams
+
+        formation : Formation
+            Formation of interest, or None
+
+        max_iterations : int
+            Maximum number of swaps. The default is ten per player.
+
+        Returns
+        -------
+        Optional[ndarray]
+            Team Id of each player, with the i-th of the Nteams highest-rated
+            players in team i as C8 does, or None if no draft was found.
+        """
+        nplayers = len(players)
+        n = nplayers // nteams
+
+        if max_iterations is None:
+            max_iterations = 10*nplayers
+
+        # Same order as the rows of the CP model
+        order, ratings, positions, classes = \
+            Heuristic._rows(players, nteams)
+
+        counts = np.bincount(positions, minlength=len(Position))
+
+        bounds = Heuristic._bounds(counts, nteams, formation)
+
+        if bounds is None:
+            return None
+
+        lb, ub = bounds
+
+        quotas = Heuristic._quotas(counts, nteams, n, lb)
+
+        team = Heuristic._draft(ratings, positions,
+                                nteams, quotas)
+
+        if team is None:
+            return None
+
+        Heuristic._local_search(ratings, positions, classes,
+                                team, nteams, lb, ub,
+                                max_iterations)
+
+        return Heuristic._labelled(team, order, nteams)
+
+    @staticmethod
+    def improve_assignment(players: t.List[Player],
+                           nteams: int,
+                           assignment: t.Sequence[int],
+                           formation: Formation = None,
+                           max_iterations: int = None) \
+                          -> t.Optional[np.ndarray]:
+        """
+        Lower the largest deviation of given teams, e.g., those of a
+        previous solution after a few edits, by the local search alone.
+
+        Parameters
+        ----------
+        players : List[Player]
+            Players split into teams
+
+        nteams : int
+            Number of teams
+
+        assignment : Sequence[int]
+            Team Id of each player, which satisfies the constraints
+
+        formation : Formation
+            Formation of interest, or None
+
+        max_iterations : int
+            Maximum number of swaps. The default is ten per player.
+
+        Returns
+        -------
+        Optional[ndarray]
+            Team Id of each player, with the i-th of the Nteams highest-rated
+            players in team i as C8 does, or None if the positions of the
+            players cannot satisfy the formation.
+        """
+        nplayers = len(players)
+
+        if max_iterations is None:
+            max_iterations = 10*nplayers
+
+        order, ratings, positions, classes = \
+            Heuristic._rows(players, nteams)
+
+        bounds = Heuristic._bounds(np.bincount(positions,
+                                               minlength=len(Position)),
+                                   nteams, formation)
+
+        if bounds is None:
+            return None
+
+        team = np.asarray(assignment, dtype=np.int64)[order]
+
+        Heuristic._local_search(ratings, positions, classes,
+                                team, nteams, *bounds,
+                                max_iterations)
+
+        return Heuristic._labelled(team, order, nteams)
+
+    @staticmethod
+    def _rows(players: t.List[Player],
+              nteams: int) -> t.Tuple[t.List[int], np.ndarray,
+                                      np.ndarray, np.ndarray]:
+        """
+        Order of the players by rating, and their ratings, positions
+        and classes of C5 and C6 in that order.
+        """
+        nplayers = len(players)
+
+        order = sorted(range(nplayers),
+                       key=lambda i: players[i].rating)
+
+        ratings = np.array([players[i].rating for i in order],
+                           dtype=np.int64)
+        positions = np.array([_Positions[players[i].position]
+                              for i in order], dtype=np.int64)
+
+        classes = np.full(nplayers, _MIDDLE, dtype=np.int64)
+        classes[:nteams] = _FLOP
+        classes[-nteams:] = _TOP
+
+        return order, ratings, positions, classes
+
+    @staticmethod
+    def _bounds(counts: np.ndarray,
+                nteams: int,
+                formation: Formation) \
+               -> t.Optional[t.Tuple[np.ndarray, np.ndarray]]:
+        """
+        Bounds on the players per position of each team, or None if
+        the players cannot satisfy the formation.
+        """
+        if formation is not None:
+            lb = np.array([formation.quota(k)
+                           for k in Position], dtype=np.int64)
+
+            if not np.array_equal(counts, lb*nteams):
+                return None
+
+            return lb, lb
+
+        # C7 as floor and ceil bounds per position
+        return counts // nteams, -(-counts // nteams)
+
+    @staticmethod
+    def _labelled(team: np.ndarray,
+                  order: t.List[int],
+                  nteams: int) -> np.ndarray:
+        """
+        Team Id of each player in the order given, relabelled by C8.
+        """
+        labels = np.arange(nteams)
+
+        # C8. The i-th of the Nteams highest-rated players in team i,
+        # if they are in as many teams as by C5
+        if len(np.unique(team[-nteams:])) == nteams:
+            labels[team[-nteams:]] = np.arange(nteams)
+
+        assignment = np.empty(len(order), dtype=np.int64)
+        assignment[order] = labels[team]
+
+        return assignment
+
+    @staticmethod
+    def epsilon(players: t.List[Player],
+                assignment: t.Sequence[int],
+                nteams: int) -> int:
+        """
+        Largest deviation of a team rating from the average rating.
+        """
+        ratings = np.array([p.rating for p in players],
+                           dtype=np.int64)
+
+        avg_rating_per_team = int(ratings.sum())//nteams
+
+        trating = np.bincount(np.asarray(assignment),
+                              weights=ratings,
+                              minlength=nteams)
+
+        return int(np.abs(trating - avg_rating_per_team).max())
+
+    @staticmethod
+    def _quotas(counts: np.ndarray,
+                nteams: int, n: int,
+                lb: np.ndarray) -> np.ndarray:
+        """
+        Number of players per position of each team in the draft.
+
+        The players beyond the floor of each position are dealt round
+        robin, so that every team ends up with n players.
+        """
+        quotas = np.tile(lb, (nteams, 1))
+
+        tid = 0
+
+        for k, extra in enumerate(counts - lb*nteams):
+            for _ in range(int(extra)):
+                quotas[tid, k] += 1
+                tid = (tid + 1) % nteams
+
+        return quotas
+
+    @staticmethod
+    def _draft(ratings: np.ndarray,
+               positions: np.ndarray,
+               nteams: int,
+               quotas: np.ndarray) -> t.Optional[np.ndarray]:
+        nplayers = len(ratings)
+
+        quotas = quotas.copy()
+        team = np.full(nplayers, -1, dtype=np.int64)
+        trating = np.zeros(nteams, dtype=np.int64)
+
+        tids = list(range(nteams))
+
+        # C5. The i-th highest-rated players first tries team i, and
+        # C6. the lowest-rated one the team of the highest-rated one.
+        top = _match(np.arange(nplayers - nteams, nplayers),
+                     [tids[j:] + tids[:j]
+                      for j in range(nteams)],
+                     quotas, positions)
+
+        if top is None:
+            return None
+
+        for i, tid in top.items():
+            team[i] = tid
+            quotas[tid, positions[i]] -= 1
+            trating[tid] += ratings[i]
+
+        flop = [i for i in range(nteams) if team[i] < 0]
+
+        pairs = _match(np.array(flop, dtype=np.int64),
+                       [tids[nteams - 1 - j:] + tids[:nteams - 1 - j]
+                        for j in range(len(flop))],
+                       quotas, positions)
+
+        if pairs is None:
+            return None
+
+        for i, tid in pairs.items():
+            team[i] = tid
+            quotas[tid, positions[i]] -= 1
+            trating[tid] += ratings[i]
+
+        # Everyone else to the weakest team with room at their position
+        for i in range(nplayers - nteams - 1, nteams - 1, -1):
+            candidates = np.flatnonzero(quotas[:, positions[i]] > 0)
+
+            if not len(candidates):
+                return None
+
+            tid = candidates[np.argmin(trating[candidates])]
+
+            team[i] = tid
+            quotas[tid, positions[i]] -= 1
+            trating[tid] += ratings[i]
+
+        return team
+
+    @staticmethod
+    def _local_search(ratings: np.ndarray,
+                      positions: np.ndarray,
+                      classes: np.ndarray,
+                      team: np.ndarray,
+                      nteams: int,
+                      lb: np.ndarray,
+                      ub: np.ndarray,
+                      max_iterations: int):
+        """
+        Exchange players in place while the largest deviation,
+        or else the sum of squared deviations, decreases.
+
+        Single swaps are tried first, then swaps of two pairs of players
+        between two teams, which may trade positions with a formation.
+        """
+        avg_rating_per_team = int(ratings.sum())//nteams
+
+        dev = np.bincount(team, weights=ratings, minlength=nteams) \
+                .astype(np.int64) - avg_rating_per_team
+
+        counts = np.zeros((nteams, len(Position)), dtype=np.int64)
+        np.add.at(counts, (team, positions), 1)
+
+        onehot = np.eye(len(Position), dtype=np.int64)[positions]
+
+        for _ in range(max_iterations):
+            absdev = np.abs(dev)
+            current = (int(absdev.max()), int((dev**2).sum()))
+
+            if current[0] == 0:
+                break
+
+            exchange = Heuristic._swap(ratings, positions, classes,
+                                       team, dev, absdev, counts,
+                                       lb, ub, current) \
+                       or Heuristic._double_swap(ratings, onehot, classes,
+                                                 team, dev, absdev, counts,
+                                                 lb, ub, current)
+
+            if exchange is None:
+                break
+
+            for i, j in exchange:
+                ti, tj = team[i], team[j]
+                d = ratings[i] - ratings[j]
+
+                team[i], team[j] = tj, ti
+
+                dev[ti] -= d
+                dev[tj] += d
+
+                counts[ti] += onehot[j] - onehot[i]
+                counts[tj] += onehot[i] - onehot[j]
+
+    @staticmethod
+    def _swap(ratings: np.ndarray,
+              positions: np.ndarray,
+              classes: np.ndarray,
+              team: np.ndarray,
+              dev: np.ndarray,
+              absdev: np.ndarray,
+              counts: np.ndarray,
+              lb: np.ndarray,
+              ub: np.ndarray,
+              current: t.Tuple[int, int]) \
+             -> t.Optional[t.List[t.Tuple[int, int]]]:
+        """
+        Best improving swap of a player of the worst team possible.
+        """
+        for w in np.argsort(-absdev, kind='stable'):
+            a = np.flatnonzero(team == w)
+            b = np.flatnonzero(team != w)
+
+            tb = team[b]
+
+            # Rating moved from team w to the team of b
+            d = ratings[a][:, None] - ratings[b][None, :]
+
+            devw = dev[w] - d
+            devb = dev[tb][None, :] + d
+
+            newmax = np.maximum(_others_max(absdev, w, tb)[None, :],
+                                np.maximum(np.abs(devw), np.abs(devb)))
+            newsq = current[1] - dev[w]**2 - dev[tb][None, :]**2 \
+                    + devw**2 + devb**2
+
+            pa = positions[a][:, None]
+            pb = positions[b][None, :]
+
+            # C5 and C6 keep a player of each class per team, while
+            # C4 and C7 keep the players per position within bounds
+            valid = (classes[a][:, None] == classes[b][None, :]) \
+                    & ((pa == pb)
+                       | ((counts[w, pa] > lb[pa])
+                          & (counts[w, pb] < ub[pb])
+                          & (counts[tb[None, :], pb] > lb[pb])
+                          & (counts[tb[None, :], pa] < ub[pa])))
+
+            improving = valid & ((newmax < current[0])
+                                 | ((newmax == current[0])
+                                    & (newsq < current[1])))
+
+            if improving.any():
+                ia, ib = np.nonzero(improving)
+                best = np.lexsort((newsq[ia, ib], newmax[ia, ib]))[0]
+
+                return [(a[ia[best]], b[ib[best]])]
+
+        return None
+
+    @staticmethod
+    def _double_swap(ratings: np.ndarray,
+                     onehot: np.ndarray,
+                     classes: np.ndarray,
+                     team: np.ndarray,
+                     dev: np.ndarray,
+                     absdev: np.ndarray,
+                     counts: np.ndarray,
+                     lb: np.ndarray,
+                     ub: np.ndarray,
+                     current: t.Tuple[int, int]) \
+                    -> t.Optional[t.List[t.Tuple[int, int]]]:
+        """
+        Best improving swap of two players of the worst team
+        possible with two players of another team.
+        """
+        nteams = len(dev)
+
+        # Only from the worst team, as these are many more candidates
+        for w in np.argsort(-absdev, kind='stable')[:1]:
+            a = np.flatnonzero(team == w)
+            a1, a2 = [a[k] for k in np.triu_indices(len(a), 1)]
+
+            for o in range(nteams):
+                if o == w:
+                    continue
+
+                b = np.flatnonzero(team == o)
+                b1, b2 = [b[k] for k in np.triu_indices(len(b), 1)]
+
+                # Rating moved from team w to team o
+                d = (ratings[a1] + ratings[a2])[:, None] \
+                    - (ratings[b1] + ratings[b2])[None, :]
+
+                devw = dev[w] - d
+                devo = dev[o] + d
+
+                others = _others_max(absdev, w, np.array([o]))[0]
+
+                newmax = np.maximum(others,
+                                    np.maximum(np.abs(devw), np.abs(devo)))
+                newsq = current[1] - dev[w]**2 - dev[o]**2 \
+                        + devw**2 + devo**2
+
+                # Same classes both ways, and positions within bounds
+                ca = np.minimum(classes[a1], classes[a2])*3 \
+                     + np.maximum(classes[a1], classes[a2])
+                cb = np.minimum(classes[b1], classes[b2])*3 \
+                     + np.maximum(classes[b1], classes[b2])
+
+                moved = (onehot[b1] + onehot[b2])[None, :, :] \
+                        - (onehot[a1] + onehot[a2])[:, None, :]
+
+                countw = counts[w] + moved
+                counto = counts[o] - moved
+
+                valid = (ca[:, None] == cb[None, :]) \
+                        & np.all((countw >= lb) & (countw <= ub)
+                                 & (counto >= lb) & (counto <= ub),
+                                 axis=2)
+
+                improving = valid & ((newmax < current[0])
+                                     | ((newmax == current[0])
+                                        & (newsq < current[1])))
+
+                if improving.any():
+                    ia, ib = np.nonzero(improving)
+                    best = np.lexsort((newsq[ia, ib],
+                                       newmax[ia, ib]))[0]
+
+                    return [(a1[ia[best]], b1[ib[best]]),
+                            (a2[ia[best]], b2[ib[best]])]
+
+        return None
@@ -0,0 +1,36 @@
+import typing as t
+
+# Custom imports
+from mister.team import Team
+
+
+class SolutionListener:
+    """
+    Receiver of the intermediate solutions of a search, e.g., to stream
+    them to a client. Its methods run on the solver's callback thread.
+    """
+    def on_solution(self, epsilon: int,
+                    teams: t.List[Team],
+                    walltime: float):
+        """
+        Parameters
+        ----------
+        epsilon : int
+            Objective value of the solution
+
+        teams : List[Team]
+            Teams of the solution
+
+        walltime : float
+            Time elapsed since the start of the search in seconds
+        """
+        pass
+
+    def on_finish(self, stats: t.Dict[str, t.Any]):
+        """
+        Parameters
+        ----------
+        stats : Dict[str, Any]
+            Solver statistics of the search
+        """
+        pass
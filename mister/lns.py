@@ -0,0 +1,262 @@
+import logging
+import random
+import threading
+import time
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.builder import epsilon_bounds
+from mister.builder import ModelBuilder
+from mister.config import SolverConfig
+from mister.constants import Phases
+from mister.constants import Statuses
+from mister.listener import SolutionListener
+from mister.metrics import metrics
+from mister.player import Player
+from mister.team import Team
+
+
+# Teams re-optimized at once by each round of
+# the large neighbourhood search, and its time budget
+LNS_nteams     = 4
+LNS_time_limit = 1.
+
+
+logger = logging.getLogger(__name__)
+
+
+def _score(ratings: np.ndarray,
+           assignment: np.ndarray,
+           nteams: int,
+           avg_rating: int) -> t.Tuple[int, int]:
+    """
+    Largest and sum of squared deviations from the average rating.
+    """
+    dev = np.bincount(assignment, weights=ratings,
+                      minlength=nteams).astype(np.int64) - avg_rating
+
+    return int(np.abs(dev).max()), int((dev**2).sum())
+
+def _neighbourhood(dev: np.ndarray,
+                   rng: random.Random) -> t.List[int]:
+    """
+    Pick a worst team, one of the teams that deviate the
+    most the other way, and random ones up to LNS_nteams.
+    """
+    absdev = np.abs(dev)
+
+    w = rng.choice(np.flatnonzero(absdev == absdev.max()).tolist())
+
+    others = sorted((tid for tid in range(len(dev)) if tid != w),
+                    key=lambda tid: dev[tid]*np.sign(dev[w]))
+
+    opposite = rng.choice(others[:3])
+    others.remove(opposite)
+
+    return [w, opposite] + rng.sample(others,
+                                      min(LNS_nteams - 2, len(others)))
+
+
+class LNS:
+    """
+    Large neighbourhood search of the teams of a large league.
+
+    Each round re-optimizes LNS_nteams teams with CP-SAT, the worst one
+    among them, while the others stay fixed. As every round solves a model
+    of the same size, time and memory grow linearly with the number of
+    players.
+    """
+    @staticmethod
+    def improve(players: t.List[Player],
+                nteams: int,
+                assignment: np.ndarray,
+                build: t.Callable[[t.List[Player], int],
+                                  t.Tuple[ModelBuilder, cp_model.IntVar]],
+                config: SolverConfig,
+                start: float,
+                listener: SolutionListener = None,
+                interrupt: threading.Event = None) \
+               -> t.Tuple[np.ndarray, t.Dict[str, t.Any]]:
+        """
+        Improve teams round by round. The rounds stop once epsilon reaches
+        its lower bound, the time limit expires, or no round improved the
+        teams for twice as many rounds as there are teams.
+
+        Parameters
+        ----------
+        players : List[Player]
+            Players split into teams, sorted by rating
+
+        nteams : int
+            Number of teams
+
+        assignment : ndarray
+            Team Id of each player, which satisfies the constraints
+
+        build : Callable[[List[Player], int], Tuple[ModelBuilder, IntVar]]
+            Builder of the CP model of a subset of the players, given the
+            average rating per team of the whole league, and its epsilon
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver
+
+        start : float
+            Start of the search, as given by perf_counter, from which
+            the time limit and the wall times run
+
+        listener : SolutionListener
+            Receiver of each improving solution. The default is None.
+
+        interrupt : Event
+            Event that stops the search once set. The default is None.
+
+        Returns
+        -------
+        Tuple[ndarray, Dict[str, Any]]
+            Team Id of each player, with the i-th of the Nteams highest-rated
+            players in team i as C8 does, and the statistics of the search.
+        """
+        deadline = start + config.time_limit \
+                   if config.time_limit else float('inf')
+
+        ratings = np.array([p.rating for p in players],
+                           dtype=np.int64)
+
+        avg_rating_per_team = int(ratings.sum())//nteams
+        lb, _ = epsilon_bounds(ratings, nteams)
+
+        best = _score(ratings, assignment, nteams,
+                      avg_rating_per_team)
+
+        logger.info('LNS of %i players and %i teams from heuristic '
+                    'epsilon %i with lower bound %i', len(players),
+                    nteams, best[0], lb)
+
+        rng = random.Random(config.random_seed)
+
+        nrounds = nstale = nsolutions = 0
+        conflicts = branches = 0
+
+        stop = Statuses['CONVERGED']
+
+        while best[0] > lb:
+            if interrupt is not None \
+                    and interrupt.is_set():
+                stop = Statuses['INTERRUPTED']
+                break
+
+            remaining = deadline - time.perf_counter()
+
+            if remaining <= 0:
+                stop = Statuses['TIME_LIMIT']
+                break
+
+            if nstale >= 2*nteams:
+                break
+
+            dev = np.bincount(assignment, weights=ratings,
+                              minlength=nteams).astype(np.int64) \
+                  - avg_rating_per_team
+
+            tids = _neighbourhood(dev, rng)
+            rows = np.flatnonzero(np.isin(assignment, tids))
+
+            nrounds += 1
+            nstale += 1
+
+            # The subset keeps the order of the rows, so that C5, C6 and
+            # C8 refer to the same players as in the whole league
+            with metrics.timer(Phases['BUILD']):
+                builder, e = build([players[i] for i in rows],
+                                   avg_rating_per_team)
+
+            current = assignment[rows]
+            labels = {tid: j for j, tid
+                      in enumerate(current[-len(tids):].tolist())}
+
+            builder.add_hints({p.name: labels[tid] for p, tid
+                               in zip(builder.players, current.tolist())})
+
+            # Only a better worst team among them is of interest
+            sublb, _ = builder.epsilon_bounds()
+            subub = int(np.abs(dev[tids]).max())
+
+            if sublb > subub:
+                continue
+
+            builder.set_bounds(e, sublb, subub)
+
+            solver = cp_model.CpSolver()
+            config.apply(solver.parameters)
+            solver.parameters.max_time_in_seconds = min(LNS_time_limit,
+                                                        remaining)
+
+            with metrics.timer(Phases['SOLVE']):
+                status = solver.Solve(builder.model)
+
+            conflicts += solver.NumConflicts()
+            branches += solver.NumBranches()
+
+            if status not in (cp_model.OPTIMAL,
+                              cp_model.FEASIBLE):
+                continue
+
+            # Team Ids of the subproblem back to those of the league
+            unlabels = np.empty(len(tids), dtype=np.int64)
+
+            for tid, j in labels.items():
+                unlabels[j] = tid
+
+            subassignment = np.array([[solver.BooleanValue(v) for v in row]
+                                      for row in builder.x]).argmax(axis=1)
+
+            candidate = assignment.copy()
+            candidate[rows] = unlabels[subassignment]
+
+            score = _score(ratings, candidate, nteams,
+                           avg_rating_per_team)
+
+            # Sideways moves are taken too, to move across plateaus
+            if score > best:
+                continue
+
+            assignment = candidate
+
+            if score < best:
+                best = score
+                nstale = 0
+                nsolutions += 1
+
+                logger.debug('LNS round %i: epsilon %i',
+                             nrounds, best[0])
+
+                if listener is not None:
+                    listener.on_solution(best[0],
+                                         Team.from_assignment(
+                                             players, assignment.tolist()),
+                                         time.perf_counter() - start)
+
+        if best[0] == lb:
+            stop = Statuses['OPTIMAL']
+
+        walltime = time.perf_counter() - start
+
+        logger.info('LNS epsilon: %i after %i rounds in %f s',
+                    best[0], nrounds, walltime)
+
+        # C8. The i-th of the Nteams highest-rated players in team i
+        labels = np.empty(nteams, dtype=np.int64)
+        labels[assignment[-nteams:]] = np.arange(nteams)
+
+        return labels[assignment], {
+            'status': stop,
+            'epsilon': best[0],
+            'conflicts': conflicts,
+            'branches': branches,
+            'walltime': walltime,
+            'nsolutions': nsolutions,
+        }
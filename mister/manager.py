@@ -1,88 +1,260 @@
-import itertools as it
+import concurrent.futures as cf
+import logging
+import multiprocessing
+import os
 import random
+import threading
+import time
 import typing as t
 
+import numpy as np
+
 from ortools.sat.python import cp_model
 
 # Custom imports
-from mister.constants import Ratings
+from mister.builder import epsilon_bounds
+from mister.builder import ModelBuilder
+from mister.collector import SolutionCollector
+from mister.collector import SolutionListener
+from mister.config import SolverConfig
+from mister.constants import Constraints
+from mister.constants import Encodings
+from mister.constants import Engines
+from mister.constants import Objectives
+from mister.constants import Phases
+from mister.constants import Statuses
+from mister.errors import InfeasibleScenarioError
 from mister.errors import NoSolutionError
+from mister.feasibility import Feasibility
 from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.lns import LNS
+from mister.metrics import metrics
+from mister.objective import Lexicographic
 from mister.player import Player
+from mister.pool import Pool
 from mister.position import Position
 from mister.solution import Solution
 from mister.team import Team
+from mister.template import ModelTemplates
+from mister.warm import WarmStart
 
 
-MIN_epsilon   = 0
-MAX_epsilon   = Ratings['MAX']
+logger = logging.getLogger(__name__)
 
-MIN_solutions = 3
+# CP models of the shapes solved so far in this process
+model_templates = ModelTemplates()
 
 
 def _npositions():
     return len(Position)
 
-
-class SolutionPrinter(cp_model.CpSolverSolutionCallback):
+def _interruptible(solver: cp_model.CpSolver,
+                   model: cp_model.CpModel,
+                   callback: cp_model.CpSolverSolutionCallback,
+                   interrupt: threading.Event):
     """
-    Intermediate solutions printer.
+    Solve while a watcher stops the search once interrupt is set.
     """
-    def __init__(self, players_per_tid: t.Dict[t.Tuple[Player, int],
-                                               cp_model.IntVar]):
-        cp_model.CpSolverSolutionCallback.__init__(self)
+    done = threading.Event()
+
+    def _watch():
+        while not done.is_set():
+            if interrupt.wait(0.05):
+                callback.StopSearch()
+                break
+
+    watcher = threading.Thread(target=_watch, daemon=True)
+    watcher.start()
 
-        self.__nsolutions = 0
-        self.__players_per_tid = players_per_tid
-        self.__solutions = []
+    try:
+        return solver.SolveWithSolutionCallback(model, callback)
+    finally:
+        done.set()
+        watcher.join()
 
-    def on_solution_callback(self):
-        if self.ObjectiveValue() <= int(MAX_epsilon*0.32):
-            print('\nSolution %i with:' % self.__nsolutions)
+def _finish(stats: t.Dict[str, t.Any],
+            listener: SolutionListener = None):
+    """
+    Record the statistics of a search and pass them on to the listener.
+    """
+    metrics.inc('solves', status=stats['status'])
+    metrics.inc('solutions', stats['nsolutions'])
+    metrics.inc('conflicts', stats['conflicts'])
+    metrics.inc('branches', stats['branches'])
 
-            self.__nsolutions += 1
+    if listener is not None:
+        listener.on_finish(stats)
 
-            solution = {ptid: self.Value(v) for ptid, v
-                        in self.__players_per_tid.items()}
+def _make_teams_one(kwargs: t.Dict[str, t.Any],
+                    ncores: int) \
+                   -> t.Tuple[t.Union[Solution, Exception], float]:
+    """
+    Solve one scenario of a batch in a worker process within its
+    core budget, returning the error rather than raising it.
+    """
+    kwargs = dict(kwargs)
+    kwargs['config'] = (kwargs.get('config') or SolverConfig()) \
+                           .bounded(None, ncores)
 
-            self.__solutions.append(
-                (self.ObjectiveValue(),
-                solution))
+    start = time.perf_counter()
 
-            print('    Objective value = %i\n'
-                % self.ObjectiveValue())
+    try:
+        result = Manager.make_teams(**kwargs)
+    except Exception as e:
+        result = e
 
-            # Print each team's info
-            for _t in Team.from_associations(
-                    self.__players_per_tid, self):
-                print('    Team %i with rating = %i [\n' %
-                    (_t.id, _t.rating), end='')
+    return result, time.perf_counter() - start
 
-                for p in _t.players:
-                    print('        (%s,%s,%s)\n' %
-                        (p.name, p.rating, p.position), end='')
+def _seed(builder: ModelBuilder,
+          formation: Formation,
+          config: SolverConfig,
+          previous: t.Dict[str, int] = None,
+          symmetry_breaking: bool = True) \
+         -> t.Tuple[t.Optional[np.ndarray], t.Dict[str, int]]:
+    """
+    Seed of a search by the heuristic engine or the previous teams,
+    if any satisfies the constraints, and the hints besides.
+    """
+    with metrics.timer(Phases['HEURISTIC']):
+        heuristic = Heuristic.make_assignment(builder.players,
+                                              builder.nteams,
+                                              formation)
+
+    if heuristic is not None \
+            and not Feasibility.admissible(builder, heuristic,
+                                           config.tiers,
+                                           config.position_tolerance):
+        logger.info('The heuristic teams violate C9 or C10')
+        heuristic = None
+
+    if previous:
+        heuristic, previous = WarmStart.seed(builder, formation, config,
+                                             previous, heuristic,
+                                             symmetry_breaking)
+
+    return heuristic, previous
+
+def _as_is(builder: ModelBuilder,
+           epsilon: int,
+           assignment: np.ndarray,
+           status: str,
+           start: float,
+           listener: SolutionListener = None) -> Solution:
+    """
+    Solution of the seed of a search, which CP-SAT cannot improve on.
+    """
+    walltime = time.perf_counter() - start
+    teams = Team.from_assignment(builder.players,
+                                 assignment.tolist())
+
+    if listener is not None:
+        listener.on_solution(epsilon, teams, walltime)
+
+    _finish({
+        'status': status,
+        'epsilon': epsilon,
+        'conflicts': 0,
+        'branches': 0,
+        'walltime': walltime,
+        'nsolutions': 1,
+    }, listener)
+
+    return Solution.create(epsilon, builder.avg_rating,
+                           teams, status)
+
+def _fallback(builder: ModelBuilder,
+              epsilon: int,
+              assignment: np.ndarray,
+              solver: cp_model.CpSolver,
+              listener: SolutionListener = None) -> Solution:
+    """
+    Solution of the seed of a search that ran out of time
+    before its first solution.
+    """
+    logger.info('No solution was found, '
+                'falling back to the heuristic one')
+
+    _finish({
+        'status': Statuses['HEURISTIC'],
+        'epsilon': epsilon,
+        'conflicts': solver.NumConflicts(),
+        'branches': solver.NumBranches(),
+        'walltime': solver.WallTime(),
+        'nsolutions': 0,
+    }, listener)
+
+    return Solution.create(epsilon, builder.avg_rating,
+                           Team.from_assignment(builder.players,
+                                                assignment.tolist()),
+                           Statuses['HEURISTIC'])
+
+def _stop(status: int,
+          collector: SolutionCollector,
+          interrupt: threading.Event = None) -> str:
+    """
+    Which stop condition of a search fired.
+    """
+    if collector.threshold_reached:
+        return Statuses['THRESHOLD']
+
+    if status == cp_model.OPTIMAL:
+        return Statuses['OPTIMAL']
+
+    if interrupt is not None \
+            and interrupt.is_set():
+        return Statuses['INTERRUPTED']
+
+    return Statuses['TIME_LIMIT']
+
+def _log_history(builder: ModelBuilder,
+                 collector: SolutionCollector):
+    for epsilon, walltime, assignment \
+            in collector.get_history():
+        logger.debug('Solution with epsilon = %i at %f s:\n%s',
+                     epsilon, walltime, '\n'.join(
+                         '    Team %i with rating = %i [%s]'
+                         % (_t.id, _t.rating, ', '.join(
+                             '(%s,%s,%s)' % (p.name, p.rating,
+                                             p.position)
+                             for p in _t.players))
+                         for _t in Team.from_assignment(
+                             builder.players, assignment)))
+
+def _refine(builder: ModelBuilder,
+            e: cp_model.IntVar,
+            collector: SolutionCollector,
+            config: SolverConfig,
+            stats: t.Dict[str, t.Any],
+            diverse: bool,
+            deadline: float,
+            interrupt: threading.Event = None) \
+           -> t.Tuple[int, t.List[int]]:
+    """
+    Best solution of a search refined by the later stages of the
+    lexicographic objective, adding up the solver statistics.
+    """
+    epsilon, assignment = collector.get_solutions()[0]
 
-                print('    ]')
+    # The pool is built from the same model, so it is refined
+    # on a copy, within half of what is left of the time budget
+    if diverse:
+        copy = builder.clone(builder.players, builder.avg_rating)
 
-    @property
-    def nsolutions(self):
-        return self.__nsolutions
+        deadline -= (deadline - time.perf_counter()) / 2
+    else:
+        copy = builder
 
-    def get_solutions(self) -> t.List:
-        """
-        Get a range of good solutions up to some threshold on the objective value.
-        """
-        self.__solutions.sort(key=lambda s: s[0])
-        good_solutions = []
+    with metrics.timer(Phases['SOLVE']):
+        assignment, conflicts, branches = Lexicographic.refine(
+            copy, copy.var(e.Index()), epsilon, assignment,
+            config, deadline, interrupt)
 
-        for k, g in it.groupby(self.__solutions,
-                               lambda s: s[0]):
-            if len(good_solutions) >= MIN_solutions:
-                break
-                
-            good_solutions += list(g)
+    stats['conflicts'] += conflicts
+    stats['branches'] += branches
 
-        return good_solutions
+    return Heuristic.epsilon(builder.players, assignment,
+                             builder.nteams), assignment.tolist()
 
 
 class Manager:
@@ -90,195 +262,990 @@ class Manager:
         raise NotImplementedError()
 
     @staticmethod
-    def make_teams(n: int,
-                   players: t.List[Player],
-                   formation: Formation,
-                   optimal: bool = False) -> Solution:
+    def build_model(n: int,
+                    players: t.List[Player],
+                    formation: Formation,
+                    symmetry_breaking: bool = True,
+                    position_encoding: str = Encodings['BOUNDS'],
+                    avg_rating: int = None,
+                    templates: ModelTemplates = None,
+                    tiers: int = None,
+                    position_tolerance: int = None) \
+                   -> t.Tuple[ModelBuilder, cp_model.IntVar]:
+        """
+        Build the CP model without solving it.
+
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players to split into teams. They are sorted by rating in place.
+
+        formation : Formation
+            Formation of interest, or None
+
+        symmetry_breaking : bool
+            Whether to pin each of the Nteams highest-rated players
+            to its own team Id, so that the solver does not explore
+            the same assignment under every relabelling of the teams.
+            The default is True.
+
+        position_encoding : str
+            Encoding of C7 when no formation is given, either "pairwise",
+            with three reified constraints per position and team pair,
+            or "bounds", with per-position floor and ceil bounds on each
+            team. The default is "bounds".
+
+        avg_rating : int
+            Average rating per team to balance around.
+            The default is that of the players.
+
+        templates : ModelTemplates
+            Cache of models by shape to copy from, or to populate.
+            The default is None, building from scratch.
+
+        tiers : int
+            Number of quantile tiers of the players by rating of C9, in
+            place of C5 and C6. The default is None.
+
+        position_tolerance : int
+            Tolerance of C10 on the rating per position of each team.
+            The default is None, without C10.
+
+        Returns
+        -------
+        Tuple[ModelBuilder, IntVar]
+            Model builder and objective variable epsilon.
+        """
         if formation is not None:
             n = formation.nplayers
 
         nplayers = len(players)
         nteams = nplayers // n
-        npositions = _npositions()
 
         teams_ids = range(nteams)
 
         # Sort players by rating
         players.sort(key=lambda p: p.rating)
 
-        players_top_n  = players[-nteams:]
-        players_flop_n = players[:nteams]
+        if templates is not None:
+            key = ModelTemplates.key(nteams, players, formation,
+                                     symmetry_breaking,
+                                     position_encoding,
+                                     tiers, position_tolerance)
 
-        tot_ratings = sum([p.rating for p
-                           in players])
+            template = templates.get(key, players, avg_rating)
 
-        avg_rating_per_team = tot_ratings//nteams
-
-        print('CP model has %i players, %i teams, '
-              'and %i positions with:'
-              % (nplayers, nteams, npositions))
-
-        print('    Average rating per team = %i'
-              % avg_rating_per_team)
+            if template is not None:
+                return template
 
         # Create a constant programming SAT solver
-        model = cp_model.CpModel()
+        builder = ModelBuilder(players, nteams,
+                               avg_rating=avg_rating)
+        model = builder.model
 
         #
         # Create SAT constraints
         #
 
-        players_per_tid = {} # Players per team Id associations
+        rows = np.arange(nplayers)
 
-        for p in players:
-            for tid in teams_ids:
-                players_per_tid[(p, tid)] = model.NewBoolVar(
-                    'Player %s in team %d' % (p.name, tid))
+        rows_top_n  = rows[-nteams:]
+        rows_flop_n = rows[:nteams]
 
         # Objective function to minimize:
         # epsilon := Rating deviation of each
         #            team from the average
-        e = model.NewIntVar(MIN_epsilon,
-                            MAX_epsilon,
+        e = model.NewIntVar(*builder.epsilon_bounds(),
                             'epsilon')
 
         # C1. Each team must have the same size.
+        builder.group(Constraints['C1'])
+
         for tid in teams_ids:
-            model.Add(sum(players_per_tid[(p, tid)]
-                          for p in players) == n)
+            builder.add_team_members(tid, rows, n)
 
         # C2. One player must belong exactly to one team.
-        for p in players:
-            model.Add(sum(players_per_tid[(p, tid)]
-                          for tid in teams_ids) == 1)
+        builder.group(Constraints['C2'])
+
+        for i in rows:
+            builder.add_player_teams(i, 1)
 
         # C3. Each team's rating has to be around
         # the average rating. It means in the range:
         # [-epsilon + avg, avg + epsilon]
-        for tid in teams_ids:
-            trating = sum(players_per_tid[(p, tid)]
-                              *p.rating
-                          for p in players)
+        builder.group(Constraints['C3'])
 
-            model.Add(trating >= avg_rating_per_team - e)
-            model.Add(trating <= avg_rating_per_team + e)
+        for tid in teams_ids:
+            builder.add_deviation(tid, e)
 
         if formation is not None:
             # C4. Each team must have a fixed number of players
             # per position as stated in the formation.
+            builder.group(Constraints['C4'])
+
             for k in Position:
                 for tid in teams_ids:
-                    model.Add(sum(players_per_tid[(p, tid)]
-                                  for p in players
-                                  if p.position == k)
-                              == formation.__dict__[k.name])
+                    builder.add_position_members(
+                        tid, k, formation.quota(k))
 
-        # C5. One team cannot have more than one
-        # of the Nteams highest-rated players.
-        for tid in teams_ids:
-            model.Add(sum(players_per_tid[(p, tid)]
-                          for p in players_top_n) == 1)
+        if tiers is None:
+            # C5. One team cannot have more than one
+            # of the Nteams highest-rated players.
+            builder.group(Constraints['C5'])
 
-        # C6. One team cannot have more than one
-        # of the Nteams lowest-rated players.
-        for tid in teams_ids:
-            model.Add(sum(players_per_tid[(p, tid)]
-                          for p in players_flop_n) == 1)
+            for tid in teams_ids:
+                builder.add_team_members(tid, rows_top_n, 1)
 
-        if formation is None:
-            # C7. Each team must have at most +-1 players
-            # per position with respect to the other teams
-            for k in Position:
-                for i in range(len(teams_ids) - 1):
-                    for j in range(i + 1, len(teams_ids)):
-                        tid = teams_ids[i]
-                        oid = teams_ids[j]
+            # C6. One team cannot have more than one
+            # of the Nteams lowest-rated players.
+            builder.group(Constraints['C6'])
 
-                        # For each pair extract the number of
-                        # player at position k
-                        nplayers_k_tid = sum(players_per_tid[(p, tid)]
-                                             for p in players
-                                             if p.position == k)
+            for tid in teams_ids:
+                builder.add_team_members(tid, rows_flop_n, 1)
+        else:
+            # C9. Each team must have either the floor or the ceil
+            # of the players per team of each quantile tier by rating,
+            # which spreads all of them rather than the extremes alone.
+            builder.group(Constraints['C9'])
 
-                        nplayers_k_oid = sum(players_per_tid[(p, oid)]
-                                             for p in players
-                                             if p.position == k)
+            for rows_tier in builder.tiers(tiers):
+                nmin = len(rows_tier)//nteams
+                nmax = -(-len(rows_tier)//nteams)
 
-                        # 1. Team i has the same players
-                        # as Team j at position k
-                        nplayers_eq = model.NewBoolVar('P: {} - N {} == N {}'
-                                                       .format(k, i, j))
+                for tid in teams_ids:
+                    builder.add_team_members(tid, rows_tier,
+                                             nmin, nmax)
+
+        if symmetry_breaking and tiers is None:
+            # C8. Team Ids are interchangeable and, by C5, each team
+            # has exactly one of the Nteams highest-rated players.
+            # Pin the i-th one to team i to break the symmetry.
+            builder.group(Constraints['C8'])
+
+            for tid, i in zip(teams_ids, rows_top_n):
+                model.Add(builder.x[i, tid] == 1)
+        elif symmetry_breaking:
+            # C11. Without C5, the highest-rated players may share a
+            # team, so teams are rather numbered down from the last by
+            # their highest-rated player: the i-th one is in one of
+            # the last i teams.
+            builder.group(Constraints['C11'])
+
+            for j, i in enumerate(rows[::-1][:nteams - 1]):
+                builder.add_player_from(i, nteams - 1 - j)
+
+        if position_tolerance is not None:
+            # C10. Each team's rating per position has to be around
+            # the average rating per position, sharing the rating
+            # per position of each team with the objective.
+            builder.group(Constraints['C10'])
 
-                        model.Add(nplayers_k_tid == nplayers_k_oid + 0) \
-                             .OnlyEnforceIf(nplayers_eq)
+            for k in Position:
+                for tid in teams_ids:
+                    builder.add_position_rating(k, tid,
+                                                position_tolerance)
 
-                        # 2. Team i has one more player
-                        # at position k than Team j
-                        nplayers_p1 = model.NewBoolVar('P: {} - N {} == N {} + 1'
-                                                       .format(k, i, j))
+        if formation is None:
+            # C7. Each team must have at most +-1 players
+            # per position with respect to the other teams
+            builder.group(Constraints['C7'])
+
+            if position_encoding == Encodings['PAIRWISE']:
+                for k in Position:
+                    for i in range(len(teams_ids) - 1):
+                        for j in range(i + 1, len(teams_ids)):
+                            tid = teams_ids[i]
+                            oid = teams_ids[j]
+
+                            # For each pair extract the number of
+                            # player at position k
+                            nplayers_k_tid = builder.team_count(k, tid)
+                            nplayers_k_oid = builder.team_count(k, oid)
+
+                            # 1. Team i has the same players
+                            # as Team j at position k
+                            nplayers_eq = model.NewBoolVar('P: {} - N {} == N {}'
+                                                           .format(k, i, j))
+
+                            model.Add(nplayers_k_tid == nplayers_k_oid + 0) \
+                                 .OnlyEnforceIf(nplayers_eq)
+
+                            # 2. Team i has one more player
+                            # at position k than Team j
+                            nplayers_p1 = model.NewBoolVar('P: {} - N {} == N {} + 1'
+                                                           .format(k, i, j))
+
+                            model.Add(nplayers_k_tid == nplayers_k_oid + 1) \
+                                 .OnlyEnforceIf(nplayers_p1)
+
+                            # 3. Team i has one less player
+                            # at position k than Team j
+                            nplayers_m1 = model.NewBoolVar('P: {} - N {} == N {} - 1'
+                                                           .format(k, i, j))
+
+                            model.Add(nplayers_k_tid == nplayers_k_oid - 1) \
+                                 .OnlyEnforceIf(nplayers_m1)
+
+                            # Ensure at least one is true
+                            model.AddBoolOr([nplayers_eq,
+                                             nplayers_p1,
+                                             nplayers_m1])
+
+            elif position_encoding == Encodings['BOUNDS']:
+                # All players are assigned, so +-1 across every pair
+                # of teams means that each team has either the floor
+                # or the ceil of the players at position k per team.
+                for k in Position:
+                    rows_k = builder.rows(k)
+
+                    nmin = len(rows_k)//nteams
+                    nmax = -(-len(rows_k)//nteams)
+
+                    for tid in teams_ids:
+                        builder.add_position_members(tid, k,
+                                                     nmin, nmax)
+
+            else:
+                raise ValueError('Unknown position encoding %s'
+                                 % position_encoding)
 
-                        model.Add(nplayers_k_tid == nplayers_k_oid + 1) \
-                             .OnlyEnforceIf(nplayers_p1)
+        # Minimize epsilon
+        model.Minimize(e)
 
-                        # 3. Team i has one less player
-                        # at position k than Team j
-                        nplayers_m1 = model.NewBoolVar('P: {} - N {} == N {} - 1'
-                                                       .format(k, i, j))
+        if templates is not None:
+            templates.set(key, builder, e)
 
-                        model.Add(nplayers_k_tid == nplayers_k_oid - 1) \
-                             .OnlyEnforceIf(nplayers_m1)
+        return builder, e
 
-                        # Ensure at least one is true
-                        model.AddBoolOr([nplayers_eq,
-                                         nplayers_p1,
-                                         nplayers_m1])
+    @staticmethod
+    def make_teams(n: int,
+                   players: t.List[Player],
+                   formation: Formation,
+                   optimal: bool = False,
+                   symmetry_breaking: bool = True,
+                   position_encoding: str = Encodings['BOUNDS'],
+                   config: SolverConfig = None,
+                   previous: t.Dict[str, int] = None) -> Solution:
+        """
+        Generate N equally matched football teams with the CP-SAT solver.
 
+        Parameters
+        ----------
+        n : int
+            Number of players per team
 
-        # Minimize epsilon
-        model.Minimize(e)
+        players : List[Player]
+            Players to split into teams
 
-        solution_printer = SolutionPrinter(players_per_tid)
+        formation : Formation
+            Formation of interest, or None
 
-        # Solve with the CP-SAT solver
-        solver = cp_model.CpSolver()
-        status = solver.SolveWithSolutionCallback(
-                        model, solution_printer)
+        optimal : bool
+            Whether to return the optimal solution. The default is False.
 
-        if status != cp_model.OPTIMAL:
-            if status != cp_model.FEASIBLE:
-                raise NoSolutionError()
+        symmetry_breaking : bool
+            Whether to break the team Id symmetry. The default is True.
 
-            print('{} solutions were found, but all sub-optimal.'
-                  .format(solution_printer.nsolutions))
+        position_encoding : str
+            Encoding of C7 when no formation is given.
+            The default is "bounds".
 
-        print('\nOptimal epsilon: %i\n'
-                % solver.ObjectiveValue())
+        config : SolverConfig
+            Parameters of the CP-SAT solver. The default is None.
 
-        print('General statistics:')
-        print('    - Conflicts : %i'   % solver.NumConflicts())
-        print('    - Branches  : %i'   % solver.NumBranches())
-        print('    - Wall time : %f s' % solver.WallTime())
-        print('    - Total solutions : %i'
-              % solution_printer.nsolutions)
+        previous : Dict[str, int]
+            Team Id of each player in a previous solution,
+            used as hints. The default is None.
+        """
+        solutions = Manager.make_solutions(n, players, formation,
+                                           symmetry_breaking,
+                                           position_encoding,
+                                           config, previous)
 
         # Pick the optimal solution
         if optimal:
-            return Solution.create(
-                    solver.ObjectiveValue(),
-                    avg_rating_per_team,
-                    Team.from_associations(
-                            players_per_tid, solver))
+            return solutions[0]
 
         # Pick a random solution from the set of good enough solutions
         # to better reflect the search space near convergence.
-        solutions = solution_printer.get_solutions()
+        return random.choice(solutions)
+
+    @staticmethod
+    def make_teams_many(scenarios: t.Iterable[t.Dict[str, t.Any]],
+                        max_workers: int = None,
+                        ncores: int = None) \
+                       -> t.Iterator[t.Tuple[int,
+                                             t.Union[Solution, Exception],
+                                             float]]:
+        """
+        Generate the teams of many scenarios at once over a process pool.
+
+        Parameters
+        ----------
+        scenarios : Iterable[Dict[str, Any]]
+            Keyword arguments of make_teams for each scenario
+
+        max_workers : int
+            Number of worker processes. The default is the number of cores.
+
+        ncores : int
+            Number of cores to share among the worker processes, so that
+            CP-SAT workers of all the processes never exceed it.
+            The default is the number of cores of the machine.
+
+        Returns
+        -------
+        Iterator[Tuple[int, Union[Solution, Exception], float]]
+            Index of each scenario, its solution or the error that
+            prevented it, and its solve time in seconds, as they complete.
+        """
+        ncores = ncores or os.cpu_count() or 1
+        max_workers = max_workers or ncores
+
+        ncores_per_worker = max(1, ncores // max_workers)
+
+        with cf.ProcessPoolExecutor(
+                max_workers,
+                mp_context=multiprocessing.get_context('spawn')) \
+                as pool:
+            futures = {pool.submit(_make_teams_one, kwargs,
+                                   ncores_per_worker): i
+                       for i, kwargs in enumerate(scenarios)}
+
+            for f in cf.as_completed(futures):
+                try:
+                    result, walltime = f.result()
+                except Exception as e:
+                    # The worker process itself failed
+                    result, walltime = e, 0.
 
-        if not solutions:
+                yield futures[f], result, walltime
+
+    @staticmethod
+    def make_heuristic(n: int,
+                       players: t.List[Player],
+                       formation: Formation,
+                       listener: SolutionListener = None) -> Solution:
+        """
+        Generate N equally matched football teams with the heuristic engine
+        alone, i.e., a greedy draft and local search, for the lowest latency.
+
+        See make_solutions for the parameters.
+
+        Raises
+        ------
+        NoSolutionError
+            If the draft found no teams that satisfy the constraints
+        """
+        if formation is not None:
+            n = formation.nplayers
+
+        nteams = len(players) // n
+
+        # Sort players by rating
+        players.sort(key=lambda p: p.rating)
+
+        start = time.perf_counter()
+
+        with metrics.timer(Phases['HEURISTIC']):
+            assignment = Heuristic.make_assignment(players, nteams,
+                                                   formation)
+
+        if assignment is None:
+            metrics.inc('solves', status=Statuses['NO_SOLUTION'])
             raise NoSolutionError()
 
-        epsilon, variables = random.choice(solutions)
+        walltime = time.perf_counter() - start
+
+        epsilon = Heuristic.epsilon(players, assignment, nteams)
+        teams = Team.from_assignment(players, assignment.tolist())
+
+        logger.info('Heuristic epsilon: %i in %f s',
+                    epsilon, walltime)
+
+        if listener is not None:
+            listener.on_solution(epsilon, teams, walltime)
+
+        lb, _ = epsilon_bounds(np.array([p.rating for p in players],
+                                        dtype=np.int64), nteams)
+
+        # No search can do better than the lower bound
+        status = Statuses['OPTIMAL'] if epsilon == lb \
+                 else Statuses['HEURISTIC']
+
+        _finish({
+            'status': status,
+            'epsilon': epsilon,
+            'conflicts': 0,
+            'branches': 0,
+            'walltime': walltime,
+            'nsolutions': 1,
+        }, listener)
+
+        return Solution.create(epsilon,
+                               sum([p.rating for p
+                                    in players])//nteams,
+                               teams, status)
+
+    @staticmethod
+    def make_lns(n: int,
+                 players: t.List[Player],
+                 formation: Formation,
+                 position_encoding: str = Encodings['BOUNDS'],
+                 config: SolverConfig = None,
+                 listener: SolutionListener = None,
+                 interrupt: threading.Event = None) -> Solution:
+        """
+        Generate N equally matched football teams of a large league
+        with a large neighbourhood search.
+
+        Starting from the heuristic teams, each round re-optimizes
+        LNS_nteams teams with CP-SAT while the others stay fixed,
+        until one of the stop conditions of LNS.improve.
+
+        See make_solutions for the parameters.
+
+        Raises
+        ------
+        NoSolutionError
+            If the draft found no teams that satisfy the constraints
+        """
+        if config is None:
+            config = SolverConfig()
+
+        if formation is not None:
+            n = formation.nplayers
+
+        nteams = len(players) // n
+
+        # Sort players by rating
+        players.sort(key=lambda p: p.rating)
+
+        start = time.perf_counter()
+
+        with metrics.timer(Phases['HEURISTIC']):
+            assignment = Heuristic.make_assignment(players, nteams,
+                                                   formation)
+
+        if assignment is None:
+            metrics.inc('solves', status=Statuses['NO_SOLUTION'])
+            raise NoSolutionError()
+
+        def _build(subset: t.List[Player], avg_rating: int):
+            return Manager.build_model(n, subset, formation, True,
+                                       position_encoding, avg_rating,
+                                       model_templates)
+
+        assignment, stats = LNS.improve(players, nteams, assignment,
+                                        _build, config, start,
+                                        listener, interrupt)
+
+        _finish(stats, listener)
+
+        return Solution.create(stats['epsilon'],
+                               sum([p.rating for p
+                                    in players])//nteams,
+                               Team.from_assignment(players,
+                                                    assignment.tolist()),
+                               stats['status'])
+
+    @staticmethod
+    def reoptimize(n: int,
+                   players: t.List[Player],
+                   formation: Formation,
+                   assignment: np.ndarray,
+                   tids: t.List[int],
+                   position_encoding: str = Encodings['BOUNDS'],
+                   config: SolverConfig = None,
+                   epsilon: int = None) \
+                  -> t.Tuple[t.Optional[np.ndarray], int]:
+        """
+        Re-optimize some teams of a split while the others stay fixed,
+        moving as few players as possible.
+
+        The players of the free teams, and those without a team yet, are
+        split again among the free teams, first to minimize epsilon around
+        the average rating of the whole league, then the number of players
+        who move to another team, each in its own solve. With an epsilon
+        given, only the moves are minimized within it.
+
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players of the whole league sorted by rating
+
+        formation : Formation
+            Formation of interest, or None
+
+        assignment : ndarray
+            Team Id of each player, or -1 for those without a team yet
+
+        tids : List[int]
+            Team Ids of the free teams
+
+        position_encoding : str
+            Encoding of C7 when no formation is given.
+            The default is "bounds".
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver. The default is None.
+
+        epsilon : int
+            Largest deviation of the free teams from the average.
+            The default is None, as small as possible.
+
+        Returns
+        -------
+        Tuple[Optional[ndarray], int]
+            Team Id of each player, or None if the free teams cannot take
+            their players so that C5 and C6, or C9 with tiers in the
+            config, and C10 with a position tolerance, hold across the
+            whole league, and the CP-SAT status.
+        """
+        if config is None:
+            config = SolverConfig()
+
+        if formation is not None:
+            n = formation.nplayers
+
+        nteams = len(players) // n
+
+        avg_rating_per_team = sum([p.rating for p
+                                   in players])//nteams
+
+        rows = np.flatnonzero(np.isin(assignment, tids)
+                              | (assignment < 0))
+
+        if len(rows) != n*len(tids):
+            return None, cp_model.MODEL_INVALID
+
+        # The subset keeps the order of the rows, so that C5, C6 and
+        # C8 refer to the same players as in the whole league. With
+        # tiers, the team Ids are left free rather than ordered by C11,
+        # which the labels of the free teams below do not follow
+        with metrics.timer(Phases['BUILD']):
+            builder, e = Manager.build_model(n, [players[i] for i in rows],
+                                             formation,
+                                             config.tiers is None,
+                                             position_encoding,
+                                             avg_rating_per_team,
+                                             model_templates,
+                                             tiers=config.tiers)
+
+        if config.position_tolerance is not None:
+            # C10 around the average rating per position of the whole
+            # league, rather than that of the free teams
+            builder.group(Constraints['C10'])
+
+            for k in Position:
+                avg_rating = sum([p.rating for p in players
+                                  if p.position == k])//nteams
+
+                for j in builder.teams_ids:
+                    builder.add_linear(
+                        np.array([builder.position_rating(k, j).Index()]),
+                        np.array([1]),
+                        avg_rating - config.position_tolerance,
+                        avg_rating + config.position_tolerance)
+
+        lb, ub = builder.epsilon_bounds()
+
+        if epsilon is not None:
+            if epsilon < lb:
+                return None, cp_model.INFEASIBLE
+
+            ub = min(ub, epsilon)
+
+        builder.set_bounds(e, lb, ub)
+
+        current = assignment[rows].tolist()
+
+        # By C8, the j-th of the top players of the subset is in team j,
+        # which stands for the free team of that player if any
+        labels = {}
+
+        for j, tid in enumerate(current[-len(tids):]):
+            if tid in tids and tid not in labels:
+                labels[tid] = j
+
+        unused = iter([j for j in range(len(tids))
+                       if j not in labels.values()])
+
+        for tid in tids:
+            if tid not in labels:
+                labels[tid] = next(unused)
+
+        stays = np.array([builder.index[i, labels[tid]]
+                          for i, tid in enumerate(current)
+                          if tid >= 0], dtype=np.int64)
+
+        builder.add_hints({p.name: labels[tid] for p, tid
+                           in zip(builder.players, current)
+                           if tid >= 0})
+
+        solver = cp_model.CpSolver()
+        config.apply(solver.parameters)
+
+        if epsilon is None:
+            # Epsilon first, as the model is built
+            with metrics.timer(Phases['SOLVE']):
+                status = solver.Solve(builder.model)
+
+            if status not in (cp_model.OPTIMAL,
+                              cp_model.FEASIBLE):
+                return None, status
+
+            builder.set_bounds(e, lb, int(solver.ObjectiveValue()))
+
+        # Then as few moves as possible
+        builder.minimize(stays, -np.ones(len(stays), dtype=np.int64))
+
+        with metrics.timer(Phases['SOLVE']):
+            status = solver.Solve(builder.model)
+
+        if status == cp_model.OPTIMAL:
+            stop = Statuses['OPTIMAL']
+        elif status == cp_model.FEASIBLE:
+            stop = Statuses['TIME_LIMIT']
+        elif status == cp_model.INFEASIBLE:
+            stop = Statuses['INFEASIBLE']
+        else:
+            stop = Statuses['NO_SOLUTION']
+
+        _finish({
+            'status': stop,
+            'conflicts': solver.NumConflicts(),
+            'branches': solver.NumBranches(),
+            'nsolutions': int(status in (cp_model.OPTIMAL,
+                                         cp_model.FEASIBLE)),
+        })
+
+        if status not in (cp_model.OPTIMAL,
+                          cp_model.FEASIBLE):
+            return None, status
+
+        # Team Ids of the subproblem back to those of the league
+        unlabels = np.empty(len(tids), dtype=np.int64)
+
+        for tid, j in labels.items():
+            unlabels[j] = tid
+
+        solution = np.array(solver.ResponseProto().solution,
+                            dtype=np.int64)
+
+        candidate = np.array(assignment, dtype=np.int64)
+        candidate[rows] = unlabels[solution[builder.index].argmax(axis=1)]
+
+        # C5 and C6, or C9 with tiers, only spread the players of the
+        # free teams, while an edit may change the extremes or tiers of
+        # the whole league, e.g., a player rated higher than all others,
+        # so check them across the league, and C10 for the fixed teams
+        if not Feasibility.spread(candidate, nteams, config.tiers) \
+                or Feasibility.unbalanced(players, candidate, nteams,
+                                          config.position_tolerance):
+            return None, cp_model.INFEASIBLE
+
+        return candidate, status
+
+    @staticmethod
+    def diagnose(n: int,
+                 players: t.List[Player],
+                 formation: Formation,
+                 symmetry_breaking: bool = True,
+                 position_encoding: str = Encodings['BOUNDS'],
+                 time_limit: float = None,
+                 tiers: int = None,
+                 position_tolerance: int = None) -> t.List[str]:
+        """
+        Find which constraints of the CP model conflict with each other.
+
+        Returns
+        -------
+        List[str]
+            Names of a minimal set of conflicting constraints,
+            or none if the CP model is feasible.
+        """
+        builder, _ = Manager.build_model(n, players, formation,
+                                         symmetry_breaking,
+                                         position_encoding,
+                                         tiers=tiers,
+                                         position_tolerance=
+                                             position_tolerance)
+
+        return Feasibility.conflicts(builder, time_limit)
+
+    @staticmethod
+    def make_solutions(n: int,
+                       players: t.List[Player],
+                       formation: Formation,
+                       symmetry_breaking: bool = True,
+                       position_encoding: str = Encodings['BOUNDS'],
+                       config: SolverConfig = None,
+                       previous: t.Dict[str, int] = None,
+                       listener: SolutionListener = None,
+                       interrupt: threading.Event = None) \
+                      -> t.List[Solution]:
+        """
+        Generate a pool of good solutions with the CP-SAT solver.
+
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players to split into teams
+
+        formation : Formation
+            Formation of interest, or None
+
+        symmetry_breaking : bool
+            Whether to break the team Id symmetry. The default is True.
+
+        position_encoding : str
+            Encoding of C7 when no formation is given.
+            The default is "bounds".
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver. The default is None.
+
+        previous : Dict[str, int]
+            Team Id of each player in a previous solution, used as hints.
+            Players that were added or removed are tolerated.
+            The default is None.
+
+        listener : SolutionListener
+            Receiver of each improving solution. The default is None.
+
+        interrupt : Event
+            Event that stops the search once set. The default is None.
+
+        Returns
+        -------
+        List[Solution]
+            Good enough solutions sorted by epsilon, the best first.
+            With a pool_size in the config, as many distinct solutions
+            at least min_distance apart, if found in the time budget.
+            With a lexicographic objective in the config, the best one
+            by every stage alone, unless in a pool.
+        """
+        if config is None:
+            config = SolverConfig()
+
+        reasons = Feasibility.analyze(n, players, formation,
+                                      config.tiers)
+
+        if reasons:
+            metrics.inc('solves', status=Statuses['INFEASIBLE'])
+            raise InfeasibleScenarioError(reasons)
+
+        if config.engine == Engines['HEURISTIC']:
+            return [Manager.make_heuristic(n, players, formation,
+                                           listener)]
+
+        if config.engine == Engines['LNS']:
+            return [Manager.make_lns(n, players, formation,
+                                     position_encoding, config,
+                                     listener, interrupt)]
+
+        with metrics.timer(Phases['BUILD']):
+            builder, e = Manager.build_model(n, players, formation,
+                                             symmetry_breaking,
+                                             position_encoding,
+                                             templates=model_templates,
+                                             tiers=config.tiers,
+                                             position_tolerance=
+                                                 config.position_tolerance)
+
+        if metrics.enabled:
+            metrics.set('model_variables',
+                        len(builder.model.Proto().variables))
+            metrics.set('model_constraints',
+                        len(builder.model.Proto().constraints))
+
+        lb, ub = builder.epsilon_bounds()
+
+        diverse = config.pool_size is not None \
+                  and config.pool_size > 1
+
+        lexicographic = config.objective is not None \
+                        and config.objective != Objectives['EPSILON']
+
+        # Seed the search with the heuristic engine
+        start = time.perf_counter()
+
+        heuristic, previous = _seed(builder, formation, config,
+                                    previous, symmetry_breaking)
+
+        if heuristic is not None:
+            heuristic_epsilon = Heuristic.epsilon(builder.players,
+                                                  heuristic,
+                                                  builder.nteams)
+
+            logger.info('Heuristic epsilon: %i in %f s',
+                        heuristic_epsilon,
+                        time.perf_counter() - start)
+
+            # A feasible solution bounds epsilon from above
+            ub = min(ub, heuristic_epsilon)
+            builder.set_bounds(e, lb, ub)
+
+            if heuristic_epsilon == lb:
+                seeded = Statuses['OPTIMAL']
+            elif config.epsilon_threshold is not None \
+                    and heuristic_epsilon <= config.epsilon_threshold:
+                seeded = Statuses['THRESHOLD']
+            else:
+                seeded = None
+
+            if seeded is not None \
+                    and not diverse and not lexicographic:
+                # Provably optimal, or good enough as is, e.g., the
+                # previous teams after a small edit, so CP-SAT has
+                # nothing to add
+                return [_as_is(builder, heuristic_epsilon, heuristic,
+                               seeded, start, listener)]
+
+        logger.info('Epsilon bounds: [%i, %i]', lb, ub)
+
+        if previous:
+            builder.add_hints(previous)
+        elif heuristic is not None:
+            builder.add_hints({p.name: int(tid) for p, tid
+                               in zip(builder.players, heuristic)})
+
+        logger.info('CP model has %i players, %i teams, '
+                    'and %i positions with average rating '
+                    'per team = %i', builder.nplayers,
+                    builder.nteams, _npositions(),
+                    builder.avg_rating)
+
+        collector = SolutionCollector(builder.players,
+                                      builder.teams_of(),
+                                      builder.nteams,
+                                      epsilon_threshold=config.epsilon_threshold,
+                                      listener=listener)
+
+        # Solve with the CP-SAT solver
+        solver = cp_model.CpSolver()
+        config.apply(solver.parameters)
+
+        if diverse and config.time_limit:
+            # Leave half of the time budget to the rest of the pool
+            solver.parameters.max_time_in_seconds = config.time_limit / 2
+
+        with metrics.timer(Phases['SOLVE']):
+            if interrupt is None:
+                status = solver.SolveWithSolutionCallback(
+                                builder.model, collector)
+            else:
+                status = _interruptible(solver, builder.model,
+                                        collector, interrupt)
+
+        if status == cp_model.UNKNOWN \
+                and not collector.nsolutions \
+                and heuristic is not None:
+            # Out of time before the first solution
+            return [_fallback(builder, heuristic_epsilon, heuristic,
+                              solver, listener)]
+
+        if status == cp_model.INFEASIBLE:
+            conflicts = Manager.diagnose(n, players, formation,
+                                         symmetry_breaking,
+                                         position_encoding,
+                                         config.time_limit,
+                                         config.tiers,
+                                         config.position_tolerance)
+
+            if conflicts:
+                metrics.inc('solves', status=Statuses['INFEASIBLE'])
+                raise InfeasibleScenarioError(conflicts)
+
+        if status != cp_model.OPTIMAL:
+            if status != cp_model.FEASIBLE \
+                    or not collector.nsolutions:
+                metrics.inc('solves', status=Statuses['NO_SOLUTION'])
+                raise NoSolutionError()
 
-        return Solution.create(
-                epsilon, avg_rating_per_team,
-                Team.from_associations(
-                        variables, solver))
+            logger.info('%i solutions were found, but all sub-optimal',
+                        collector.nsolutions)
+
+        stats = {
+            'status': _stop(status, collector, interrupt),
+            'epsilon': int(solver.ObjectiveValue()),
+            'conflicts': solver.NumConflicts(),
+            'branches': solver.NumBranches(),
+            'walltime': solver.WallTime(),
+            'nsolutions': collector.nsolutions,
+        }
+
+        logger.info('Optimal epsilon: %(epsilon)i, conflicts: %(conflicts)i, '
+                    'branches: %(branches)i, wall time: %(walltime)f s, '
+                    'total solutions: %(nsolutions)i', stats)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            _log_history(builder, collector)
+
+        deadline = start + config.time_limit \
+                   if config.time_limit else float('inf')
+
+        refined = []
+
+        # Epsilon first: the later stages of the objective only refine
+        # a proven one, within what is left of the time budget
+        if lexicographic and stats['status'] not in (Statuses['OPTIMAL'],
+                                                     Statuses['THRESHOLD']):
+            logger.info('Epsilon was not proven optimal, '
+                        'skipping the later stages of the objective')
+        elif lexicographic:
+            refined.append(_refine(builder, e, collector, config, stats,
+                                   diverse, deadline, interrupt))
+
+        if diverse:
+            good_epsilon = ub if config.pool_epsilon is None \
+                           else stats['epsilon'] + config.pool_epsilon
+
+            candidates = refined \
+                         + [(epsilon, assignment) for epsilon, _, assignment
+                            in collector.get_history()]
+
+            if heuristic is not None:
+                candidates.append((heuristic_epsilon, heuristic))
+
+            # Same session, i.e., the same model with more cuts
+            with metrics.timer(Phases['SOLVE']):
+                solutions, conflicts, branches = Pool.diversify(
+                    builder, e, candidates, config,
+                    max(good_epsilon, stats['epsilon']),
+                    deadline, interrupt)
+
+            stats['conflicts'] += conflicts
+            stats['branches'] += branches
+
+            logger.info('Pool of %i solutions out of %i',
+                        len(solutions), config.pool_size)
+        elif refined:
+            # The best by every stage of the objective
+            solutions = refined
+        else:
+            # Good enough solutions, i.e., no worse than
+            # the heuristic one, the best first
+            solutions = collector.get_solutions(ub)
+
+            if not solutions:
+                solutions = collector.get_solutions()[:1]
+
+        _finish(stats, listener)
+
+        with metrics.timer(Phases['EXTRACT']):
+            return [Solution.create(epsilon, builder.avg_rating,
+                                    Team.from_assignment(
+                                        builder.players, assignment),
+                                    stats['status'])
+                    for epsilon, assignment in solutions]
@@ -0,0 +1,257 @@
+import bisect
+import collections
+import os
+import threading
+import time
+import typing as t
+
+
+# Upper bounds of the buckets of the phase timers in seconds
+Buckets = (.001, .005, .01, .05, .1, .5, 1., 5., 10., 60.)
+
+Labels = t.Tuple[t.Tuple[str, str], ...]
+
+
+class _Timer:
+    __slots__ = ('registry', 'phase', 'start')
+
+    def __init__(self, registry: 'Metrics', phase: str):
+        self.registry = registry
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.registry.observe(self.phase,
+                              time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_timer = _NullTimer()
+
+
+class Metrics:
+    """
+    Registry of counters, gauges and per-phase timers of the requests.
+
+    It does nothing until enabled, so that instrumented code only pays for
+    an attribute lookup. Its content is read as a dict of stats from Python,
+    or in the Prometheus text format from the HTTP apps.
+    """
+    def __init__(self, enabled: bool = False,
+                 prefix: str = 'mister'):
+        """
+        Parameters
+        ----------
+        enabled : bool
+            Whether to record anything. The default is False.
+
+        prefix : str
+            Prefix of the metric names. The default is "mister".
+        """
+        self.enabled = enabled
+        self.prefix = prefix
+
+        self.__lock = threading.Lock()
+
+        self.reset()
+
+    def reset(self):
+        with self.__lock:
+            self.__counters = collections.Counter()
+            self.__gauges = {}
+            # Per phase bucket counts, then their sum and count
+            self.__phases = {}
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def timer(self, phase: str):
+        """
+        Time a phase of a request as a context manager.
+        """
+        if not self.enabled:
+            return _NULL_timer
+
+        return _Timer(self, phase)
+
+    def observe(self, phase: str, seconds: float):
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            if phase not in self.__phases:
+                self.__phases[phase] = [0]*(len(Buckets) + 1) + [0., 0]
+
+            timer = self.__phases[phase]
+
+            timer[bisect.bisect_left(Buckets, seconds)] += 1
+            timer[-2] += seconds
+            timer[-1] += 1
+
+    def inc(self, name: str, value: float = 1,
+            **labels: str):
+        """
+        Increment a counter, e.g., inc('solves', status='optimal').
+        """
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.__counters[(name, tuple(sorted(labels.items())))] \
+                += value
+
+    def set(self, name: str, value: float):
+        """
+        Set a gauge to its latest value.
+        """
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.__gauges[name] = value
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        """
+        Current content of the registry.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Counters and gauges by name, with their labels as a dict if any,
+            and the count, the total and the largest bucket bound of the
+            timer of each phase.
+        """
+        with self.__lock:
+            counters = {}
+
+            for (name, labels), value in self.__counters.items():
+                if labels:
+                    counters.setdefault(name, {})[
+                        ','.join('%s=%s' % l for l in labels)] = value
+                else:
+                    counters[name] = value
+
+            return {
+                'counters': counters,
+                'gauges': dict(self.__gauges),
+                'phases': {phase: {
+                               'count': timer[-1],
+                               'seconds': timer[-2],
+                               'buckets': list(timer[:-2]),
+                           } for phase, timer in self.__phases.items()},
+            }
+
+    def drain(self) -> t.Tuple[t.Any, ...]:
+        """
+        Take the content of the registry, e.g., to merge it into that of
+        another process, and reset it.
+        """
+        with self.__lock:
+            content = (self.__counters, self.__gauges, self.__phases)
+
+            self.__counters = collections.Counter()
+            self.__gauges = {}
+            self.__phases = {}
+
+        return content
+
+    def merge(self, content: t.Tuple[t.Any, ...]):
+        """
+        Add the drained content of another registry.
+        """
+        if not self.enabled:
+            return
+
+        counters, gauges, phases = content
+
+        with self.__lock:
+            self.__counters.update(counters)
+            self.__gauges.update(gauges)
+
+            for phase, other in phases.items():
+                timer = self.__phases.setdefault(
+                    phase, [0]*(len(Buckets) + 1) + [0., 0])
+
+                for i, v in enumerate(other):
+                    timer[i] += v
+
+    def to_prometheus(self) -> str:
+        """
+        Encode the registry in the Prometheus text exposition format.
+        """
+        lines = []
+
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            gauges = sorted(self.__gauges.items())
+            phases = sorted(self.__phases.items())
+
+        seen = set()
+
+        for (name, labels), value in counters:
+            name = '%s_%s_total' % (self.prefix, name)
+
+            if name not in seen:
+                lines.append('# TYPE %s counter' % name)
+                seen.add(name)
+
+            lines.append('%s%s %s' % (name, _labels(labels),
+                                      _number(value)))
+
+        for name, value in gauges:
+            name = '%s_%s' % (self.prefix, name)
+
+            lines.append('# TYPE %s gauge' % name)
+            lines.append('%s %s' % (name, _number(value)))
+
+        if phases:
+            name = '%s_phase_seconds' % self.prefix
+            lines.append('# TYPE %s histogram' % name)
+
+        for phase, timer in phases:
+            cumulative = 0
+
+            for le, count in zip(Buckets + ('+Inf',), timer[:-2]):
+                cumulative += count
+
+                lines.append('%s_bucket%s %i'
+                             % (name, _labels((('phase', phase),
+                                               ('le', str(le)))),
+                                cumulative))
+
+            lines.append('%s_sum%s %s' % (name,
+                                          _labels((('phase', phase),)),
+                                          _number(timer[-2])))
+            lines.append('%s_count%s %i' % (name,
+                                            _labels((('phase', phase),)),
+                                            timer[-1]))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+
+    return '{%s}' % ','.join('%s="%s"' % (k, str(v).replace('"', '\\"'))
+                             for k, v in labels)
+
+def _number(value: float) -> str:
+    return '%i' % value if float(value).is_integer() \
+           else repr(float(value))
+
+
+# Process-wide registry, enabled from the environment
+metrics = Metrics(bool(os.environ.get('MISTER_METRICS')))
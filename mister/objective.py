@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.builder import ModelBuilder
+from mister.config import SolverConfig
+from mister.constants import Objectives
+from mister.position import Position
+
+
+logger = logging.getLogger(__name__)
+
+
+def _deviations(builder: ModelBuilder,
+                e: cp_model.IntVar,
+                epsilon: int) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of the team deviations, weighted below epsilon, so that a solve
+    cut short in the first stage can still lower epsilon.
+    """
+    variables = np.array([builder.deviation(tid, epsilon).Index()
+                          for tid in builder.teams_ids], dtype=np.int64)
+
+    coefficients = np.ones(builder.nteams, dtype=np.int64)
+
+    # The deviations add up to at least that of the total rating
+    total = int(builder.ratings.sum()) - builder.nteams*builder.avg_rating
+
+    builder.add_linear(variables, coefficients,
+                       abs(total), cp_model.INT_MAX)
+
+    # No sum of deviations outweighs one point of epsilon
+    return np.append(e.Index(), variables), \
+           np.append(builder.nteams*epsilon + 1, coefficients)
+
+def _position_deviations(builder: ModelBuilder,
+                         e: cp_model.IntVar,
+                         epsilon: int) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of the deviations of the team ratings per position.
+    """
+    variables = np.array([builder.position_deviation(k, tid).Index()
+                          for k in Position
+                          for tid in builder.teams_ids], dtype=np.int64)
+
+    return variables, np.ones(len(variables), dtype=np.int64)
+
+
+class Lexicographic:
+    """
+    Lexicographic objective: epsilon first, then the sum of the deviations
+    of the teams from the average, then that of their rating per position.
+    """
+    @staticmethod
+    def refine(builder: ModelBuilder,
+               e: cp_model.IntVar,
+               epsilon: int,
+               assignment: t.Sequence[int],
+               config: SolverConfig,
+               deadline: float,
+               interrupt: threading.Event = None) \
+              -> t.Tuple[np.ndarray, int, int]:
+        """
+        Refine a solution by the later stages of the objective: with epsilon
+        no worse, minimize the sum of the deviations of the teams from the
+        average, then, with that fixed as well, the sum of those of their
+        rating per position. Each stage is hinted by the solution of the
+        previous one, which is kept if it runs out of time.
+
+        Parameters
+        ----------
+        builder : ModelBuilder
+            Model builder of the scenario, whose objective is replaced
+
+        e : IntVar
+            Epsilon of the CP model
+
+        epsilon : int
+            Epsilon of the solution, proven optimal or good enough
+
+        assignment : Sequence[int]
+            Team Id of each player of the solution
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver, with the objective
+
+        deadline : float
+            End of the time budget, as given by perf_counter
+
+        interrupt : Event
+            Event that stops the search once set. The default is None.
+
+        Returns
+        -------
+        Tuple[ndarray, int, int]
+            Team Id of each player, and the conflicts and branches of the
+            solves.
+        """
+        stages = [_deviations]
+
+        if config.objective == Objectives['POSITIONS']:
+            stages.append(_position_deviations)
+
+        lb, _ = builder.epsilon_bounds()
+        builder.set_bounds(e, lb, epsilon)
+
+        teams_of = builder.teams_of()
+        assignment = np.asarray(assignment, dtype=np.int64)
+
+        conflicts = branches = 0
+
+        for i, stage in enumerate(stages):
+            if interrupt is not None \
+                    and interrupt.is_set():
+                break
+
+            remaining = deadline - time.perf_counter()
+
+            if remaining <= 0:
+                break
+
+            variables, coefficients = stage(builder, e, epsilon)
+
+            builder.minimize(variables, coefficients)
+            builder.hint_assignment(assignment)
+
+            solver = cp_model.CpSolver()
+            config.apply(solver.parameters)
+
+            # Share what is left among the remaining stages
+            if remaining < float('inf'):
+                solver.parameters.max_time_in_seconds = \
+                    remaining / (len(stages) - i)
+
+            status = solver.Solve(builder.model)
+
+            conflicts += solver.NumConflicts()
+            branches += solver.NumBranches()
+
+            if status not in (cp_model.OPTIMAL,
+                              cp_model.FEASIBLE):
+                break
+
+            assignment = np.array(solver.ResponseProto().solution,
+                                  dtype=np.int64)[teams_of]
+
+            objective = int(solver.ObjectiveValue())
+
+            logger.info('Stage %i objective: %i (%s)', i + 2, objective,
+                        'optimal' if status == cp_model.OPTIMAL
+                        else 'feasible')
+
+            # No worse in the later stages
+            builder.add_linear(variables, coefficients, 0, objective)
+
+        return assignment, conflicts, branches
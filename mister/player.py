@@ -6,6 +6,8 @@ from mister.serializable import DictSerializable
 
 
 class Player(DictSerializable):
+    __slots__ = ('name', 'rating', 'position')
+
     def __init__(self, name: str, rating: int,
                  position: t.Union[str, Position]):
         self.name = name
@@ -16,6 +18,15 @@ class Player(DictSerializable):
 
         self.position = position
 
+    def serialize(self) \
+                 -> t.Dict:
+        # Leaf of every solution, thus spelled out
+        return {
+            'name': self.name,
+            'rating': self.rating,
+            'position': self.position,
+        }
+
     @staticmethod
     def deserialize(encoding: t.Dict) \
                    -> 'Player':
@@ -0,0 +1,130 @@
+import threading
+import time
+import typing as t
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.builder import ModelBuilder
+from mister.config import SolverConfig
+
+
+# Default minimum number of players in another team
+# between any two solutions of a diverse pool
+MIN_distance = 2
+
+
+class Pool:
+    """
+    Pool of distinct good solutions.
+
+    Any two solutions of the pool are at least min_distance apart, i.e.,
+    that many players are in another team, so that a random pick from
+    it is not the same split under another name.
+    """
+    @staticmethod
+    def diversify(builder: ModelBuilder,
+                  e: cp_model.IntVar,
+                  candidates: t.List[t.Tuple[int, t.Sequence[int]]],
+                  config: SolverConfig,
+                  good_epsilon: int,
+                  deadline: float,
+                  interrupt: threading.Event = None) \
+                 -> t.Tuple[t.List[t.Tuple[int, t.List[int]]], int, int]:
+        """
+        Pick a pool of solutions at least min_distance apart among the
+        candidates, the best first, and complete it with more solves of the
+        same model, each excluding the neighbourhood of the previous ones
+        with a no-good cut, until the pool is full, no other solution is
+        within good_epsilon, or the deadline expires.
+
+        Parameters
+        ----------
+        builder : ModelBuilder
+            Model builder of the scenario, to which the cuts are added
+
+        e : IntVar
+            Epsilon of the CP model
+
+        candidates : List[Tuple[int, Sequence[int]]]
+            Epsilon and team Id of each player of the solutions found so far
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver, with the pool size
+
+        good_epsilon : int
+            Largest epsilon of a solution of the pool
+
+        deadline : float
+            End of the time budget, as given by perf_counter
+
+        interrupt : Event
+            Event that stops the search once set. The default is None.
+
+        Returns
+        -------
+        Tuple[List[Tuple[int, List[int]]], int, int]
+            Epsilon and team Id of each player of each solution of the pool,
+            and the conflicts and branches of the solves.
+        """
+        distance = config.min_distance or MIN_distance
+
+        lb, _ = builder.epsilon_bounds()
+        builder.set_bounds(e, lb, good_epsilon)
+
+        pool = []
+
+        for epsilon, assignment in sorted(candidates, key=lambda s: s[0]):
+            if len(pool) >= config.pool_size \
+                    or epsilon > good_epsilon:
+                break
+
+            assignment = np.asarray(assignment, dtype=np.int64)
+
+            if all(np.count_nonzero(assignment != other) >= distance
+                   for _, other in pool):
+                pool.append((epsilon, assignment))
+                builder.add_distance(assignment, distance)
+
+        teams_of = builder.teams_of()
+        conflicts = branches = 0
+
+        while len(pool) < config.pool_size:
+            if interrupt is not None \
+                    and interrupt.is_set():
+                break
+
+            remaining = deadline - time.perf_counter()
+
+            if remaining <= 0:
+                break
+
+            solver = cp_model.CpSolver()
+            config.apply(solver.parameters)
+
+            # Share what is left among the missing solutions
+            if remaining < float('inf'):
+                solver.parameters.max_time_in_seconds = \
+                    remaining / (config.pool_size - len(pool))
+
+            status = solver.Solve(builder.model)
+
+            conflicts += solver.NumConflicts()
+            branches += solver.NumBranches()
+
+            if status not in (cp_model.OPTIMAL,
+                              cp_model.FEASIBLE):
+                break
+
+            assignment = np.array(solver.ResponseProto().solution,
+                                  dtype=np.int64)[teams_of]
+
+            pool.append((int(solver.ObjectiveValue()), assignment))
+            builder.add_distance(assignment, distance)
+
+        pool.sort(key=lambda s: s[0])
+
+        return [(epsilon, assignment.tolist()) for epsilon, assignment
+                in pool], conflicts, branches
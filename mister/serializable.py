@@ -1,22 +1,92 @@
-import collections
+import operator
 import typing as t
 
 from abc import ABC
 from abc import abstractmethod
 
-from collections import Iterable
+
+def _fields(cls: type) -> t.Tuple[str, ...]:
+    """
+    Public slots of a class and of its bases, in definition order.
+    """
+    fields = []
+
+    for c in reversed(cls.__mro__):
+        slots = c.__dict__.get('__slots__', ())
+
+        if isinstance(slots, str):
+            slots = (slots,)
+
+        fields += [s for s in slots
+                   if not s.startswith('_')]
+
+    return tuple(fields)
+
+def _getter(cls: type) -> t.Tuple[t.Tuple[str, ...],
+                                  t.Callable[[t.Any], t.Tuple]]:
+    """
+    Public slots of a class, and a getter of all their values at once.
+    """
+    if cls not in _Getters:
+        fields = _fields(cls)
+
+        if len(fields) == 1:
+            getter = lambda o, k=fields[0]: (getattr(o, k),)
+        else:
+            getter = operator.attrgetter(*fields) if fields \
+                     else lambda o: ()
+
+        _Getters[cls] = (fields, getter)
+
+    return _Getters[cls]
+
+def _encode(v: t.Any) -> t.Any:
+    cls = type(v)
+
+    if cls in _Scalars:
+        return v
+
+    if cls is list:
+        return [_encode(o) for o in v]
+
+    if cls not in _Serializables:
+        _Serializables[cls] = issubclass(cls, Serializable)
+
+    return v.serialize() if _Serializables[cls] \
+           else v
+
+# Public slots and their getter per class
+_Getters = {}
+
+_Scalars = {str, int, float, bool, type(None)}
+
+# Whether a type is serializable, without the cost of ABC checks
+_Serializables = {}
 
 
 class Serializable(ABC):
+    __slots__ = ()
+
     def __str__(self):
         return self.serialize()
 
+    def _items(self) -> t.Iterator[t.Tuple[str, t.Any]]:
+        """
+        Public attributes, from the slots or else from the instance dict.
+        """
+        fields, getter = _getter(type(self))
+
+        yield from zip(fields, getter(self))
+
+        if hasattr(self, '__dict__'):
+            yield from self.__dict__.items()
+
     def serialize(self,
                   delimiter: str = '-') \
                  -> str:
         return delimiter.join(
-            [str(s) for s in
-             self.__dict__.values()])
+            [str(v) for _, v in
+             self._items()])
 
     @staticmethod
     @abstractmethod
@@ -26,18 +96,22 @@ class Serializable(ABC):
         raise NotImplementedError()
 
 class DictSerializable(Serializable):
+    """
+    Serializable as a new dict of its public attributes, which leaves the
+    object as is, so that it can be serialized again or cached.
+    """
+    __slots__ = ()
+
     def serialize(self) \
                  -> t.Dict:
-        _D = self.__dict__
+        if hasattr(self, '__dict__'):
+            return {k: _encode(v) for k, v
+                    in self._items()}
 
-        for k, v in _D.items():
-            if (isinstance(v, Serializable)):
-                _D[k] = v.serialize()
-            elif (isinstance(v, type([]))):
-                _D[k] = [o if not isinstance(o, Serializable)
-                           else o.serialize() for o in v]
+        # Single pass over the precomputed slots
+        fields, getter = _getter(type(self))
 
-        return _D
+        return dict(zip(fields, map(_encode, getter(self))))
 
     @staticmethod
     @abstractmethod
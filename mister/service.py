@@ -0,0 +1,368 @@
+import concurrent.futures as cf
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import typing as t
+
+# Custom imports
+import mister.__main__ as M
+from mister.cache import ScenarioCache
+from mister.config import SolverConfig
+from mister.constants import Phases
+from mister.errors import *
+from mister.metrics import metrics
+from mister.types import JSON
+
+
+# Request keys for Mister API
+Mister_KEYS = [
+    'n', 'nteams', 'players'
+]
+
+Mister_KEYS_opt = [
+    'formation', 'optimal', 'solver',
+    'previous_solution', 'return_pool'
+]
+
+# Upper bounds on the solver parameters
+# of a request, so that its latency is bounded
+Solver_LIMITS = {
+    'TIME_LIMIT': 10.,
+    'NUM_WORKERS': 4
+}
+
+# Solve executor sizing, overridable from the environment
+Executor_CONF = {
+    'MAX_WORKERS': int(os.environ.get('MISTER_MAX_WORKERS', 0)) or None,
+    'MAX_QUEUE': int(os.environ.get('MISTER_MAX_QUEUE', 0)) or None,
+    'NCORES': int(os.environ.get('MISTER_NCORES', 0)) or None,
+    # Deadline on top of the time budget of the search
+    'GRACE': 2.
+}
+
+# Solution pools cache, on disk if a path is given
+Cache_CONF = {
+    'PATH': os.environ.get('MISTER_CACHE_PATH'),
+    'MAX_ENTRIES': int(os.environ.get('MISTER_CACHE_ENTRIES', 1024)),
+    'TTL': float(os.environ.get('MISTER_CACHE_TTL', 7*24*3600)),
+}
+
+# Errors on the client side
+Client_ERRORS = (
+    DuplicatePlayersError,
+    InfeasibleScenarioError,
+    NoSolutionError,
+    InvalidFormationError,
+    InvalidPreviousSolutionError,
+    InvalidRatingError,
+    InvalidSolverConfigError,
+    NotEnoughPlayersError,
+    NotEnoughTotalPlayersError,
+    TooManyPlayersError,
+)
+
+# Time left to send the solution back
+# to the caller once the search is over
+_GRACE = 0.25
+
+# Period of the checks for a cancelled request
+_POLL = 0.05
+
+# Cancel flag of each request slot, shared with the workers
+_flags = None
+
+
+def _warmup(flags):
+    global _flags
+    _flags = flags
+
+    # Sent back with each solution pool
+    metrics.enable()
+
+    # Import the solver once per worker process,
+    # so that requests do not pay for it.
+    import mister.manager
+
+def _watch(slot: int,
+           interrupt: threading.Event,
+           done: threading.Event):
+    """
+    Set interrupt once the request in some slot is cancelled.
+    """
+    while not done.wait(_POLL):
+        if _flags[slot]:
+            interrupt.set()
+            break
+
+def _solve(kwargs: t.Dict[str, t.Any],
+           ncores: int,
+           deadline: float,
+           timeout: float,
+           slot: int) -> t.Tuple[t.List[JSON], t.Any]:
+    remaining = deadline - time.time() - _GRACE
+
+    if remaining <= 0:
+        raise DeadlineExceededError(timeout)
+
+    interrupt = threading.Event()
+    done = threading.Event()
+
+    watcher = threading.Thread(target=_watch,
+                               args=(slot, interrupt, done),
+                               daemon=True)
+    watcher.start()
+
+    try:
+        pool = M.make_pool(kwargs['n'], kwargs['nteams'],
+                           kwargs['_players'], kwargs['_formation'],
+                           kwargs['config'].bounded(remaining, ncores),
+                           kwargs['previous'],
+                           interrupt=interrupt)
+    finally:
+        done.set()
+        watcher.join()
+
+    return pool, metrics.drain()
+
+
+class SolveExecutor:
+    """
+    Bounded pool of warm solver processes.
+
+    Each request is solved in a worker process with a deadline. Requests
+    beyond the queue depth are rejected at once, and the CP-SAT workers of
+    all the processes never exceed the number of cores. A cancelled request
+    stops its search through a flag shared with the worker processes.
+    """
+    def __init__(self, max_workers: int = None,
+                 max_queue: int = None,
+                 ncores: int = None,
+                 cache: ScenarioCache = None):
+        """
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker processes. The default is the number of cores.
+
+        max_queue : int
+            Number of requests waiting for a worker on top of those being
+            solved. The default is the number of worker processes.
+
+        ncores : int
+            Number of cores to share among the worker processes.
+            The default is the number of cores of the machine.
+
+        cache : ScenarioCache
+            Cache of solution pools, looked up before
+            dispatching to a worker. The default is None.
+        """
+        self.cache = cache
+
+        self.ncores = ncores or os.cpu_count() or 1
+        self.max_workers = max_workers or self.ncores
+        self.max_queue = self.max_workers if max_queue is None \
+                         else max_queue
+
+        # Core budget of the CP-SAT search of each process
+        self.ncores_per_worker = max(1, self.ncores
+                                        // self.max_workers)
+
+        self.__pending = threading.BoundedSemaphore(
+            self.max_workers + self.max_queue)
+
+        context = multiprocessing.get_context('spawn')
+
+        # A slot with a cancel flag per pending request
+        self.__flags = context.Array('b', self.max_workers
+                                          + self.max_queue,
+                                     lock=False)
+        self.__slots = queue.SimpleQueue()
+
+        for slot in range(len(self.__flags)):
+            self.__slots.put(slot)
+
+        self.__pool = cf.ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=context,
+            initializer=_warmup,
+            initargs=(self.__flags,))
+
+        # Start every worker process beforehand
+        for f in [self.__pool.submit(time.sleep, 0)
+                  for _ in range(self.max_workers)]:
+            f.result()
+
+    def submit(self, scenario_conf: JSON,
+               config: SolverConfig = None,
+               timeout: float = None) -> cf.Future:
+        """
+        Generate N equally matched football teams from JSON scenario conf
+        without waiting for them.
+
+        Cancelling the returned future stops the search, if running, e.g.,
+        once the client went away or the deadline expired.
+
+        Parameters
+        ----------
+        See solve.
+
+        Returns
+        -------
+        Future
+            Future of the encoded solution as JSON.
+
+        Raises
+        ------
+        QueueFullError
+            If too many requests are pending
+        """
+        kwargs = self.__parse(scenario_conf, config)
+
+        return self.__submit(kwargs, timeout
+                                     or kwargs['config'].time_limit)
+
+    def solve(self, scenario_conf: JSON,
+              config: SolverConfig = None,
+              timeout: float = None) -> JSON:
+        """
+        Generate N equally matched football teams from JSON scenario conf.
+
+        Parameters
+        ----------
+        scenario_conf : JSON
+            Encoded scenario conf as JSON
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver. The default is None.
+
+        timeout : float
+            Deadline of the request in seconds, including the time spent
+            waiting for a worker. The default is the config time budget.
+
+        Raises
+        ------
+        QueueFullError
+            If too many requests are pending
+
+        DeadlineExceededError
+            If no solution is available within the deadline
+        """
+        kwargs = self.__parse(scenario_conf, config)
+
+        timeout = timeout or kwargs['config'].time_limit
+
+        future = self.__submit(kwargs, timeout)
+
+        try:
+            return future.result(timeout)
+        except cf.TimeoutError:
+            future.cancel()
+            raise DeadlineExceededError(timeout)
+
+    @staticmethod
+    def __parse(scenario_conf: JSON,
+                config: SolverConfig = None) -> t.Dict[str, t.Any]:
+        with metrics.timer(Phases['PARSE']):
+            kwargs = M.parse(scenario_conf, config)
+
+        if kwargs['config'] is None:
+            kwargs['config'] = SolverConfig()
+
+        return kwargs
+
+    def __submit(self, kwargs: t.Dict[str, t.Any],
+                 timeout: float = None) -> cf.Future:
+        future = cf.Future()
+
+        if self.cache is not None:
+            key = ScenarioCache.key(kwargs['n'], kwargs['nteams'],
+                                    kwargs['_players'],
+                                    kwargs['_formation'],
+                                    kwargs['config'],
+                                    kwargs['previous'])
+
+            pool = self.cache.get(key)
+
+            if pool is not None:
+                future.set_running_or_notify_cancel()
+                future.set_result(M.select(pool, kwargs['optimal'],
+                                           kwargs['return_pool']))
+
+                return future
+
+        if not self.__pending.acquire(blocking=False):
+            raise QueueFullError(self.max_workers
+                                 + self.max_queue)
+
+        slot = self.__slots.get()
+
+        deadline = time.time() + timeout \
+                   if timeout else float('inf')
+
+        try:
+            solving = self.__pool.submit(_solve, kwargs,
+                                         self.ncores_per_worker,
+                                         deadline, timeout, slot)
+        except BaseException:
+            self.__release(slot)
+            raise
+
+        # Whether the slot went to another request
+        lock = threading.Lock()
+        released = False
+
+        def _cancel(f: cf.Future):
+            if not f.cancelled():
+                return
+
+            with lock:
+                if not released:
+                    self.__flags[slot] = 1
+
+            solving.cancel()
+
+        def _done(f: cf.Future):
+            nonlocal released
+
+            with lock:
+                released = True
+                self.__release(slot)
+
+            if f.cancelled() \
+                    or not future.set_running_or_notify_cancel():
+                future.cancel()
+            elif f.exception() is not None:
+                future.set_exception(f.exception())
+            else:
+                pool, content = f.result()
+
+                # What the worker process recorded
+                metrics.merge(content)
+
+                if self.cache is not None:
+                    self.cache.set(key, pool)
+
+                future.set_result(M.select(pool, kwargs['optimal'],
+                                           kwargs['return_pool']))
+
+        future.add_done_callback(_cancel)
+        solving.add_done_callback(_done)
+
+        return future
+
+    @property
+    def npending(self) -> int:
+        """
+        Number of requests being solved or waiting for a worker.
+        """
+        return len(self.__flags) - self.__slots.qsize()
+
+    def __release(self, slot: int):
+        self.__flags[slot] = 0
+        self.__slots.put(slot)
+        self.__pending.release()
+
+    def shutdown(self):
+        self.__pool.shutdown(wait=False)
@@ -0,0 +1,354 @@
+import typing as t
+
+import numpy as np
+
+# Custom imports
+from mister.builder import epsilon_bounds
+from mister.config import SolverConfig
+from mister.constants import Encodings
+from mister.constants import Ratings
+from mister.constants import Statuses
+from mister.errors import DuplicatePlayersError
+from mister.errors import InfeasibleScenarioError
+from mister.errors import InvalidRatingError
+from mister.errors import UnknownPlayerError
+from mister.feasibility import Feasibility
+from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.manager import Manager
+from mister.player import Player
+from mister.position import Position
+from mister.solution import Solution
+from mister.team import Team
+
+
+# Largest number of free teams of an edit,
+# and the time budget of each of its solves
+EDIT_nteams     = 4
+EDIT_time_limit = .25
+
+
+class Session:
+    """
+    Split of a league kept in memory across roster edits.
+
+    An edit, e.g., a late arrival in place of a no-show, only re-optimizes
+    the teams it touches, and the worst of those it leaves unbalanced, while
+    the others stay fixed, moving as few players as possible. Teams that
+    would break C5 and C6, or C9 with tiers, or C10 with a position
+    tolerance, across the whole league are touched as well. If
+    that cannot keep the teams as balanced as the last full split, the
+    free teams are doubled with the teams that deviate the other way, up
+    to EDIT_nteams, which are then balanced as well as they can be. CP
+    models of the free teams come from the model templates of the
+    process, so that they are built once per shape.
+    """
+    def __init__(self, n: int,
+                 players: t.List[Player],
+                 formation: Formation,
+                 config: SolverConfig = None,
+                 position_encoding: str = Encodings['BOUNDS'],
+                 tolerance: int = 0):
+        """
+        Parameters
+        ----------
+        n : int
+            Number of players per team
+
+        players : List[Player]
+            Players to split into teams
+
+        formation : Formation
+            Formation of interest, or None
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver of the first split. Those of
+            the edits are bounded by EDIT_time_limit. The default is None.
+
+        position_encoding : str
+            Encoding of C7 when no formation is given.
+            The default is "bounds".
+
+        tolerance : int
+            Epsilon an edit may add to that of the last full split, so that
+            fewer players move. The default is 0, as balanced as it.
+        """
+        self.n = formation.nplayers if formation is not None \
+                 else n
+        self.formation = formation
+        self.config = config or SolverConfig()
+        self.position_encoding = position_encoding
+        self.tolerance = tolerance
+
+        # Players who changed team in the last edit
+        self.moved = []
+
+        self.__load(Manager.make_teams(self.n, list(players), formation,
+                                       optimal=True,
+                                       position_encoding=position_encoding,
+                                       config=self.config))
+
+        # Epsilon and average rating per team of the
+        # last full split, whose balance edits keep to
+        self.target = (self.epsilon, self.avg_rating)
+
+    def __load(self, solution: Solution):
+        self.solution = solution
+
+        self.players = sorted([p for _t in solution.teams
+                                 for p in _t.players],
+                              key=lambda p: p.rating)
+        self.teams = {p.name: _t.id for _t in solution.teams
+                                    for p in _t.players}
+
+        self.nteams = len(solution.teams)
+
+        self.avg_rating = sum([p.rating for p
+                               in self.players])//self.nteams
+        self.epsilon = Heuristic.epsilon(
+            self.players, [self.teams[p.name] for p in self.players],
+            self.nteams)
+
+    def replace(self, name: str,
+                player: Player) -> Solution:
+        """
+        Replace a player, e.g., a no-show with a late arrival.
+        """
+        return self.edit(add=[player], remove=[name])
+
+    def edit(self, add: t.List[Player] = None,
+             remove: t.List[str] = None,
+             ratings: t.Dict[str, int] = None,
+             positions: t.Dict[str, t.Union[str, Position]] = None) \
+            -> Solution:
+        """
+        Edit the roster and re-optimize the teams the edits touch.
+
+        Parameters
+        ----------
+        add : List[Player]
+            Players to add. The default is None.
+
+        remove : List[str]
+            Names of the players to remove. The default is None.
+
+        ratings : Dict[str, int]
+            New rating per player name. The default is None.
+
+        positions : Dict[str, Union[str, Position]]
+            New position per player name. The default is None.
+
+        Returns
+        -------
+        Solution
+            New split, with the Ids of the teams kept. The players who
+            changed team are listed in moved.
+
+        Raises
+        ------
+        UnknownPlayerError
+            If an edited player is not in the session
+
+        InfeasibleScenarioError
+            If no teams can satisfy the edited roster
+        """
+        players = {p.name: p for p in self.players}
+        teams = dict(self.teams)
+
+        touched = set()
+
+        for name in remove or []:
+            self.__get(players, name)
+
+            del players[name]
+            touched.add(teams.pop(name))
+
+        for name, rating in (ratings or {}).items():
+            p = self.__get(players, name)
+
+            players[name] = Player(name, int(rating), p.position)
+            touched.add(teams[name])
+
+        for name, position in (positions or {}).items():
+            p = self.__get(players, name)
+
+            players[name] = Player(name, p.rating, position)
+            touched.add(teams[name])
+
+        for p in add or []:
+            if p.name in players:
+                raise DuplicatePlayersError()
+
+            players[p.name] = p
+
+        for p in players.values():
+            if not Ratings['MIN'] <= p.rating <= Ratings['MAX']:
+                raise InvalidRatingError()
+
+        players = sorted(players.values(),
+                         key=lambda p: p.rating)
+
+        reasons = Feasibility.counts(self.n, players, self.formation) \
+                  or Feasibility.analyze(self.n, players, self.formation,
+                                         self.config.tiers)
+
+        if reasons:
+            raise InfeasibleScenarioError(reasons)
+
+        if len(players) // self.n != self.nteams:
+            # Teams come or go, so split the league again
+            self.moved = []
+            self.__load(Manager.make_teams(
+                self.n, players, self.formation, optimal=True,
+                position_encoding=self.position_encoding,
+                config=self.config))
+
+            self.target = (self.epsilon, self.avg_rating)
+
+            return self.solution
+
+        if not touched:
+            return self.solution
+
+        assignment = np.array([teams.get(p.name, -1) for p in players],
+                              dtype=np.int64)
+
+        ratings = np.array([p.rating for p in players],
+                           dtype=np.int64)
+
+        avg_rating_per_team = int(ratings.sum())//self.nteams
+        lb, _ = epsilon_bounds(ratings, self.nteams)
+
+        # As balanced as the last full split but for the shift of the
+        # average, so that edits do not unbalance the teams little by little
+        target = max(self.target[0] + self.tolerance
+                     + abs(avg_rating_per_team - self.target[1]), lb)
+
+        assigned = assignment >= 0
+
+        dev = np.bincount(assignment[assigned],
+                          weights=ratings[assigned],
+                          minlength=self.nteams).astype(np.int64) \
+              - avg_rating_per_team
+
+        # C5 and C6, or C9 with tiers, across the whole league: a fixed
+        # team must keep its share of the highest and lowest-rated players,
+        # e.g., not lose its top player to a higher-rated arrival, and
+        # with C10, its rating per position around the new averages
+        broken = Feasibility.unspread(assignment, self.nteams,
+                                      self.config.tiers) \
+                 | Feasibility.unbalanced(players, assignment, self.nteams,
+                                          self.config.position_tolerance)
+
+        touched |= broken
+
+        if not broken and assigned.all() and not positions \
+                and int(np.abs(dev).max()) == lb:
+            # New ratings that leave the teams as balanced as they
+            # can be, so no split can do better
+            self.moved = []
+            self.__load(Solution.create(lb, avg_rating_per_team,
+                                        Team.from_assignment(
+                                            players, assignment.tolist()),
+                                        Statuses['OPTIMAL']))
+
+            return self.solution
+
+        # The teams the edits touch, and the worst of those
+        # left too unbalanced, up to EDIT_nteams
+        unbalanced = sorted([tid for tid in range(self.nteams)
+                             if tid not in touched
+                             and abs(dev[tid]) > target],
+                            key=lambda tid: -abs(dev[tid]))
+
+        tids = sorted(touched) \
+               + unbalanced[:max(EDIT_nteams - len(touched), 0)]
+
+        # Surplus of the free teams, including the added players
+        surplus = int(ratings[np.isin(assignment, tids) | ~assigned].sum()) \
+                  - len(tids)*avg_rating_per_team
+
+        # Teams that deviate the other way first
+        others = sorted([tid for tid in range(self.nteams)
+                         if tid not in tids],
+                        key=lambda tid: dev[tid]*np.sign(surplus))
+
+        config = self.config.bounded(EDIT_time_limit, None)
+
+        best = None
+
+        while True:
+            candidate, _ = Manager.reoptimize(self.n, players,
+                                              self.formation,
+                                              assignment, tids,
+                                              self.position_encoding,
+                                              config,
+                                              epsilon=target)
+
+            if candidate is not None:
+                best = (Heuristic.epsilon(players, candidate,
+                                          self.nteams), candidate)
+                break
+
+            if not others \
+                    or len(tids) >= EDIT_nteams:
+                break
+
+            # Twice as many free teams, so that they can trade players
+            k = min(len(tids), EDIT_nteams - len(tids))
+
+            tids = tids + others[:k]
+            others = others[k:]
+
+        if best is None:
+            # Not as balanced as before, but as close as possible
+            candidate, _ = Manager.reoptimize(self.n, players,
+                                              self.formation,
+                                              assignment, tids,
+                                              self.position_encoding,
+                                              config)
+
+            if candidate is not None:
+                best = (Heuristic.epsilon(players, candidate,
+                                          self.nteams), candidate)
+
+        if best is None:
+            # C5 and C6, C9 or C10 may not hold within the free teams alone,
+            # so split the whole league, hinted by the current teams
+            solution = Manager.make_teams(
+                self.n, players, self.formation, optimal=True,
+                position_encoding=self.position_encoding,
+                config=self.config,
+                previous={p.name: tid for p, tid
+                          in zip(players, assignment.tolist())
+                          if tid >= 0})
+
+            self.moved = [name for _t in solution.teams
+                               for name in [p.name for p in _t.players]
+                          if name in teams and teams[name] != _t.id]
+
+            self.__load(solution)
+            self.target = (self.epsilon, self.avg_rating)
+
+            return self.solution
+
+        epsilon, candidate = best
+
+        self.moved = [p.name for p, tid in zip(players, candidate.tolist())
+                      if p.name in teams and teams[p.name] != tid]
+
+        self.__load(Solution.create(epsilon, avg_rating_per_team,
+                                    Team.from_assignment(players,
+                                                         candidate.tolist()),
+                                    Statuses['OPTIMAL'] if epsilon == lb
+                                    else Statuses['CONVERGED']))
+
+        return self.solution
+
+    @staticmethod
+    def __get(players: t.Dict[str, Player],
+              name: str) -> Player:
+        if name not in players:
+            raise UnknownPlayerError(name)
+
+        return players[name]
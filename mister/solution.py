@@ -1,29 +1,72 @@
 import typing as t
 
 # Custom imports
+from mister.errors import InvalidPreviousSolutionError
 from mister.serializable import DictSerializable
 from mister.team import Team
 
 class Solution(DictSerializable):
+    __slots__ = ('balance', 'teams', 'status')
+
     balance: float
     teams: t.List[Team]
+    status: str
 
     def __init__(self, balance: float,
-                 teams: t.List[Team]):
+                 teams: t.List[Team],
+                 status: str = None):
         self.balance = round(balance, 3)
         self.teams = teams
+        self.status = status
 
     @staticmethod
     def create(objvalue: int,
                avgrating: int,
-               teams: t.List[Team]) \
+               teams: t.List[Team],
+               status: str = None) \
               -> 'Solution':
         balance = 1.*(avgrating - objvalue) \
                     / avgrating
 
-        return Solution(balance, teams)
+        return Solution(balance, teams, status)
 
     @staticmethod
     def deserialize(encoding: t.Dict) \
                    -> 'Solution':
         raise NotImplementedError()
+
+    @staticmethod
+    def assignment(encoding: t.Union[t.Dict, t.List]) \
+                  -> t.Dict[str, int]:
+        """
+        Decode the team Id of each player from an encoded solution.
+
+        Parameters
+        ----------
+        encoding : Union[Dict, List]
+            Encoded solution as returned, or its list of teams. Each team
+            may omit its Id, defaulting to its index, and each player may
+            be given by name only.
+        """
+        teams = encoding.get('teams') \
+                if isinstance(encoding, dict) else encoding
+
+        if not isinstance(teams, list):
+            raise InvalidPreviousSolutionError()
+
+        _A = {}
+
+        try:
+            for i, _t in enumerate(teams):
+                tid = int(_t.get('id', i))
+
+                for p in _t['players']:
+                    name = p['name'] if isinstance(p, dict) \
+                           else p
+
+                    _A[str(name)] = tid
+        except (AttributeError, KeyError,
+                TypeError, ValueError):
+            raise InvalidPreviousSolutionError()
+
+        return _A
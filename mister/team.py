@@ -1,24 +1,30 @@
 import typing as t
 
-from ortools.sat.python import cp_model
-
 # Custom imports
 from mister.player import Player
 from mister.serializable import DictSerializable
 
+if t.TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
 
 class Team(DictSerializable):
+    __slots__ = ('id', 'players', '_rating')
+
     def __init__(self, id: int):
         self.id = id
         self.players = []
 
+        # Kept up to date by add
+        self._rating = 0
+
     def add(self, player: Player):
         self.players.append(player)
-   
+        self._rating += player.rating
+
     @property
     def rating(self) -> int:
-        return sum([p.rating for p
-                   in self.players])
+        return self._rating
 
     @staticmethod
     def deserialize(encoding: t.Dict) \
@@ -28,7 +34,7 @@ class Team(DictSerializable):
     @staticmethod
     def from_associations(players_per_tid: 
                               t.Dict[t.Tuple[Player, int],
-                                     cp_model.IntVar],
+                                     'cp_model.IntVar'],
                           cpsolver) -> t.List['Team']:
         """
         Generate teams from players per team Id associations.
@@ -53,3 +59,31 @@ class Team(DictSerializable):
                 _T[tid].add(p)
 
         return list(_T.values())
+
+    @staticmethod
+    def from_assignment(players: t.List[Player],
+                        assignment: t.Sequence[int]) \
+                       -> t.List['Team']:
+        """
+        Generate teams from the team Id of each player.
+
+        Parameters
+        ----------
+        players : List[Player]
+            Players split into teams
+
+        assignment : Sequence[int]
+            Team Id of each player
+        """
+        _T = {}
+
+        for p, tid in zip(players, assignment):
+            _t = _T.get(tid)
+
+            if _t is None:
+                _t = _T[tid] = Team(tid)
+
+            _t.players.append(p)
+            _t._rating += p.rating
+
+        return list(_T.values())
@@ -0,0 +1,132 @@
+import collections
+import threading
+import typing as t
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.builder import ModelBuilder
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+
+
+Shape = t.Tuple[t.Any, ...]
+
+
+class ModelTemplates:
+    """
+    Cache of built CP models keyed by problem shape, with least recently
+    used eviction.
+
+    Players of the same shape, i.e., as many per position split into as many
+    teams with the same formation and constraint options, lead to the same
+    CP model but for the ratings in C3 and the position of each player. A
+    cached model is thus copied and patched rather than built again.
+    """
+    def __init__(self, max_entries: int = 32):
+        """
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of cached models. The default is 32.
+        """
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(nteams: int,
+            players: t.List[Player],
+            formation: Formation,
+            symmetry_breaking: bool,
+            position_encoding: str,
+            tiers: int = None,
+            position_tolerance: int = None) -> Shape:
+        """
+        Shape of the CP model of some players.
+        """
+        counts = [0]*len(Position)
+        indices = {k: i for i, k in enumerate(Position)}
+
+        for p in players:
+            counts[indices[p.position]] += 1
+
+        return (len(players), nteams,
+                str(formation) if formation is not None else None,
+                bool(symmetry_breaking), position_encoding,
+                tuple(counts), tiers, position_tolerance)
+
+    def get(self, key: Shape,
+            players: t.List[Player],
+            avg_rating: int = None) \
+           -> t.Optional[t.Tuple[ModelBuilder, cp_model.IntVar]]:
+        """
+        Copy the cached model of a shape for some players, if any.
+
+        Parameters
+        ----------
+        key : Shape
+            Shape of the CP model
+
+        players : List[Player]
+            Players sorted by rating
+
+        avg_rating : int
+            Average rating per team to balance around.
+            The default is that of the players.
+
+        Returns
+        -------
+        Tuple[ModelBuilder, IntVar]
+            Model builder and objective variable epsilon.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+        template, index = entry
+
+        builder = template.clone(players, avg_rating)
+
+        e = builder.var(index)
+        builder.set_bounds(e, *builder.epsilon_bounds())
+
+        return builder, e
+
+    def set(self, key: Shape,
+            builder: ModelBuilder,
+            e: cp_model.IntVar):
+        """
+        Cache a freshly built model before any hint or bound is added.
+        """
+        template = builder.clone(builder.players,
+                                 builder._avg_rating)
+
+        with self.__lock:
+            self.__entries[key] = (template, e.Index())
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> t.Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.__entries),
+        }
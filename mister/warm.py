@@ -0,0 +1,225 @@
+import collections
+import logging
+import typing as t
+
+import numpy as np
+
+# Custom imports
+from mister.builder import ModelBuilder
+from mister.config import SolverConfig
+from mister.feasibility import Feasibility
+from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.player import Player
+
+
+logger = logging.getLogger(__name__)
+
+
+def _relabel(previous: t.Dict[str, int],
+             pinned: t.List[Player]) -> t.Dict[str, int]:
+    """
+    Relabel the teams of a previous solution, so that the
+    pinned players are hinted to the team Ids of C8.
+    """
+    mapping = {}
+
+    for tid, p in enumerate(pinned):
+        oid = previous.get(p.name)
+
+        if oid is not None \
+                and oid not in mapping \
+                and tid not in mapping.values():
+            mapping[oid] = tid
+
+    free = iter([tid for tid in range(len(pinned))
+                 if tid not in mapping.values()])
+
+    for oid in sorted(set(previous.values())):
+        if oid not in mapping:
+            mapping[oid] = next(free, None)
+
+    return {name: mapping[oid] for name, oid
+            in previous.items()
+            if mapping[oid] is not None}
+
+def _relabel_ordered(previous: t.Dict[str, int],
+                     players: t.List[Player],
+                     nteams: int) -> t.Dict[str, int]:
+    """
+    Relabel the teams of a previous solution down from the last
+    in order of their highest-rated player, as in C11.
+    """
+    mapping = {}
+
+    for p in reversed(players):
+        oid = previous.get(p.name)
+
+        if oid is not None \
+                and oid not in mapping:
+            mapping[oid] = nteams - 1 - len(mapping)
+
+    return {name: mapping[oid] for name, oid
+            in previous.items()
+            if oid in mapping}
+
+def _complete(builder: ModelBuilder,
+              previous: t.Dict[str, int],
+              formation: Formation) -> np.ndarray:
+    """
+    Complete the teams of a previous solution, e.g., with the players
+    who replaced others in the vacancies they left, each in the least
+    rated team with room for its position. Players left out have -1.
+    """
+    nteams = builder.nteams
+    n = builder.nplayers // nteams
+
+    assignment = np.array([previous.get(p.name, -1)
+                           for p in builder.players], dtype=np.int64)
+
+    assignment[(assignment < 0) | (assignment >= nteams)] = -1
+
+    for i in np.flatnonzero(assignment < 0)[::-1]:
+        assigned = assignment >= 0
+
+        sizes = np.bincount(assignment[assigned], minlength=nteams)
+        ratings = np.bincount(assignment[assigned],
+                              weights=builder.ratings[assigned],
+                              minlength=nteams)
+
+        k = builder.players[i].position
+        rows = builder.rows(k)
+        counts = np.bincount(assignment[rows][assignment[rows] >= 0],
+                             minlength=nteams)
+
+        room = sizes < n
+
+        if formation is not None:
+            room &= counts < formation.quota(k)
+        elif room.any():
+            room &= counts == counts[room].min()
+
+        if not room.any():
+            break
+
+        tids = np.flatnonzero(room)
+        assignment[i] = tids[ratings[tids].argmin()]
+
+    return assignment
+
+def _unchanged(previous: t.Dict[str, int],
+               players: t.List[Player],
+               nteams: int) -> t.Dict[str, int]:
+    """
+    Teams of a previous solution whose players are all still in the
+    roster, and nobody else.
+    """
+    n = len(players) // nteams
+    names = {p.name for p in players}
+
+    sizes = collections.Counter(previous.values())
+    kept = collections.Counter(tid for name, tid in previous.items()
+                               if name in names)
+
+    return {name: tid for name, tid in previous.items()
+            if name in names and kept[tid] == sizes[tid] == n}
+
+
+class WarmStart:
+    """
+    Warm start of a search from the teams of a previous solution.
+
+    After a few edits of the roster, e.g., a late arrival in place of a
+    no-show, the previous teams completed with the new players are often
+    still feasible and nearly balanced, so a few swaps make a better seed
+    than a fresh draft. Otherwise, only the teams the edits left alone
+    are hinted.
+    """
+    @staticmethod
+    def seed(builder: ModelBuilder,
+             formation: Formation,
+             config: SolverConfig,
+             previous: t.Dict[str, int],
+             heuristic: t.Optional[np.ndarray],
+             symmetry_breaking: bool = True) \
+            -> t.Tuple[t.Optional[np.ndarray], t.Dict[str, int]]:
+        """
+        Pick the seed of a search between the heuristic teams and the
+        previous ones.
+
+        Parameters
+        ----------
+        builder : ModelBuilder
+            Model builder of the scenario
+
+        formation : Formation
+            Formation of interest, or None
+
+        config : SolverConfig
+            Parameters of the CP-SAT solver, with the tiers
+            and the position tolerance
+
+        previous : Dict[str, int]
+            Team Id of each player in a previous solution
+
+        heuristic : Optional[ndarray]
+            Team Id of each player by the heuristic engine, if any
+
+        symmetry_breaking : bool
+            Whether the team Ids are pinned by C8, or ordered by C11
+            with tiers. The default is True.
+
+        Returns
+        -------
+        Tuple[Optional[ndarray], Dict[str, int]]
+            Team Id of each player of the seed, if any, and the team Id
+            of each player to hint besides, if any.
+        """
+        if symmetry_breaking and config.tiers is not None:
+            previous = _relabel_ordered(previous, builder.players,
+                                        builder.nteams)
+        elif symmetry_breaking:
+            previous = _relabel(previous,
+                                builder.players[-builder.nteams:])
+
+        warm = _complete(builder, previous, formation)
+
+        feasible = Feasibility.satisfies(builder, warm, formation,
+                                         config.tiers,
+                                         config.position_tolerance)
+
+        if feasible:
+            # As few swaps as it takes to balance the edited teams
+            improved = Heuristic.improve_assignment(builder.players,
+                                                    builder.nteams,
+                                                    warm, formation)
+
+            if symmetry_breaking and config.tiers is not None:
+                names = [p.name for p in builder.players]
+                ordered = _relabel_ordered(
+                    dict(zip(names, improved.tolist())),
+                    builder.players, builder.nteams)
+
+                improved = np.array([ordered[name] for name in names],
+                                    dtype=np.int64)
+
+            if Feasibility.satisfies(builder, improved, formation,
+                                     config.tiers,
+                                     config.position_tolerance):
+                warm = improved
+
+        if feasible \
+                and (heuristic is None
+                     or Heuristic.epsilon(builder.players, warm,
+                                          builder.nteams)
+                     <= Heuristic.epsilon(builder.players, heuristic,
+                                          builder.nteams)):
+            # The previous teams, completed, still satisfy the
+            # constraints and are no worse, so they seed the search
+            logger.info('Seeding the search with the previous teams')
+            return warm, {}
+
+        # Only the teams the edits left alone are still a good
+        # guess, and a partial hint of the others misleads it
+        return heuristic, _unchanged(previous, builder.players,
+                                     builder.nteams)
@@ -0,0 +1,27 @@
+import random
+import typing as t
+
+# Custom imports
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+
+
+def players(nteams: int,
+            formation: Formation = None,
+            n: int = 5,
+            seed: int = 0) -> t.List[Player]:
+    """
+    Random roster of Nteams, with the formation if any,
+    else with random positions.
+    """
+    rng = random.Random(seed)
+
+    if formation is None:
+        return [Player('P%i' % i, rng.randint(30, 100),
+                       rng.choice(list(Position)))
+                for i in range(n*nteams)]
+
+    return [Player('%s%i' % (k.value, i), rng.randint(30, 100), k)
+            for k in Position
+            for i in range(nteams*formation.quota(k))]
@@ -0,0 +1,71 @@
+import itertools as it
+import random
+
+import numpy as np
+import pytest
+
+# Custom imports
+from mister.builder import epsilon_bounds
+
+
+def _epsilons(ratings: np.ndarray,
+              nteams: int,
+              avg_rating: int) -> np.ndarray:
+    """
+    Epsilon of every split of the players into teams of the same size.
+    """
+    nplayers = len(ratings)
+
+    assignments = np.array(list(it.product(range(nteams),
+                                           repeat=nplayers)))
+
+    sizes = np.stack([(assignments == tid).sum(axis=1)
+                      for tid in range(nteams)], axis=1)
+    assignments = assignments[(sizes == nplayers // nteams).all(axis=1)]
+
+    trating = np.stack([((assignments == tid)*ratings).sum(axis=1)
+                        for tid in range(nteams)], axis=1)
+
+    return np.abs(trating - avg_rating).max(axis=1)
+
+def _ratings(nplayers: int, step: int, seed: int) -> np.ndarray:
+    rng = random.Random(seed)
+
+    return np.array([step*rng.randint(1, 100 // step)
+                     for _ in range(nplayers)], dtype=np.int64)
+
+@pytest.mark.parametrize('nplayers, nteams', [
+    (4, 2), (6, 2), (6, 3), (8, 2), (8, 4), (9, 3)])
+@pytest.mark.parametrize('step', [1, 5, 10])
+@pytest.mark.parametrize('shift', [None, -7, 3])
+@pytest.mark.parametrize('seed', range(3))
+def test_epsilon_bounds(nplayers, nteams, step, shift, seed):
+    ratings = _ratings(nplayers, step, seed)
+
+    avg_rating = None if shift is None \
+                 else int(ratings.sum()) // nteams + shift
+
+    lb, ub = epsilon_bounds(ratings, nteams, avg_rating)
+
+    if avg_rating is None:
+        avg_rating = int(ratings.sum()) // nteams
+
+    epsilons = _epsilons(ratings, nteams, avg_rating)
+
+    # The lower bound never cuts the optimum off,
+    # nor the upper bound any split
+    assert lb <= epsilons.min()
+    assert epsilons.max() <= ub
+
+def test_epsilon_bounds_are_tight():
+    # Team ratings are multiples of 10 around an average of 105
+    ratings = np.array([10, 20, 30, 40, 60, 50], dtype=np.int64)
+
+    lb, _ = epsilon_bounds(ratings, 2, 105)
+
+    assert lb == 5 == _epsilons(ratings, 2, 105).min()
+
+    # Some team is at least at the ceil of the total per team
+    lb, _ = epsilon_bounds(ratings, 2, 100)
+
+    assert lb == 10 == _epsilons(ratings, 2, 100).min()
@@ -0,0 +1,106 @@
+import time
+
+# Custom imports
+import mister.__main__ as M
+
+from mister.cache import MemoryBackend
+from mister.cache import ScenarioCache
+from mister.cache import SQLiteBackend
+from mister.config import SolverConfig
+from mister.formation import Formation
+from tests.roster import players
+
+
+Formation_2_2_1 = Formation(2, 2, 1)
+
+Players = [p.serialize() for p in players(2, Formation_2_2_1)]
+
+
+def _key(**kwargs) -> str:
+    return ScenarioCache.key(5, 2, kwargs.pop('_players', Players),
+                             str(Formation_2_2_1), **kwargs)
+
+def test_key_ignores_the_order_of_the_players():
+    assert _key() == _key(_players=Players[::-1])
+
+def test_key_depends_on_the_config():
+    assert _key() == _key(config=SolverConfig())
+    assert _key() != _key(config=SolverConfig(random_seed=1))
+
+def test_key_depends_on_the_previous_solution():
+    previous = {p['name']: i % 2 for i, p in enumerate(Players)}
+    swapped = {name: 1 - tid for name, tid in previous.items()}
+
+    assert _key() != _key(previous=previous)
+    assert _key(previous=previous) != _key(previous=swapped)
+    assert _key(previous=previous) \
+           == _key(previous=dict(reversed(list(previous.items()))))
+
+def test_previous_solution_misses_a_cold_pool():
+    cache = ScenarioCache()
+    config = SolverConfig(time_limit=2.)
+    scenario_conf = {
+        'n': 5,
+        'nteams': 2,
+        'formation': str(Formation_2_2_1),
+        'optimal': True,
+        'players': Players,
+    }
+
+    solution = M.fromjson(scenario_conf, config, cache)
+    M.fromjson(scenario_conf, config, cache)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    M.fromjson(dict(scenario_conf, previous_solution=solution),
+               config, cache)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_memory_backend_evicts_the_least_recently_used():
+    cache = ScenarioCache(MemoryBackend(), max_entries=2)
+
+    cache.set('a', [{'i': 0}])
+    cache.set('b', [{'i': 1}])
+    cache.get('a')
+    cache.set('c', [{'i': 2}])
+
+    assert cache.get('b') is None
+    assert cache.get('a') == [{'i': 0}]
+    assert cache.get('c') == [{'i': 2}]
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'entries': 2}
+
+def test_ttl_expires_entries():
+    cache = ScenarioCache(ttl=.05)
+
+    cache.set('a', [{'i': 0}])
+
+    assert cache.get('a') == [{'i': 0}]
+
+    time.sleep(.1)
+
+    assert cache.get('a') is None
+    assert len(cache.backend) == 0
+
+def test_sqlite_backend_persists(tmp_path):
+    path = str(tmp_path / 'cache.db')
+
+    ScenarioCache(SQLiteBackend(path)).set('a', [{'i': 0}])
+
+    assert ScenarioCache(SQLiteBackend(path)).get('a') == [{'i': 0}]
+
+def test_sqlite_backend_evicts_the_least_recently_used(tmp_path):
+    cache = ScenarioCache(SQLiteBackend(str(tmp_path / 'cache.db')),
+                          max_entries=2)
+
+    cache.set('a', [{'i': 0}])
+    time.sleep(.01)
+    cache.set('b', [{'i': 1}])
+    time.sleep(.01)
+    cache.get('a')
+    time.sleep(.01)
+    cache.set('c', [{'i': 2}])
+
+    assert cache.get('b') is None
+    assert cache.get('a') == [{'i': 0}]
+    assert len(cache.backend) == 2
@@ -0,0 +1,100 @@
+import collections
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.collector import MIN_solutions
+from mister.collector import SolutionCollector
+from mister.formation import Formation
+from mister.listener import SolutionListener
+from mister.manager import Manager
+from tests.roster import players
+
+
+class _Recorder(SolutionListener):
+    def __init__(self):
+        self.epsilons = []
+
+    def on_solution(self, epsilon, teams, walltime):
+        assert sorted(len(_t.players) for _t in teams) == [5]*len(teams)
+
+        self.epsilons.append(epsilon)
+
+
+def _solve(nteams: int = 4,
+           seed: int = 0,
+           **kwargs):
+    builder, _ = Manager.build_model(5, players(nteams, Formation(2, 2, 1),
+                                                seed=seed),
+                                     Formation(2, 2, 1))
+
+    collector = SolutionCollector(builder.players,
+                                  builder.teams_of(),
+                                  builder.nteams,
+                                  **kwargs)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = 1
+    solver.parameters.max_time_in_seconds = 5.
+    solver.SolveWithSolutionCallback(builder.model, collector)
+
+    return builder, collector
+
+def test_history_matches_the_assignments():
+    builder, collector = _solve()
+
+    history = collector.get_history()
+
+    assert 0 < len(history) == collector.nsolutions
+
+    for epsilon, walltime, assignment in history:
+        ratings = collections.Counter()
+
+        for p, tid in zip(builder.players, assignment):
+            ratings[tid] += p.rating
+
+        assert sorted(ratings) == list(range(builder.nteams))
+        assert epsilon >= max(abs(r - builder.avg_rating)
+                              for r in ratings.values())
+
+    # In the order found, improving
+    assert [s[1] for s in history] == sorted(s[1] for s in history)
+    assert [s[0] for s in history] \
+           == sorted((s[0] for s in history), reverse=True)
+
+def test_max_solutions_keeps_the_best():
+    _, collector = _solve(max_solutions=1)
+
+    (epsilon, _, _), = collector.get_history()
+
+    assert epsilon == collector.get_solutions()[0][0]
+    assert collector.nsolutions >= 1
+
+def test_good_solutions():
+    _, collector = _solve()
+
+    solutions = collector.get_solutions()
+    epsilons = [s[0] for s in solutions]
+
+    assert epsilons == sorted(epsilons)
+    assert len(set(epsilons)) <= MIN_solutions
+
+    best = epsilons[0]
+
+    assert all(s[0] == best for s
+               in collector.get_solutions(best))
+
+def test_epsilon_threshold_stops_the_search():
+    listener = _Recorder()
+    _, collector = _solve(epsilon_threshold=10**6, listener=listener)
+
+    assert collector.threshold_reached
+    assert collector.nsolutions == 1
+    assert listener.epsilons == [collector.get_history()[0][0]]
+
+def test_listener_receives_each_solution():
+    listener = _Recorder()
+    _, collector = _solve(listener=listener)
+
+    assert not collector.threshold_reached
+    assert listener.epsilons == [s[0] for s in collector.get_history()]
@@ -0,0 +1,69 @@
+import pytest
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.errors import InvalidSolverConfigError
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'time_limit': 0},
+    {'num_workers': 0},
+    {'linearization_level': 3},
+    {'epsilon_threshold': -1},
+    {'engine': 'simplex'},
+    {'pool_size': 0},
+    {'pool_epsilon': -1},
+    {'min_distance': 0},
+    {'objective': 'spread'},
+    {'tiers': 1},
+    {'position_tolerance': -1},
+    {'tiers': 3, 'engine': 'heuristic'},
+    {'position_tolerance': 10, 'engine': 'lns'},
+])
+def test_invalid_parameters(kwargs):
+    with pytest.raises(InvalidSolverConfigError):
+        SolverConfig(**kwargs)
+
+def test_bounded():
+    config = SolverConfig(time_limit=30., num_workers=2,
+                          random_seed=7, tiers=3)
+
+    bounded = config.bounded(10., 4)
+
+    assert (bounded.time_limit, bounded.num_workers) == (10., 2)
+    assert (bounded.random_seed, bounded.tiers) == (7, 3)
+
+    # Unset parameters take the maxima, and no maximum keeps them
+    assert SolverConfig().bounded(10., 4).time_limit == 10.
+    assert config.bounded(None, None).time_limit == 30.
+
+def test_apply():
+    solver = cp_model.CpSolver()
+
+    SolverConfig(time_limit=2., num_workers=3, random_seed=5,
+                 linearization_level=0).apply(solver.parameters)
+
+    assert solver.parameters.max_time_in_seconds == 2.
+    assert solver.parameters.num_search_workers == 3
+    assert solver.parameters.random_seed == 5
+    assert solver.parameters.linearization_level == 0
+
+def test_deserialize():
+    config = SolverConfig.deserialize({'time_limit': '2.5',
+                                       'num_workers': 4,
+                                       'random_seed': None})
+
+    assert (config.time_limit, config.num_workers,
+            config.random_seed) == (2.5, 4, None)
+
+    assert SolverConfig.deserialize(config.serialize()).serialize() \
+           == config.serialize()
+
+@pytest.mark.parametrize('encoding', [
+    [], {'timeout': 1}, {'num_workers': 'many'},
+])
+def test_deserialize_invalid(encoding):
+    with pytest.raises(InvalidSolverConfigError):
+        SolverConfig.deserialize(encoding)
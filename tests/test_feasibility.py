@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.constants import Constraints
+from mister.errors import InfeasibleScenarioError
+from mister.feasibility import Feasibility
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.player import Player
+from mister.position import Position
+from tests.roster import players
+
+
+Formation_2_2_1 = Formation(2, 2, 1)
+
+
+def _extreme_forwards():
+    """
+    Four teams of 2-2-1 but a forward too many, the four highest-rated
+    players and the lowest-rated one being forwards.
+    """
+    return [Player('F%i' % i, 90 + i, Position.F) for i in range(4)] \
+           + [Player('F4', 10, Position.F)] \
+           + [Player('D%i' % i, 50 + i, Position.D) for i in range(8)] \
+           + [Player('M%i' % i, 30 + i, Position.M) for i in range(7)]
+
+def test_counts():
+    roster = players(4, Formation_2_2_1)
+
+    assert Feasibility.counts(5, roster, Formation_2_2_1) == []
+    assert Feasibility.counts(5, roster, None) == []
+
+    reasons = Feasibility.counts(5, roster[:-1], None)
+
+    assert len(reasons) == 1
+    assert Constraints['C1'] in reasons[0]
+
+    reasons = Feasibility.counts(5, _extreme_forwards(), Formation_2_2_1)
+
+    assert len(reasons) == 2
+    assert reasons[0].startswith('given 7 midfielders, expected 8')
+    assert reasons[1].startswith('given 5 forwards, expected 4')
+    assert all(Constraints['C4'] in r for r in reasons)
+
+def test_analyze_feasible():
+    for seed in range(5):
+        roster = players(4, Formation_2_2_1, seed=seed)
+
+        assert Feasibility.analyze(5, roster, Formation_2_2_1) == []
+
+    assert Feasibility.analyze(5, players(4), None) == []
+
+def test_analyze_extremes():
+    reasons = Feasibility.analyze(5, _extreme_forwards(), Formation_2_2_1)
+
+    assert reasons == [
+        'given 5 forwards among the 8 highest and lowest-rated players, '
+        'expected at most 4 for 4 teams with a 2-2-1 formation '
+        '({}, {}, {})'.format(Constraints['C4'], Constraints['C5'],
+                              Constraints['C6'])]
+
+    # C9 replaces C5 and C6
+    assert Feasibility.analyze(5, _extreme_forwards(), Formation_2_2_1,
+                               tiers=3) == []
+
+def test_analyze_top_n():
+    formation = Formation(3, 2, 0)
+    roster = [Player('D%i' % i, 50 + i, Position.D) for i in range(6)] \
+             + [Player('M%i' % i, 20 + i, Position.M) for i in range(3)] \
+             + [Player('F0', 99, Position.F)]
+
+    reasons = Feasibility.analyze(5, roster, formation)
+
+    assert len(reasons) == 1
+    assert reasons[0].startswith('given 1 forwards among the 2 '
+                                 'highest-rated players, expected at most 0')
+    assert Constraints['C5'] in reasons[0]
+    assert Constraints['C6'] not in reasons[0]
+
+def test_make_teams_rejects_the_extremes():
+    with pytest.raises(InfeasibleScenarioError) as e:
+        Manager.make_teams(5, _extreme_forwards(), Formation_2_2_1,
+                           config=SolverConfig(time_limit=5.))
+
+    assert 'highest and lowest-rated' in str(e.value)
+
+def test_unspread():
+    # Two teams, the players sorted by rating, -1 without a team yet
+    assignment = np.array([0, 1, 0, 1, 0, 1, 1, 0])
+
+    assert Feasibility.unspread(assignment, 2) == set()
+    assert Feasibility.spread(assignment, 2)
+
+    # Both top players in team 0
+    assignment[-2:] = [0, 0]
+
+    assert Feasibility.unspread(assignment, 2) == {0, 1}
+
+    # A vacancy among the lowest-rated players
+    assignment = np.array([-1, 1, 0, 1, 0, 1, 1, 0])
+
+    assert Feasibility.unspread(assignment, 2) == {0}
+
+    # Two tiers of four players each, two per team
+    assignment = np.array([0, 0, 1, 1, 0, 1, 0, 1])
+
+    assert Feasibility.unspread(assignment, 2, tiers=2) == set()
+
+    assignment = np.array([0, 0, 0, 1, 1, 1, 0, 1])
+
+    assert Feasibility.unspread(assignment, 2, tiers=2) == {0, 1}
+
+def test_unbalanced():
+    roster = [Player('D0', 40, Position.D), Player('D1', 50, Position.D),
+              Player('F0', 60, Position.F), Player('F1', 70, Position.F)]
+
+    # Averages per team of 45 for the defenders, 65 for the forwards
+    assert Feasibility.unbalanced(roster, np.array([0, 1, 1, 0]), 2) \
+           == set()
+    assert Feasibility.unbalanced(roster, np.array([0, 1, 1, 0]), 2,
+                                  position_tolerance=5) == set()
+    assert Feasibility.unbalanced(roster, np.array([0, 1, 1, 0]), 2,
+                                  position_tolerance=4) == {0, 1}
+
+    # Only the assigned players count
+    assert Feasibility.unbalanced(roster, np.array([0, 1, -1, 1]), 2,
+                                  position_tolerance=5) == {0}
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+# Custom imports
+import mister.manager
+
+from mister.config import SolverConfig
+from mister.constants import Engines
+from mister.constants import Statuses
+from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.manager import Manager
+from mister.player import Player
+from mister.position import Position
+from tests.roster import players
+
+
+Scenarios = [
+    (nteams, formation, seed)
+    for nteams in (2, 3, 4)
+    for formation in (Formation(2, 2, 1), None)
+    for seed in range(3)
+]
+
+
+def _roster(nteams: int, formation: Formation, seed: int):
+    roster = players(nteams, formation, seed=seed)
+    roster.sort(key=lambda p: p.rating)
+
+    return roster
+
+def _check(roster, assignment: np.ndarray,
+           nteams: int, formation: Formation):
+    """
+    C1, C2, C4 or C7, C5, C6 and C8 on players sorted by rating.
+    """
+    n = len(roster) // nteams
+
+    assert sorted(np.bincount(assignment, minlength=nteams)) == [n]*nteams
+
+    for k in Position:
+        counts = np.bincount([tid for p, tid in zip(roster, assignment)
+                              if p.position == k], minlength=nteams)
+
+        if formation is not None:
+            assert (counts == formation.quota(k)).all()
+
+        assert counts.max() - counts.min() <= 1
+
+    assert sorted(assignment[:nteams]) == list(range(nteams))
+    assert assignment[-nteams:].tolist() == list(range(nteams))
+
+def _optimum(nteams: int, formation: Formation, seed: int) -> int:
+    roster = _roster(nteams, formation, seed)
+
+    solution = Manager.make_teams(5, roster, formation, optimal=True,
+                                  config=SolverConfig(time_limit=10.,
+                                                      num_workers=1))
+
+    assert solution.status == Statuses['OPTIMAL']
+
+    avg = sum(p.rating for p in roster) // nteams
+
+    return max(abs(_t.rating - avg) for _t in solution.teams)
+
+@pytest.mark.parametrize('nteams, formation, seed', Scenarios)
+def test_draft_satisfies_the_constraints(nteams, formation, seed):
+    roster = _roster(nteams, formation, seed)
+
+    draft = Heuristic.make_assignment(roster, nteams, formation,
+                                      max_iterations=0)
+
+    _check(roster, draft, nteams, formation)
+
+@pytest.mark.parametrize('nteams, formation, seed', Scenarios)
+def test_local_search_improves_the_draft(nteams, formation, seed):
+    roster = _roster(nteams, formation, seed)
+
+    draft = Heuristic.make_assignment(roster, nteams, formation,
+                                      max_iterations=0)
+    improved = Heuristic.improve_assignment(roster, nteams, draft,
+                                            formation)
+
+    _check(roster, improved, nteams, formation)
+
+    assert Heuristic.epsilon(roster, improved, nteams) \
+           <= Heuristic.epsilon(roster, draft, nteams)
+
+@pytest.mark.parametrize('nteams, formation, seed', Scenarios)
+def test_heuristic_against_cp_sat(nteams, formation, seed):
+    roster = _roster(nteams, formation, seed)
+
+    assignment = Heuristic.make_assignment(roster, nteams, formation)
+
+    epsilon = Heuristic.epsilon(roster, assignment, nteams)
+
+    assert epsilon >= _optimum(nteams, formation, seed)
+
+    solution = Manager.make_heuristic(5, roster, formation)
+
+    assert solution.status in (Statuses['HEURISTIC'],
+                               Statuses['OPTIMAL'])
+
+def test_no_draft_without_the_formation():
+    roster = players(2, Formation(2, 2, 1))
+    roster[0].position = Position.F
+
+    assert Heuristic.make_assignment(roster, 2, Formation(2, 2, 1)) \
+           is None
+
+def _even(nteams: int):
+    # Same rating everywhere, so that any draft is at the lower bound
+    return [Player('%s%i' % (k.value, i), 50, k)
+            for k in Position
+            for i in range(nteams*Formation(2, 2, 1).quota(k))]
+
+def test_make_heuristic_at_the_lower_bound_is_optimal():
+    solution = Manager.make_heuristic(5, _even(3), Formation(2, 2, 1))
+
+    assert solution.status == Statuses['OPTIMAL']
+
+def test_heuristic_at_the_lower_bound_skips_cp_sat(monkeypatch):
+    class _Unused:
+        def __init__(self):
+            raise AssertionError('CP-SAT was not due')
+
+    monkeypatch.setattr(mister.manager.cp_model, 'CpSolver', _Unused)
+
+    solution = Manager.make_teams(5, _even(3), Formation(2, 2, 1),
+                                  optimal=True)
+
+    assert solution.status == Statuses['OPTIMAL']
+
+    # Not so with the heuristic engine off the lower bound
+    solution = Manager.make_teams(5, _roster(3, Formation(2, 2, 1), 0),
+                                  Formation(2, 2, 1),
+                                  config=SolverConfig(
+                                      engine=Engines['HEURISTIC']))
+
+    assert solution.status == Statuses['HEURISTIC']
@@ -0,0 +1,74 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+
+Root = pathlib.Path(__file__).parent.parent
+
+# Modules loaded only at solve time
+Solver_MODULES = ('ortools', 'google.protobuf', 'numpy')
+
+# Run in a fresh interpreter, so that nothing is imported beforehand
+Probe_CODE = '''
+import json
+import sys
+
+import mister.__main__ as M
+from mister.cache import ScenarioCache
+
+with open(sys.argv[1]) as f:
+    scenario_conf = json.load(f)
+
+def solver_modules():
+    return sorted(m for m in sys.modules
+                  if any(m == k or m.startswith(k + '.') for k in %r))
+
+loaded = {}
+
+if sys.argv[3] == 'invalid':
+    invalid = dict(scenario_conf, nteams=int(scenario_conf['nteams']) + 1)
+
+    try:
+        M.fromjson(invalid)
+    except M.NotEnoughPlayersError:
+        pass
+    else:
+        raise AssertionError('The scenario is valid')
+else:
+    cache = ScenarioCache()
+    kwargs = M.parse(scenario_conf)
+
+    with open(sys.argv[2]) as f:
+        cache.set(ScenarioCache.key(kwargs['n'], kwargs['nteams'],
+                                    kwargs['_players'], kwargs['_formation'],
+                                    kwargs['config'], kwargs['previous']),
+                  [json.load(f)])
+
+    M.fromjson(scenario_conf, cache=cache)
+
+    if cache.hits != 1:
+        raise AssertionError('The scenario was not cached')
+
+print(json.dumps(solver_modules()))
+''' % (Solver_MODULES,)
+
+
+@pytest.mark.parametrize('case', ['invalid', 'cached'])
+def test_solver_not_loaded(case):
+    # Neither an invalid scenario nor a cache hit pays for the solver
+    scenario = Root / 'configs/5-v-5_Castagna'
+
+    process = subprocess.run([sys.executable, '-c', Probe_CODE,
+                              str(scenario / 'scenario.json'),
+                              str(scenario / 'solution.json'), case],
+                             cwd=str(Root), capture_output=True,
+                             text=True)
+
+    assert process.returncode == 0, process.stderr
+
+    modules = json.loads(process.stdout)
+
+    assert not modules, '%s loads %s' % (case, ', '.join(modules))
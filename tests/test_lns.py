@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+
+import pytest
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.constants import Engines
+from mister.constants import Statuses
+from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.listener import SolutionListener
+from mister.manager import Manager
+from mister.player import Player
+from mister.position import Position
+from tests.roster import players
+
+
+Formation_2_2_1 = Formation(2, 2, 1)
+
+
+class _Recorder(SolutionListener):
+    def __init__(self):
+        self.epsilons = []
+        self.stats = None
+
+    def on_solution(self, epsilon, teams, walltime):
+        self.epsilons.append(epsilon)
+
+    def on_finish(self, stats):
+        self.stats = stats
+
+
+def _coarse(nteams: int, seed: int):
+    """
+    Roster of strong and weak players, which the heuristic alone
+    balances far from the lower bound.
+    """
+    rng = random.Random(seed)
+
+    return [Player('%s%i' % (k.value, i),
+                   rng.choice([40, 45, 50, 55, 60, 90, 95, 100])
+                   + rng.choice([0, 0, 0, 1]), k)
+            for k in Position
+            for i in range(nteams*Formation_2_2_1.quota(k))]
+
+def _epsilon(roster, solution) -> int:
+    avg = sum(p.rating for p in roster) // len(solution.teams)
+
+    return max(abs(_t.rating - avg) for _t in solution.teams)
+
+def _check(roster, solution, formation: Formation):
+    """
+    C1, C4, C5, C6 and C8 on players sorted by rating.
+    """
+    nteams = len(solution.teams)
+    team_of = {p.name: _t.id for _t in solution.teams
+               for p in _t.players}
+
+    assert sorted(team_of) == sorted(p.name for p in roster)
+
+    for _t in solution.teams:
+        assert len(_t.players) == formation.nplayers
+
+        for k in Position:
+            assert sum(p.position == k for p in _t.players) \
+                   == formation.quota(k)
+
+    assert sorted(team_of[p.name] for p in roster[:nteams]) \
+           == list(range(nteams))
+    assert [team_of[p.name] for p in roster[-nteams:]] \
+           == list(range(nteams))
+
+@pytest.mark.parametrize('nteams, seed', [(8, 0), (8, 2), (10, 2)])
+def test_lns_improves_the_heuristic(nteams, seed):
+    formation = Formation_2_2_1
+    roster = _coarse(nteams, seed)
+    listener = _Recorder()
+
+    solution = Manager.make_lns(5, roster, formation,
+                                config=SolverConfig(time_limit=5.,
+                                                    num_workers=1,
+                                                    random_seed=seed),
+                                listener=listener)
+
+    _check(roster, solution, formation)
+
+    epsilon = _epsilon(roster, solution)
+    heuristic = Heuristic.epsilon(roster,
+                                  Heuristic.make_assignment(roster, nteams,
+                                                            formation),
+                                  nteams)
+
+    assert epsilon < heuristic
+    assert solution.status in (Statuses['OPTIMAL'],
+                               Statuses['CONVERGED'],
+                               Statuses['TIME_LIMIT'])
+
+    # Each improving round is streamed, the last being the result,
+    # ties on epsilon being broken by the sum of squared deviations
+    assert listener.epsilons
+    assert listener.epsilons == sorted(listener.epsilons, reverse=True)
+    assert listener.stats['epsilon'] == epsilon
+    assert listener.stats['nsolutions'] == len(listener.epsilons)
+
+def test_lns_engine():
+    formation = Formation_2_2_1
+    roster = _coarse(8, 0)
+
+    solution = Manager.make_teams(5, roster, formation, optimal=True,
+                                  config=SolverConfig(
+                                      time_limit=2., num_workers=1,
+                                      engine=Engines['LNS']))
+
+    _check(roster, solution, formation)
+
+def test_lns_time_limit():
+    formation = Formation_2_2_1
+    roster = _coarse(30, 1)
+
+    start = time.perf_counter()
+
+    solution = Manager.make_lns(5, roster, formation,
+                                config=SolverConfig(time_limit=1.,
+                                                    num_workers=1))
+
+    assert time.perf_counter() - start < 3.
+
+    _check(roster, solution, formation)
+
+def test_lns_at_the_lower_bound():
+    formation = Formation_2_2_1
+    roster = players(8, formation)
+
+    solution = Manager.make_lns(5, roster, formation,
+                                config=SolverConfig(time_limit=5.,
+                                                    num_workers=1))
+
+    _check(roster, solution, formation)
+
+    assert solution.status == Statuses['OPTIMAL']
+
+def test_lns_interrupted():
+    formation = Formation_2_2_1
+    roster = _coarse(8, 0)
+
+    interrupt = threading.Event()
+    interrupt.set()
+
+    solution = Manager.make_lns(5, roster, formation,
+                                config=SolverConfig(time_limit=5.,
+                                                    num_workers=1),
+                                interrupt=interrupt)
+
+    _check(roster, solution, formation)
+
+    # The heuristic teams as they are
+    assert solution.status == Statuses['INTERRUPTED']
+    assert _epsilon(roster, solution) \
+           == Heuristic.epsilon(roster,
+                                Heuristic.make_assignment(roster, 8,
+                                                          formation), 8)
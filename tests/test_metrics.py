@@ -0,0 +1,113 @@
+import pickle
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.formation import Formation
+from mister.metrics import Buckets
+from mister.metrics import Metrics
+from mister.metrics import metrics
+from mister.service import SolveExecutor
+from tests.roster import players
+
+
+def _worker() -> Metrics:
+    registry = Metrics(enabled=True)
+
+    registry.inc('solves', status='optimal')
+    registry.inc('solves', status='optimal')
+    registry.inc('cache_lookups', result='miss')
+    registry.set('pending_requests', 3)
+    registry.observe('solve', .02)
+    registry.observe('solve', 2.)
+
+    return registry
+
+def test_disabled_records_nothing():
+    registry = Metrics()
+
+    registry.inc('solves', status='optimal')
+    registry.set('pending_requests', 1)
+
+    with registry.timer('solve'):
+        pass
+
+    assert registry.stats() == {'counters': {}, 'gauges': {}, 'phases': {}}
+
+def test_drain_resets():
+    registry = _worker()
+    stats = registry.stats()
+
+    content = registry.drain()
+
+    assert registry.stats() == {'counters': {}, 'gauges': {}, 'phases': {}}
+
+    parent = Metrics(enabled=True)
+    parent.merge(content)
+
+    assert parent.stats() == stats
+
+def test_merge_adds_up():
+    parent = _worker()
+
+    # Across processes, as the executor does
+    for _ in range(2):
+        parent.merge(pickle.loads(pickle.dumps(_worker().drain())))
+
+    stats = parent.stats()
+
+    assert stats['counters'] == {
+        'solves': {'status=optimal': 6},
+        'cache_lookups': {'result=miss': 3},
+    }
+    assert stats['gauges'] == {'pending_requests': 3}
+
+    timer = stats['phases']['solve']
+
+    assert timer['count'] == 6
+    assert abs(timer['seconds'] - 6.06) < 1e-9
+    assert sum(timer['buckets']) == 6
+    assert len(timer['buckets']) == len(Buckets) + 1
+
+def test_merge_disabled():
+    parent = Metrics()
+    parent.merge(_worker().drain())
+
+    parent.enable()
+
+    assert parent.stats()['counters'] == {}
+
+def test_to_prometheus():
+    text = _worker().to_prometheus()
+
+    assert '# TYPE mister_solves_total counter\n' \
+           'mister_solves_total{status="optimal"} 2\n' in text
+    assert 'mister_pending_requests 3\n' in text
+    assert 'mister_phase_seconds_bucket{phase="solve",le="+Inf"} 2\n' \
+           in text
+    assert 'mister_phase_seconds_count{phase="solve"} 2\n' in text
+
+def test_worker_metrics_reach_the_parent(monkeypatch):
+    # Enabled in the worker processes through the environment
+    monkeypatch.setenv('MISTER_METRICS', '1')
+    monkeypatch.setattr(metrics, 'enabled', True)
+
+    metrics.reset()
+
+    executor = SolveExecutor(max_workers=1, max_queue=0, ncores=1)
+
+    try:
+        executor.solve({
+            'n': 5,
+            'nteams': 2,
+            'formation': str(Formation(2, 2, 1)),
+            'players': [p.serialize() for p
+                        in players(2, Formation(2, 2, 1))],
+        }, SolverConfig(time_limit=2.))
+    finally:
+        executor.shutdown()
+
+    stats = metrics.stats()
+    metrics.reset()
+
+    assert sum(stats['counters']['solves'].values()) == 1
+    assert stats['phases']['build']['count'] >= 1
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pytest
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.constants import Objectives
+from mister.formation import Formation
+from mister.heuristic import Heuristic
+from mister.manager import Manager
+from mister.objective import Lexicographic
+from mister.position import Position
+from tests.roster import players
+
+
+def _deviations(roster, assignment, nteams: int):
+    """
+    Epsilon, sum of the deviations of the teams, and
+    sum of those of their rating per position.
+    """
+    ratings = np.array([p.rating for p in roster])
+    assignment = np.asarray(assignment)
+
+    trating = np.bincount(assignment, weights=ratings, minlength=nteams)
+    dev = np.abs(trating - int(ratings.sum())//nteams)
+
+    positions = 0
+
+    for k in Position:
+        mask = np.array([p.position == k for p in roster])
+
+        trating = np.bincount(assignment[mask], weights=ratings[mask],
+                              minlength=nteams)
+        positions += np.abs(trating - int(ratings[mask].sum())//nteams).sum()
+
+    return int(dev.max()), int(dev.sum()), int(positions)
+
+def _split(roster, formation, objective):
+    solution = Manager.make_teams(formation.nplayers, list(roster), formation,
+                                  optimal=True,
+                                  config=SolverConfig(num_workers=1,
+                                                      random_seed=0,
+                                                      objective=objective))
+
+    roster = [p for _t in solution.teams for p in _t.players]
+    assignment = [_t.id for _t in solution.teams for _ in _t.players]
+
+    return _deviations(roster, assignment, len(solution.teams))
+
+@pytest.mark.parametrize('seed', range(3))
+def test_lexicographic_stages(seed):
+    formation = Formation(2, 2, 1)
+    roster = players(3, formation, seed=seed)
+
+    epsilon = _split(roster, formation, Objectives['EPSILON'])
+    deviation = _split(roster, formation, Objectives['DEVIATION'])
+    positions = _split(roster, formation, Objectives['POSITIONS'])
+
+    # Epsilon first, then the sum of the deviations, then
+    # that of the deviations per position, each no worse
+    assert epsilon[0] == deviation[0] == positions[0]
+    assert deviation[1] <= epsilon[1]
+    assert positions[1] == deviation[1]
+    assert positions[2] <= deviation[2]
+
+def _draft(nteams: int, formation: Formation, seed: int):
+    builder, e = Manager.build_model(formation.nplayers,
+                                     players(nteams, formation, seed=seed),
+                                     formation)
+
+    teams_of = builder.teams_of()
+
+    # A feasible solution, not an optimal one
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    solver.parameters.stop_after_first_solution = True
+
+    assert solver.Solve(builder.model) in (cp_model.OPTIMAL,
+                                           cp_model.FEASIBLE)
+
+    assignment = np.array(solver.ResponseProto().solution,
+                          dtype=np.int64)[teams_of]
+
+    return builder, e, assignment
+
+@pytest.mark.parametrize('objective', [Objectives['DEVIATION'],
+                                       Objectives['POSITIONS']])
+@pytest.mark.parametrize('seed', range(3))
+def test_refine(objective, seed):
+    builder, e, draft = _draft(4, Formation(2, 2, 1), seed)
+
+    epsilon = Heuristic.epsilon(builder.players, draft, builder.nteams)
+
+    assignment, _, _ = Lexicographic.refine(
+        builder, e, epsilon, draft,
+        SolverConfig(num_workers=1, random_seed=0, objective=objective),
+        float('inf'))
+
+    before = _deviations(builder.players, draft, builder.nteams)
+    after = _deviations(builder.players, assignment, builder.nteams)
+
+    # Within the epsilon of the solution, never worse
+    assert after[0] <= epsilon
+    assert after[1] <= before[1]
+
+def test_refine_interrupted():
+    builder, e, draft = _draft(4, Formation(2, 2, 1), 0)
+
+    interrupt = threading.Event()
+    interrupt.set()
+
+    assignment, conflicts, branches = Lexicographic.refine(
+        builder, e, Heuristic.epsilon(builder.players, draft, builder.nteams),
+        draft, SolverConfig(objective=Objectives['POSITIONS']),
+        float('inf'), interrupt)
+
+    assert assignment.tolist() == draft.tolist()
+    assert conflicts == branches == 0
@@ -0,0 +1,83 @@
+import itertools as it
+import time
+
+import numpy as np
+import pytest
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.pool import MIN_distance
+from mister.pool import Pool
+from tests.roster import players
+
+
+def _epsilon(roster, solution) -> int:
+    avg = sum(p.rating for p in roster) // len(solution.teams)
+
+    return max(abs(_t.rating - avg) for _t in solution.teams)
+
+def _distance(a, b) -> int:
+    """
+    Number of players in another team.
+    """
+    return sum(a[name] != b[name] for name in a)
+
+@pytest.mark.parametrize('nteams, formation, min_distance', [
+    (3, Formation(2, 2, 1), None),
+    (3, Formation(2, 2, 1), 4),
+    (4, None, 3),
+])
+def test_pool_distance(nteams, formation, min_distance):
+    roster = players(nteams, formation)
+
+    solutions = Manager.make_solutions(5, roster, formation,
+                                       config=SolverConfig(
+                                           time_limit=5.,
+                                           num_workers=1,
+                                           pool_size=5,
+                                           pool_epsilon=20,
+                                           min_distance=min_distance))
+
+    assert 1 < len(solutions) <= 5
+
+    assignments = [{p.name: _t.id for _t in s.teams for p in _t.players}
+                   for s in solutions]
+
+    for a, b in it.combinations(assignments, 2):
+        assert _distance(a, b) >= (min_distance or MIN_distance)
+
+    epsilons = [_epsilon(roster, s) for s in solutions]
+
+    assert epsilons == sorted(epsilons)
+    assert epsilons[-1] <= epsilons[0] + 20
+
+def test_diversify_skips_close_candidates():
+    formation = Formation(2, 2, 1)
+    builder, e = Manager.build_model(5, players(3, formation), formation)
+
+    a = np.array([0, 1, 2]*5)
+    b = a.copy()
+    b[[3, 4]] = b[[4, 3]]
+    c = np.roll(a, 1)
+
+    # Out of time, so that the pool is only picked among the candidates
+    pool, _, _ = Pool.diversify(builder, e, [(7, b), (5, a), (9, c)],
+                                SolverConfig(pool_size=3, min_distance=3),
+                                10**6, time.perf_counter())
+
+    assert [epsilon for epsilon, _ in pool] == [5, 9]
+    assert pool[0][1] == a.tolist()
+
+def test_diversify_good_epsilon():
+    formation = Formation(2, 2, 1)
+    builder, e = Manager.build_model(5, players(3, formation), formation)
+
+    a = np.array([0, 1, 2]*5)
+
+    pool, _, _ = Pool.diversify(builder, e, [(5, a), (9, np.roll(a, 1))],
+                                SolverConfig(pool_size=3),
+                                8, time.perf_counter())
+
+    assert [epsilon for epsilon, _ in pool] == [5]
@@ -0,0 +1,51 @@
+import pytest
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.constants import Encodings
+from mister.manager import Manager
+from tests.roster import players
+
+
+class _Enumerator(cp_model.CpSolverSolutionCallback):
+    def __init__(self, x):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+
+        self.__x = x
+        self.solutions = set()
+
+    def on_solution_callback(self):
+        self.solutions.add(tuple(
+            tuple(self.BooleanValue(v) for v in row)
+            for row in self.__x))
+
+def _solutions(n: int, roster, encoding: str):
+    builder, e = Manager.build_model(n, list(roster), None,
+                                     position_encoding=encoding)
+
+    # Every assignment allowed by C1-C8, whatever its epsilon
+    builder.model.Proto().ClearField('objective')
+    builder.model.Add(e == builder.epsilon_bounds()[1])
+
+    enumerator = _Enumerator(builder.x)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.num_search_workers = 1
+
+    assert solver.SolveWithSolutionCallback(builder.model, enumerator) \
+        == cp_model.OPTIMAL
+
+    return enumerator.solutions
+
+@pytest.mark.parametrize('n, nteams', [(2, 3), (3, 2), (3, 3), (4, 2)])
+@pytest.mark.parametrize('seed', range(3))
+def test_encodings_accept_the_same_solutions(n, nteams, seed):
+    roster = players(nteams, n=n, seed=seed)
+
+    pairwise = _solutions(n, roster, Encodings['PAIRWISE'])
+    bounds = _solutions(n, roster, Encodings['BOUNDS'])
+
+    assert pairwise
+    assert pairwise == bounds
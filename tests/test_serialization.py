@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+# Custom imports
+import mister.encoder
+
+from mister.encoder import Encoder
+from mister.formation import Formation
+from mister.player import Player
+from mister.serializable import DictSerializable
+from mister.solution import Solution
+from mister.team import Team
+from tests.roster import players
+
+
+def _solution() -> Solution:
+    roster = players(3, Formation(2, 2, 1))
+
+    return Solution.create(7, 300,
+                           Team.from_assignment(roster,
+                                                [i % 3 for i
+                                                 in range(len(roster))]),
+                           'optimal')
+
+def test_serialize_leaves_the_solution_as_is():
+    solution = _solution()
+
+    ratings = [_t.rating for _t in solution.teams]
+    players_per_team = [list(_t.players) for _t in solution.teams]
+
+    encoding = solution.serialize()
+
+    # Twice the same, e.g., from a cached pool
+    assert solution.serialize() == encoding
+
+    assert [_t.rating for _t in solution.teams] == ratings
+    assert [_t.players for _t in solution.teams] == players_per_team
+    assert all(isinstance(p, Player) for _t in solution.teams
+               for p in _t.players)
+
+def test_serialize_layout():
+    encoding = json.loads(Encoder.dumps(_solution().serialize()))
+
+    assert sorted(encoding) == ['balance', 'status', 'teams']
+    assert encoding['balance'] == round((300 - 7)/300, 3)
+    assert encoding['status'] == 'optimal'
+
+    for i, _t in enumerate(encoding['teams']):
+        # Private slots, e.g., the cached rating, are left out
+        assert sorted(_t) == ['id', 'players']
+        assert _t['id'] == i
+
+        for p in _t['players']:
+            assert sorted(p) == ['name', 'position', 'rating']
+            assert p['position'] in ('D', 'M', 'F')
+
+def test_player_round_trip():
+    for p in players(2, Formation(2, 2, 1)):
+        q = Player.deserialize(json.loads(Encoder.dumps(p.serialize())))
+
+        assert (q.name, q.rating, q.position) \
+               == (p.name, p.rating, p.position)
+
+def test_formation_round_trip():
+    formation = Formation(3, 2, 1)
+
+    assert formation.serialize() == str(formation) == '3-2-1'
+    assert Formation.deserialize('3-2-1').serialize() == '3-2-1'
+
+def test_previous_solution_round_trip():
+    solution = _solution()
+
+    assert Solution.assignment(solution.serialize()) \
+           == {p.name: _t.id for _t in solution.teams
+               for p in _t.players}
+
+def test_instance_dict():
+    class _Stats(DictSerializable):
+        def __init__(self):
+            self.status = 'optimal'
+            self.teams = [Team(0)]
+
+        @staticmethod
+        def deserialize(encoding):
+            raise NotImplementedError()
+
+    assert _Stats().serialize() == {
+        'status': 'optimal',
+        'teams': [{'id': 0, 'players': []}],
+    }
+
+@pytest.mark.parametrize('orjson', [True, False])
+def test_encoder(monkeypatch, orjson):
+    if not orjson:
+        monkeypatch.setattr(mister.encoder, 'orjson', None)
+    elif mister.encoder.orjson is None:
+        pytest.skip('orjson is not installed')
+
+    encoding = _solution().serialize()
+
+    compact = Encoder.dumps(encoding)
+
+    assert ', ' not in compact and ': ' not in compact
+    assert Encoder.loads(compact) == json.loads(compact)
+    assert Encoder.dumpb(encoding) == compact.encode()
+    assert Encoder.loads(Encoder.dumpb(encoding)) == Encoder.loads(compact)
+
+    # Files are the same with or without orjson
+    assert Encoder.dumps(encoding, indent=4) \
+           == json.dumps(encoding, indent=4)
@@ -0,0 +1,97 @@
+import concurrent.futures as cf
+import time
+
+import pytest
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.errors import DeadlineExceededError
+from mister.errors import QueueFullError
+from mister.formation import Formation
+from mister.service import SolveExecutor
+from tests.roster import players
+
+
+def _scenario_conf(nteams: int, seed: int = 0):
+    formation = Formation(2, 2, 1)
+
+    return {
+        'n': 5,
+        'nteams': nteams,
+        'formation': str(formation),
+        'optimal': True,
+        'players': [p.serialize() for p
+                    in players(nteams, formation, seed=seed)],
+    }
+
+# A league whose search runs to its time budget
+Slow_CONF = _scenario_conf(14, seed=1)
+
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = SolveExecutor(max_workers=1, max_queue=0, ncores=1)
+
+    yield executor
+
+    executor.shutdown()
+
+def _wait_idle(executor: SolveExecutor):
+    deadline = time.time() + 5
+
+    while executor.npending and time.time() < deadline:
+        time.sleep(.05)
+
+    assert executor.npending == 0
+
+def test_solve(executor):
+    solution = executor.solve(_scenario_conf(2),
+                              SolverConfig(time_limit=2.))
+
+    assert len(solution['teams']) == 2
+
+    _wait_idle(executor)
+
+def test_queue_full(executor):
+    future = executor.submit(Slow_CONF, SolverConfig(time_limit=10.))
+
+    with pytest.raises(QueueFullError):
+        executor.submit(_scenario_conf(2))
+
+    future.cancel()
+    _wait_idle(executor)
+
+def test_cancel_stops_the_search(executor):
+    future = executor.submit(Slow_CONF, SolverConfig(time_limit=10.))
+
+    time.sleep(1.)
+
+    start = time.time()
+
+    future.cancel()
+    _wait_idle(executor)
+
+    # The worker is free long before the time budget
+    assert time.time() - start < 5.
+
+    with pytest.raises(cf.CancelledError):
+        future.result()
+
+def test_deadline_bounds_the_search(executor):
+    start = time.time()
+
+    solution = executor.solve(Slow_CONF, SolverConfig(time_limit=10.),
+                              timeout=1.)
+
+    assert time.time() - start < 2.
+    assert solution['teams']
+
+    _wait_idle(executor)
+
+def test_deadline_exceeded(executor):
+    # No time left for the search once the solution is sent back
+    with pytest.raises(DeadlineExceededError):
+        executor.solve(Slow_CONF, SolverConfig(time_limit=10.),
+                       timeout=.1)
+
+    _wait_idle(executor)
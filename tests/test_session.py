@@ -0,0 +1,155 @@
+import random
+
+import numpy as np
+import pytest
+
+# Custom imports
+from mister.config import SolverConfig
+from mister.feasibility import Feasibility
+from mister.formation import Formation
+from mister.player import Player
+from mister.position import Position
+from mister.session import Session
+from tests.roster import players
+
+
+def _spread(solution, nteams: int) -> bool:
+    """
+    Whether C5 and C6 hold for some order of the players tied on rating.
+    """
+    ratings = sorted([(p.rating, _t.id) for _t in solution.teams
+                                        for p in _t.players])
+
+    for extremes in (ratings[::-1], ratings):
+        threshold = extremes[nteams - 1][0]
+
+        beyond = [tid for rating, tid in extremes[:nteams]
+                  if rating != threshold]
+        tied = {tid for rating, tid in extremes
+                if rating == threshold} - set(beyond)
+
+        if len(set(beyond)) < len(beyond) \
+                or len(tied) < nteams - len(beyond):
+            return False
+
+    return True
+
+def _distinct(nteams: int,
+              formation: Formation,
+              seed: int):
+    """
+    Roster whose ratings are all distinct, so that the
+    tiers of C9 do not depend on the order of ties.
+    """
+    roster = players(nteams, formation, seed=seed)
+    ratings = random.Random(seed).sample(range(30, 90), len(roster))
+
+    return [Player(p.name, r, p.position)
+            for p, r in zip(roster, ratings)]
+
+def _assignment(solution):
+    """
+    Players sorted by rating, and the team Id of each.
+    """
+    pairs = sorted([(p, _t.id) for _t in solution.teams
+                               for p in _t.players],
+                   key=lambda pair: pair[0].rating)
+
+    return [p for p, _ in pairs], \
+           np.array([tid for _, tid in pairs], dtype=np.int64)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_replace_with_extreme_rating(seed):
+    # C5 and C6 across the whole league after arrivals rated higher
+    # than anyone else, in place of the lowest-rated forward
+    nteams = 8
+    formation = Formation(2, 2, 1)
+
+    session = Session(formation.nplayers,
+                      players(nteams, formation, seed=seed),
+                      formation, SolverConfig(time_limit=2.,
+                                              random_seed=0))
+
+    for it in range(5):
+        flop = min([p for p in session.players
+                    if p.position == Position.F],
+                   key=lambda p: p.rating)
+
+        solution = session.replace(flop.name,
+                                   Player('New%i' % it, 100 - it, 'F'))
+
+        assert _spread(solution, nteams)
+
+        for _t in solution.teams:
+            assert len(_t.players) == formation.nplayers
+
+            for k in Position:
+                assert sum(p.position == k for p in _t.players) \
+                       == formation.quota(k)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_rate_with_extreme_rating(seed):
+    # The lowest-rated player of a team becomes the highest of the league
+    nteams = 8
+    formation = Formation(2, 2, 1)
+
+    session = Session(formation.nplayers,
+                      players(nteams, formation, seed=seed),
+                      formation, SolverConfig(time_limit=2.,
+                                              random_seed=0))
+
+    for it in range(5):
+        solution = session.edit(ratings={session.players[0].name:
+                                         100 - it})
+
+        assert _spread(solution, nteams)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_edit_with_tiers(seed):
+    # C9 across the whole league after arrivals and new ratings
+    # that move players to another tier
+    nteams = 6
+    formation = Formation(2, 2, 1)
+    config = SolverConfig(time_limit=2., random_seed=0, tiers=5)
+
+    session = Session(formation.nplayers,
+                      _distinct(nteams, formation, seed),
+                      formation, config)
+
+    for it in range(4):
+        flop = min([p for p in session.players
+                    if p.position == Position.F],
+                   key=lambda p: p.rating)
+
+        session.replace(flop.name, Player('New%i' % it, 95 + it, 'F'))
+        solution = session.edit(ratings={session.players[-1].name:
+                                         20 + it})
+
+        _, assignment = _assignment(solution)
+
+        assert Feasibility.spread(assignment, nteams, config.tiers)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_edit_with_position_tolerance(seed):
+    # C10 around the averages per position of the whole league,
+    # which an edit shifts for the fixed teams as well
+    nteams = 6
+    formation = Formation(2, 2, 1)
+    config = SolverConfig(time_limit=2., random_seed=0,
+                          position_tolerance=40)
+
+    session = Session(formation.nplayers,
+                      _distinct(nteams, formation, seed),
+                      formation, config)
+
+    for it in range(4):
+        top = max([p for p in session.players
+                   if p.position == Position.D],
+                  key=lambda p: p.rating)
+
+        solution = session.edit(ratings={top.name: 30 + it})
+
+        roster, assignment = _assignment(solution)
+
+        assert not Feasibility.unbalanced(roster, assignment, nteams,
+                                          config.position_tolerance)
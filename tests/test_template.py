@@ -0,0 +1,58 @@
+import pytest
+
+from ortools.sat.python import cp_model
+
+# Custom imports
+from mister.formation import Formation
+from mister.manager import Manager
+from mister.template import ModelTemplates
+from tests.roster import players
+
+
+def _epsilon(builder, e) -> int:
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    solver.parameters.random_seed = 0
+
+    assert solver.Solve(builder.model) == cp_model.OPTIMAL
+
+    return int(solver.Value(e))
+
+def _build(formation, roster, templates=None, **kwargs):
+    return Manager.build_model(5, sorted(roster, key=lambda p: p.rating),
+                               formation, templates=templates, **kwargs)
+
+@pytest.mark.parametrize('nteams, formation, kwargs', [
+    (3, Formation(2, 2, 1), {}),
+    (4, Formation(2, 2, 1), {}),
+    (4, None, {}),
+    (4, Formation(2, 2, 1), {'tiers': 3}),
+    (3, Formation(2, 2, 1), {'position_tolerance': 60}),
+    (3, Formation(2, 2, 1), {'tiers': 5, 'position_tolerance': 60}),
+])
+def test_patched_template_solves_as_fresh_build(nteams, formation, kwargs):
+    templates = ModelTemplates()
+
+    # The first roster populates the cache, the others patch copies
+    for seed in range(4):
+        # As many players per position, so that the shape is the same
+        roster = players(nteams, formation or Formation(2, 2, 1),
+                         seed=seed)
+
+        patched = _build(formation, roster, templates, **kwargs)
+        fresh = _build(formation, roster, **kwargs)
+
+        assert _epsilon(*patched) == _epsilon(*fresh)
+
+    assert templates.stats()['hits'] == 3
+    assert templates.stats()['misses'] == 1
+
+def test_shapes_do_not_share_templates():
+    templates = ModelTemplates()
+
+    _build(Formation(2, 2, 1), players(3, Formation(2, 2, 1)), templates)
+    _build(Formation(2, 2, 1), players(3, Formation(2, 2, 1)), templates,
+           tiers=3)
+    _build(Formation(1, 2, 2), players(3, Formation(1, 2, 2)), templates)
+
+    assert templates.stats() == {'hits': 0, 'misses': 3, 'entries': 3}